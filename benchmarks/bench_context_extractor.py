@@ -0,0 +1,80 @@
+"""Benchmark the in-process context extractor against ``grep -A/-B``.
+
+Usage:
+    python benchmarks/bench_context_extractor.py [--size-mb 300] [--context 3] [--input FILE]
+
+Without ``--input`` a synthetic threadtime log of the requested size is
+generated in a temporary directory.  Both tools run on the same file and the
+outputs are compared byte for byte.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from mybugreport.context_extractor import stream_context_sections  # noqa: E402
+
+
+def generate_log(path: Path, size_mb: int) -> None:
+    target = size_mb * 1024 * 1024
+    line_no = 0
+    with path.open("w") as handle:
+        written = 0
+        while written < target:
+            chunk = []
+            for _ in range(10000):
+                second = (line_no // 500) % 60
+                minute = (line_no // 30000) % 60
+                chunk.append(
+                    f"06-21 12:{minute:02d}:{second:02d}.{line_no % 1000:03d}  1000  {line_no % 30000:5d} "
+                    f"I ActivityManager: Start proc {line_no} for service com.example/.Svc{line_no % 97}\n"
+                )
+                line_no += 1
+            text = "".join(chunk)
+            handle.write(text)
+            written += len(text)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=300)
+    parser.add_argument("--context", type=int, default=3)
+    parser.add_argument("--input", help="Use an existing file instead of generating one")
+    parser.add_argument("patterns", nargs="*", default=[" 12:05:07", " 12:41:33"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(args.input) if args.input else Path(tmp) / "bench.log"
+        if not args.input:
+            generate_log(source, args.size_mb)
+        size_mb = os.path.getsize(source) / (1024 * 1024)
+        print(f"input: {source} ({size_mb:.1f} MiB), patterns={args.patterns}, context={args.context}")
+
+        start = time.perf_counter()
+        produced = b"".join(stream_context_sections(args.patterns, str(source), str(args.context)))
+        python_time = time.perf_counter() - start
+        print(f"in-process: {python_time:.3f}s ({size_mb / python_time:.0f} MiB/s), {len(produced)} bytes out")
+
+        if shutil.which("grep") is None:
+            print("grep not available; skipping comparison")
+            return
+        command = ["grep", "-A", str(args.context), "-B", str(args.context)]
+        for pattern in args.patterns:
+            command += ["-e", pattern]
+        start = time.perf_counter()
+        expected = subprocess.run(command + [str(source)], capture_output=True).stdout
+        grep_time = time.perf_counter() - start
+        print(f"grep:       {grep_time:.3f}s ({size_mb / grep_time:.0f} MiB/s)")
+        print(f"identical output: {produced == expected}")
+
+
+if __name__ == "__main__":
+    main()
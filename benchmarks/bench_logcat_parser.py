@@ -0,0 +1,70 @@
+"""Benchmark the parse-stage logcat line parser.
+
+Usage:
+    python benchmarks/bench_logcat_parser.py [--lines 1000000] [--input FILE]
+
+Without ``--input`` a synthetic bugreport-like mix is generated in memory:
+mostly threadtime lines (half of them with the ``-v uid`` column that
+bugreport SYSTEM LOG sections carry) plus brief lines, section headers and
+plain text.
+Reports single-core throughput of ``parse_log_line`` and of building full
+``LogRecord`` objects with ``record_from_line``.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from mybugreport.pipeline.parse import parse_log_line, record_from_line  # noqa: E402
+
+
+def generate_lines(count: int):
+    lines = []
+    for idx in range(count):
+        kind = idx % 50
+        if kind == 0:
+            lines.append("------ SYSTEM LOG (logcat -v threadtime -v printable -d *:v) ------")
+        elif kind == 1:
+            lines.append(f"I/ActivityManager(  {1000 + idx % 300}): Displayed com.example/.Main: +{idx % 900}ms")
+        elif kind < 5:
+            lines.append(f"  mCurrentFocus=Window{{{idx:x} u0 com.example/.Main}}")
+        else:
+            uid = ("  1000", "  root", "u0_a12")[idx % 3] + " " if idx % 2 else ""
+            lines.append(
+                f"06-21 12:{idx // 60000 % 60:02d}:{idx // 1000 % 60:02d}.{idx % 1000:03d} {uid} 1000  {idx % 30000:5d} "
+                f"I ActivityManager: Start proc {idx} for service com.example/.Svc{idx % 97}"
+            )
+    return lines
+
+
+def measure(label, func, lines):
+    start = time.perf_counter()
+    for line in lines:
+        func(line)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<18} {len(lines) / elapsed / 1e6:6.2f} M lines/s ({elapsed:.2f}s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--input", help="Parse an existing file instead of generated lines")
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input, encoding="utf-8", errors="replace") as handle:
+            lines = [line.rstrip("\n") for line in handle]
+    else:
+        lines = generate_lines(args.lines)
+    parsed = sum(1 for line in lines if parse_log_line(line) is not None)
+    print(f"{len(lines)} lines, {parsed} recognized")
+    measure("parse_log_line", parse_log_line, lines)
+    measure("record_from_line", lambda line: record_from_line(line, "bugreport"), lines)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ __all__ = [
     "processor",
     "rules",
     "time_utils",
+    "translation",
     "forensic_analysis",
     "io_utils",
     "hooks",
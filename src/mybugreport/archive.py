@@ -0,0 +1,174 @@
+"""
+Transparent reading of compressed captures (``adb bugreport`` zips, .gz, .xz).
+
+Inputs are recognized by their magic bytes, not their suffix.  A zip is read
+through its main member (the ``bugreport-*.txt`` dumpstate text); another
+member can be addressed as ``capture.zip::dumpstate_board.txt``.  Members are
+decompressed as a stream straight from the archive, so nothing is unpacked to
+disk; ``materialize`` exists for the few consumers that need random access
+(mmap binary search) and copies only the selected member.
+"""
+
+import gzip
+import lzma
+import os
+import shutil
+import tempfile
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+
+from .config import log_debug
+
+ZIP_MAGIC = b"PK\x03\x04"
+GZIP_MAGIC = b"\x1f\x8b"
+XZ_MAGIC = b"\xfd7zXZ\x00"
+MEMBER_SEPARATOR = "::"
+COMPRESSED_SUFFIXES = (".zip", ".gz", ".xz")
+# zip members that are dumpstate text (proto dumps, traces and binaries are skipped)
+TEXT_MEMBER_SUFFIXES = (".txt", ".log")
+
+PathLike = Union[str, Path]
+
+
+def split_member(path: PathLike) -> Tuple[str, Optional[str]]:
+    """``"capture.zip::member.txt"`` → ``("capture.zip", "member.txt")``."""
+    text = str(path)
+    if MEMBER_SEPARATOR in text:
+        container, member = text.split(MEMBER_SEPARATOR, 1)
+        return container, member or None
+    return text, None
+
+
+def container_path(path: PathLike) -> Path:
+    """The file on disk behind ``path`` (the archive for a ``::member`` path)."""
+    return Path(split_member(path)[0])
+
+
+def archive_kind(path: PathLike) -> Optional[str]:
+    """``"zip"``, ``"gzip"``, ``"xz"`` or None for plain (or missing) files."""
+    container, _ = split_member(path)
+    try:
+        with open(container, "rb") as handle:
+            head = handle.read(len(XZ_MAGIC))
+    except OSError:
+        return None
+    if head.startswith(ZIP_MAGIC):
+        return "zip"
+    if head.startswith(GZIP_MAGIC):
+        return "gzip"
+    if head.startswith(XZ_MAGIC):
+        return "xz"
+    return None
+
+
+def is_archive(path: PathLike) -> bool:
+    return archive_kind(path) is not None
+
+
+def input_stem(path: PathLike) -> str:
+    """Output naming stem: the member's stem, or the file's without compression suffixes."""
+    container, member = split_member(path)
+    name = Path(member or container).name
+    while Path(name).suffix.lower() in COMPRESSED_SUFFIXES:
+        name = Path(name).stem
+    return Path(name).stem
+
+
+def text_members(archive: zipfile.ZipFile) -> List[str]:
+    """Text members, the main dumpstate text first, then by name."""
+    names = [
+        info.filename
+        for info in archive.infolist()
+        if not info.is_dir() and info.filename.lower().endswith(TEXT_MEMBER_SUFFIXES)
+    ]
+    main = _main_member(archive, names)
+    return [main] + sorted(name for name in names if name != main) if main else sorted(names)
+
+
+def _main_member(archive: zipfile.ZipFile, names: List[str]) -> Optional[str]:
+    # adb bugreport names the dumpstate text bugreport-<device>-<build>-<date>.txt
+    candidates = [name for name in names if Path(name).name.lower().startswith("bugreport")] or names
+    if not candidates:
+        return None
+    return max(candidates, key=lambda name: archive.getinfo(name).file_size)
+
+
+def list_members(path: PathLike) -> List[str]:
+    """``path::member`` for every text member of a zip; ``[path]`` for other inputs."""
+    container, member = split_member(path)
+    if member is not None or archive_kind(container) != "zip":
+        return [str(path)]
+    with zipfile.ZipFile(container) as archive:
+        return [f"{container}{MEMBER_SEPARATOR}{name}" for name in text_members(archive)]
+
+
+@contextmanager
+def open_input(path: PathLike) -> Iterator[BinaryIO]:
+    """Binary stream of the input's text, decompressing on the fly."""
+    container, member = split_member(path)
+    kind = archive_kind(container)
+    if kind is None:
+        if member is not None:
+            raise ValueError(f"{container} is not an archive, cannot select member {member!r}")
+        with open(container, "rb") as handle:
+            yield handle
+        return
+    if kind != "zip":
+        if member is not None:
+            raise ValueError(f"{container} is a single-stream {kind} file, cannot select member {member!r}")
+        opener = gzip.open if kind == "gzip" else lzma.open
+        with opener(container, "rb") as handle:
+            yield handle
+        return
+    with zipfile.ZipFile(container) as archive:
+        if member is None:
+            member = _main_member(archive, text_members(archive))
+            if member is None:
+                raise ValueError(f"no text member in {container}")
+        log_debug(f"Reading {member} from {container}")
+        with archive.open(member) as handle:
+            yield handle
+
+
+@contextmanager
+def materialize(path: PathLike, tmp_dir: Optional[str] = None) -> Iterator[str]:
+    """A plain, seekable file with the input's text: the path itself when it is one,
+    otherwise a temporary copy of the selected member (removed on exit)."""
+    container, member = split_member(path)
+    if member is None and archive_kind(container) is None:
+        yield container
+        return
+    fd, tmp_path = tempfile.mkstemp(prefix="mybugreport-", suffix=".txt", dir=tmp_dir)
+    try:
+        with os.fdopen(fd, "wb") as out, open_input(path) as handle:
+            shutil.copyfileobj(handle, out, 1024 * 1024)
+        log_debug(f"Materialized {path} to {tmp_path} for random access")
+        yield tmp_path
+    finally:
+        os.unlink(tmp_path)
+
+
+def skip_bytes(handle: BinaryIO, count: int, chunk_size: int = 1024 * 1024) -> None:
+    """Advance a forward-only stream by ``count`` bytes."""
+    while count > 0:
+        data = handle.read(min(count, chunk_size))
+        if not data:
+            return
+        count -= len(data)
+
+
+__all__ = [
+    "MEMBER_SEPARATOR",
+    "archive_kind",
+    "container_path",
+    "input_stem",
+    "is_archive",
+    "list_members",
+    "materialize",
+    "open_input",
+    "skip_bytes",
+    "split_member",
+    "text_members",
+]
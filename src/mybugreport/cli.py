@@ -8,19 +8,47 @@ import argparse
 import sys
 from pathlib import Path
 
-from .config import RULE2_FILE, RULE_FILE
+from .archive import container_path, is_archive, materialize
+from .config import (
+    FUSED_PIPELINE,
+    MULTI_SECTION,
+    RULE2_FILE,
+    RULE_FILE,
+    SECTION_SCOPE,
+    STAGE_CACHE,
+    STAGE_CACHE_DIR,
+    log_debug,
+)
 from .io_utils import validate_inputs
 from .models import DeviceInfo
+from .pipeline.cache import StageCache, parse_size
 from .pipeline.collect import collect_existing_artifact, write_artifacts_index
-from .pipeline.parse import parse_artifacts_to_records, parse_bugreport_lines
-from .pipeline.analyze import summarize_records
+from .pipeline.collect.adb import ADB_BACKENDS
+from .pipeline.collect.fleet import collect_fleet, list_devices, parse_devices
+from .pipeline.parse import (
+    RECORD_FORMATS,
+    is_binary_logcat,
+    parse_bugreport_parallel,
+    parse_bugreport_stream,
+    section_spans_for,
+    sections_index_path,
+    write_sections_index,
+)
+from .pipeline.analyze import summarize_records, write_l1_events, write_score_timeline
 from .pipeline.report import render_report_markdown
+from .pipeline.scheduler import run_dag
+from .pipeline.stages import build_pipeline_nodes
 from .processor import (
     apply_translations_and_time,
     extract_context_sections,
     extract_section_with_rules,
+    extract_sections,
+    run_fused_pipeline,
 )
-from .rules import load_translation_pairs, read_section_rule
+from .parallel import resolve_workers, run_parallel_pipeline
+from .rules import load_section_rules, load_translation_pairs, read_section_rule
+from .time_range import extract_time_range
+from .utils import RecordDatabase, dump_jsonl_line, read_json
 from .time_utils import (
     parse_time,
     replace_time_strings_in_line as replace_time_strings_in_file,
@@ -30,15 +58,83 @@ from .time_utils import (
 pairs = {}
 
 
-def execute_commands(dates, input_file, output_file, num_context_lines):
-    """Main entry point mirroring the original script behavior."""
-    validate_inputs([input_file])
+def _load_section_plan(multi_section):
+    """Section rules to apply: the first rule2 line (legacy) or every line with repeats."""
+    if multi_section:
+        return load_section_rules(RULE2_FILE), True
+    section_start, section_end = read_section_rule(RULE2_FILE)
+    return [(section_start, section_end)], False
+
+
+def execute_commands(
+    dates, input_file, output_file, num_context_lines, fused=None, multi_section=None, workers=None,
+    time_range=None,
+):
+    """Main entry point mirroring the original script behavior.
+
+    fused: read the input once and write the output once (defaults to
+    MYBUGREPORT_FUSED_PIPELINE); the output is identical either way.
+    multi_section: extract every rule2 section, including repeated occurrences
+    (defaults to MYBUGREPORT_MULTI_SECTION).
+    workers: process pool size for chunked parallel processing (0 = CPU count);
+    the output is identical to the serial path.
+    time_range: ``(start, end)`` threadtime bounds (either may be None); replaces
+    the per-timestamp grep step with a binary search over the logcat blocks.
+
+    ``input_file`` may be an ``adb bugreport`` zip (or ``capture.zip::member``)
+    or a .gz/.xz file: a full scan streams it through the fused pipeline;
+    range and section-scope modes need random access and work on a temporary
+    copy of the selected member.
+    """
+    validate_inputs([str(container_path(input_file))])
+    multi_section = MULTI_SECTION if multi_section is None else multi_section
+    workers = resolve_workers(workers)
+
+    # range mode and section scope read only parts of the input: keep the step-by-step path
+    full_scan = time_range is None and not SECTION_SCOPE
 
-    extract_context_sections(dates, input_file, output_file, num_context_lines)
+    if is_archive(input_file):
+        if not full_scan:
+            with materialize(input_file) as plain_input:
+                execute_commands(
+                    dates, plain_input, output_file, num_context_lines, fused, multi_section, workers, time_range
+                )
+            return
+        if workers > 1:
+            log_debug("Compressed input is read as one stream; ignoring --workers")
+        workers, fused = 1, True
+
+    if workers > 1 and full_scan:
+        section_rules, repeat = _load_section_plan(multi_section)
+        pairs.update(load_translation_pairs(RULE_FILE))
+        run_parallel_pipeline(
+            dates, input_file, output_file, num_context_lines, section_rules, pairs, workers,
+            repeat_sections=repeat,
+        )
+        replace_time_strings_in_file(output_file)
+        return
+
+    if full_scan and (FUSED_PIPELINE if fused is None else fused):
+        section_rules, repeat = _load_section_plan(multi_section)
+        pairs.update(load_translation_pairs(RULE_FILE))
+        run_fused_pipeline(
+            dates, input_file, output_file, num_context_lines, section_rules, pairs, repeat_sections=repeat
+        )
+        replace_time_strings_in_file(output_file)
+        return
+
+    if time_range is not None:
+        extract_time_range(input_file, output_file, *time_range)
+    else:
+        extract_context_sections(dates, input_file, output_file, num_context_lines)
 
     # section extraction remains optional/extendable via rule2 file and env overrides
-    section_start, section_end = read_section_rule(RULE2_FILE)
-    extract_section_with_rules(input_file, output_file, section_start, section_end)
+    section_rules, repeat = _load_section_plan(multi_section)
+    if repeat:
+        extract_sections(input_file, output_file, section_rules, repeat=True)
+    else:
+        section_start, section_end = section_rules[0]
+        extract_section_with_rules(input_file, output_file, section_start, section_end)
 
     # 从配置文件中读取键值对
     pairs.update(load_translation_pairs(RULE_FILE))
@@ -49,8 +145,35 @@ def execute_commands(dates, input_file, output_file, num_context_lines):
     replace_time_strings_in_file(output_file)
 
 
+def _pop_option(argv, name):
+    """Remove ``name VALUE`` / ``name=VALUE`` from a legacy argv list."""
+    remaining = []
+    value = None
+    args = iter(argv)
+    for arg in args:
+        if arg == name:
+            value = next(args, None)
+            if value is None:
+                raise RuntimeError(f"{name} requires a value")
+        elif arg.startswith(name + "="):
+            value = arg.split("=", 1)[1]
+        else:
+            remaining.append(arg)
+    return remaining, value
+
+
 def main(argv=None):
     argv = argv or sys.argv
+    argv, workers = _pop_option(argv, "--workers")
+    argv, start_time = _pop_option(argv, "--from")
+    argv, end_time = _pop_option(argv, "--to")
+    workers = None if workers is None else int(workers)
+    if start_time or end_time:
+        # range mode: <input_bugreport> <output_file>, no timestamp patterns
+        execute_commands(
+            [], argv[1], argv[2], "0", workers=workers, time_range=(start_time, end_time)
+        )
+        return
     dates = argv[1:-3]
     input_file = argv[-3]
     output_file = argv[-2]
@@ -58,7 +181,7 @@ def main(argv=None):
         num_context_lines = argv[-1]
     else:
         num_context_lines = '1'
-    execute_commands(dates, input_file, output_file, num_context_lines)
+    execute_commands(dates, input_file, output_file, num_context_lines, workers=workers)
 
 
 if __name__ == "__main__":
@@ -81,10 +204,40 @@ def pipeline_main(argv=None):
     parse_parser.add_argument("bugreport", help="Path to bugreport text")
     parse_parser.add_argument("records", help="Output jsonl path")
     parse_parser.add_argument("--source", default="bugreport", help="Source label")
+    parse_parser.add_argument("--workers", type=int, default=None, help="Parallel parse workers (0 = CPU count)")
+    parse_parser.add_argument(
+        "--section", action="append", default=None, help="Only parse this bugreport section (repeatable)"
+    )
+    parse_parser.add_argument("--sections-index", help="Sections index json written by collect (optional)")
+    parse_parser.add_argument(
+        "--format", choices=RECORD_FORMATS, default="jsonl", help="Records format (default jsonl)"
+    )
 
     analyze_parser = subparsers.add_parser("analyze", help="Generate findings.json from records")
     analyze_parser.add_argument("records", help="Path to records jsonl")
     analyze_parser.add_argument("findings", help="Output findings json")
+    analyze_parser.add_argument("--sections-index", help="Sections index json written by collect (optional)")
+    analyze_parser.add_argument(
+        "--format", choices=RECORD_FORMATS, default="jsonl", help="Records format (default jsonl)"
+    )
+    analyze_parser.add_argument("--l1-events", help="Also write L1 (ADB connection/auth) events jsonl here")
+    analyze_parser.add_argument("--timeline", help="Also write the sliding-window φ1–φ4/S timeline jsonl here")
+    analyze_parser.add_argument(
+        "--window", type=float, default=60.0, help="Window length in seconds (L1 strengths, timeline)"
+    )
+    analyze_parser.add_argument("--step", type=float, default=None, help="Timeline step in seconds (default: window)")
+
+    query_parser = subparsers.add_parser("query", help="Query a records database written by parse --format sqlite")
+    query_parser.add_argument("database", help="Path to records sqlite database")
+    query_parser.add_argument("--tag", action="append", default=[], help="Tag to keep (repeatable)")
+    query_parser.add_argument("--level", action="append", default=[], help="Level to keep (repeatable)")
+    query_parser.add_argument("--pid", type=int, default=None, help="Process id")
+    query_parser.add_argument("--tid", type=int, default=None, help="Thread id")
+    query_parser.add_argument("--from", dest="start", help="Start time [MM-DD ]HH:MM[:SS[.mmm]] (inclusive)")
+    query_parser.add_argument("--to", dest="end", help="End time [MM-DD ]HH:MM[:SS[.mmm]] (inclusive)")
+    query_parser.add_argument("--match", help="Full-text query on msg (FTS5 syntax)")
+    query_parser.add_argument("--limit", type=int, default=None, help="Maximum number of records")
+    query_parser.add_argument("--json", action="store_true", help="Print records as jsonl instead of raw lines")
 
     report_parser = subparsers.add_parser("report", help="Render report markdown")
     report_parser.add_argument("findings", help="Path to findings json")
@@ -97,6 +250,50 @@ def pipeline_main(argv=None):
     pipeline_parser.add_argument("workdir", help="Working directory for pipeline outputs")
     pipeline_parser.add_argument("serial", help="Device serial")
     pipeline_parser.add_argument("model", nargs="?", default=None, help="Device model (optional)")
+    pipeline_parser.add_argument("--workers", type=int, default=None, help="Parallel parse workers (0 = CPU count)")
+    pipeline_parser.add_argument(
+        "--section", action="append", default=None, help="Only parse this bugreport section (repeatable)"
+    )
+    pipeline_parser.add_argument(
+        "--format", choices=RECORD_FORMATS, default="jsonl", help="Records format (default jsonl)"
+    )
+    pipeline_parser.add_argument(
+        "--cache-dir", default=None, help="Reuse parse/analyze outputs from this stage cache (enables caching)"
+    )
+    pipeline_parser.add_argument(
+        "--artifact", action="append", default=[], help="Extra log capture (logcat/dmesg) to parse and analyze"
+    )
+    pipeline_parser.add_argument(
+        "--jobs", type=int, default=None, help="Stages to run concurrently (0 = CPU count, default 1)"
+    )
+    pipeline_parser.add_argument("--force", action="store_true", help="Rerun every stage even if up to date")
+    pipeline_parser.add_argument(
+        "--all-members", action="store_true", help="Parse every text member of a bugreport zip, not just the main one"
+    )
+
+    cache_parser = subparsers.add_parser("cache", help="Inspect or prune the stage cache")
+    cache_parser.add_argument("action", choices=("stats", "prune"), help="stats: usage summary; prune: evict LRU")
+    cache_parser.add_argument("--cache-dir", default=STAGE_CACHE_DIR, help="Stage cache directory")
+    cache_parser.add_argument("--max-bytes", default=None, help="Size to prune down to, e.g. 512M (default: limit)")
+
+    fleet_parser = subparsers.add_parser("fleet", help="Collect logs from many adb devices concurrently")
+    fleet_parser.add_argument("out_dir", help="Output directory (one subdirectory per device + fleet.json)")
+    fleet_parser.add_argument(
+        "--devices", help="Device list: adb devices -l output or one serial per line (default: adb devices -l)"
+    )
+    fleet_parser.add_argument("--jobs", type=int, default=4, help="Devices collected at a time (default 4)")
+    fleet_parser.add_argument("--per-hub", type=int, default=2, help="Devices collected at a time per USB hub")
+    fleet_parser.add_argument("--retries", type=int, default=2, help="Retries on transient adb failures")
+    fleet_parser.add_argument("--duration", type=int, default=None, help="Per-command timeout in seconds")
+    fleet_parser.add_argument("--dmesg", action="store_true", help="Also capture dmesg")
+    fleet_parser.add_argument("--bugreport", action="store_true", help="Also capture adb bugreport")
+    fleet_parser.add_argument("--binary", action="store_true", help="Capture binary logcat (-B) instead of text")
+    fleet_parser.add_argument(
+        "--resume", action="store_true", help="Only capture logcat entries newer than the previous --resume run"
+    )
+    fleet_parser.add_argument(
+        "--adb-backend", choices=ADB_BACKENDS, default=None, help="process: adb client; socket: adb server protocol"
+    )
 
     args = parser.parse_args(argv)
 
@@ -105,17 +302,99 @@ def pipeline_main(argv=None):
         artifact = collect_existing_artifact(args.bugreport, device, args.artifacts_dir)
         index_path = Path(args.artifacts_dir) / "artifacts.json"
         write_artifacts_index([artifact], index_path)
+        write_sections_index(
+            args.bugreport, sections_index_path(args.artifacts_dir, args.bugreport), sha256=artifact.sha256
+        )
         print(f"Artifacts indexed at {index_path}")
         return
 
     if args.command == "parse":
-        parse_bugreport_lines(args.bugreport, args.records, source=args.source)
+        workers = resolve_workers(args.workers)
+        if args.section:
+            spans = section_spans_for(args.bugreport, args.section, args.sections_index)
+            parse_bugreport_stream(args.bugreport, args.records, source=args.source, spans=spans, fmt=args.format)
+        elif (
+            workers > 1
+            and args.format == "jsonl"
+            and not is_archive(args.bugreport)
+            and not is_binary_logcat(args.bugreport)
+        ):
+            parse_bugreport_parallel(args.bugreport, args.records, source=args.source, workers=workers)
+        else:
+            parse_bugreport_stream(args.bugreport, args.records, source=args.source, fmt=args.format)
         print(f"Records written to {args.records}")
         return
 
     if args.command == "analyze":
-        summarize_records(args.records, args.findings)
+        summarize_records(args.records, args.findings, sections_index=args.sections_index, fmt=args.format)
         print(f"Findings written to {args.findings}")
+        if args.l1_events:
+            count = write_l1_events(args.records, args.l1_events, fmt=args.format, window=args.window)
+            print(f"{count} L1 events written to {args.l1_events}")
+        if args.timeline:
+            count = write_score_timeline(
+                args.records, args.timeline, fmt=args.format, length=args.window, step=args.step
+            )
+            print(f"{count} scored windows written to {args.timeline}")
+        return
+
+    if args.command == "query":
+        with RecordDatabase(args.database) as database:
+            records = database.query(
+                tags=args.tag,
+                pid=args.pid,
+                tid=args.tid,
+                levels=args.level,
+                start=args.start,
+                end=args.end,
+                match=args.match,
+                limit=args.limit,
+            )
+            for record in records:
+                sys.stdout.write((dump_jsonl_line(record) if args.json else record.raw) + "\n")
+        return
+
+    if args.command == "cache":
+        cache = StageCache(args.cache_dir)
+        if args.action == "prune":
+            limit = parse_size(args.max_bytes) if args.max_bytes is not None else None
+            removed = cache.prune(limit)
+            print(f"Removed {removed} cache entries")
+        stats = cache.stats()
+        print(f"Cache: {stats['root']}")
+        print(f"Entries: {stats['entries']}, {stats['bytes']} bytes (limit {stats['max_bytes']} bytes)")
+        for stage, bucket in sorted(stats["stages"].items()):
+            print(f"  {stage}: {bucket['entries']} entries, {bucket['bytes']} bytes")
+        return
+
+    if args.command == "fleet":
+        if args.devices:
+            devices = parse_devices(Path(args.devices).read_text(encoding="utf-8"))
+        else:
+            devices = list_devices()
+        if not devices:
+            raise RuntimeError("no devices ready for collection")
+        manifest_path = collect_fleet(
+            devices,
+            Path(args.out_dir),
+            max_parallel=args.jobs,
+            per_hub=args.per_hub,
+            retries=args.retries,
+            duration=args.duration,
+            include_dmesg=args.dmesg,
+            include_bugreport=args.bugreport,
+            backend=args.adb_backend,
+            resume=args.resume,
+            binary=args.binary,
+        )
+        entries = read_json(manifest_path)["devices"]
+        for entry in entries:
+            details = f"{entry['status']} after {entry['attempts']} attempt(s), {entry['wall_time']:.2f}s"
+            print(f"  {entry['serial']}: {details}" + (f" ({entry['error']})" if entry["error"] else ""))
+        print(f"Fleet manifest written to {manifest_path}")
+        failed = [entry["serial"] for entry in entries if entry["status"] != "ok"]
+        if failed:
+            raise RuntimeError(f"collection failed for {', '.join(failed)}")
         return
 
     if args.command == "report":
@@ -125,19 +404,26 @@ def pipeline_main(argv=None):
 
     if args.command == "pipeline":
         workdir = Path(args.workdir)
-        device = DeviceInfo(serial=args.serial, model=args.model)
-        artifacts_dir = workdir / "collect"
-        records_dir = workdir / "parse"
-        findings_path = workdir / "analyze" / "findings.json"
-        report_path = workdir / "report" / "report.md"
-
-        artifact = collect_existing_artifact(args.bugreport, device, artifacts_dir)
-        artifacts_index = artifacts_dir / "artifacts.json"
-        write_artifacts_index([artifact], artifacts_index)
-
-        records_paths = parse_artifacts_to_records([args.bugreport], records_dir)
-        if records_paths:
-            summarize_records(records_paths[0], findings_path)
-        render_report_markdown(findings_path, report_path, artifacts_path=artifacts_index)
-        print(f"Pipeline finished, report at {report_path}")
+        cache_dir = args.cache_dir or (STAGE_CACHE_DIR if STAGE_CACHE else None)
+        nodes = build_pipeline_nodes(
+            Path(args.bugreport),
+            workdir,
+            args.serial,
+            args.model,
+            extra_artifacts=[Path(path) for path in args.artifact],
+            fmt=args.format,
+            sections=args.section,
+            workers=resolve_workers(args.workers),
+            cache_dir=cache_dir,
+            all_members=args.all_members,
+        )
+        results = run_dag(nodes, jobs=resolve_workers(args.jobs), force=args.force, stats_path=workdir / "stats.json")
+        for result in results:
+            details = f" {result.wall_time:.2f}s" if result.status == "ran" else ""
+            if result.max_rss_kb is not None and result.status == "ran":
+                details += f", peak rss {result.max_rss_kb} KB"
+            if result.note:
+                details += f", {result.note}"
+            print(f"  {result.name}: {result.status}{details}")
+        print(f"Pipeline finished, report at {workdir / 'report' / 'report.md'}")
         return
@@ -26,6 +26,30 @@ WARN_ON_MISSING_RULES = os.environ.get("MYBUGREPORT_WARN_ON_MISSING_RULES", "").
 # Optional output consistency check (default off) to validate generated files in strict scenarios
 CHECK_OUTPUT_NONEMPTY = os.environ.get("MYBUGREPORT_CHECK_OUTPUT_NONEMPTY", "").lower() in {"1", "true", "yes"}
 
+# Optional fused legacy pipeline (default off): one read of the input, translation applied on the fly
+FUSED_PIPELINE = os.environ.get("MYBUGREPORT_FUSED_PIPELINE", "").lower() in {"1", "true", "yes"}
+
+# Optional multi-section extraction (default off): honor every rule2 line and repeated sections
+MULTI_SECTION = os.environ.get("MYBUGREPORT_MULTI_SECTION", "").lower() in {"1", "true", "yes"}
+
+# Optional timestamp offset index (default off): sidecar index reused across legacy CLI lookups
+TIMESTAMP_INDEX = os.environ.get("MYBUGREPORT_TIMESTAMP_INDEX", "").lower() in {"1", "true", "yes"}
+
+# Optional section scope (default empty): comma-separated bugreport section names rule2 extraction is limited to
+SECTION_SCOPE = [name.strip() for name in os.environ.get("MYBUGREPORT_SECTION_SCOPE", "").split(",") if name.strip()]
+
+# Optional stage cache for the pipeline subcommand (default off): unchanged inputs reuse parse/analyze outputs
+STAGE_CACHE = os.environ.get("MYBUGREPORT_STAGE_CACHE", "").lower() in {"1", "true", "yes"}
+STAGE_CACHE_DIR = os.environ.get("MYBUGREPORT_CACHE_DIR", "") or os.path.join(
+    os.path.expanduser("~"), ".cache", "mybugreport"
+)
+STAGE_CACHE_MAX_BYTES = int(os.environ.get("MYBUGREPORT_CACHE_MAX_BYTES", "") or 2 << 30)
+
+# Optional concurrent adb collection (default off): getprops batched, captures run in parallel
+CONCURRENT_COLLECT = os.environ.get("MYBUGREPORT_CONCURRENT_COLLECT", "").lower() in {"1", "true", "yes"}
+
+# adb backend for collection: "process" (run the adb client, default) or "socket" (adb server protocol)
+ADB_BACKEND = os.environ.get("MYBUGREPORT_ADB_BACKEND", "").lower() or "process"
 
 def log_debug(message: str) -> None:
     """Minimal debug logger (no-op by default).
@@ -0,0 +1,252 @@
+"""
+In-process replacement for ``grep -A N -B N -e PAT ...``.
+
+Patterns are GNU grep basic regular expressions and are translated once into a
+compiled bytes pattern.  The input is scanned in large blocks: the regex engine
+searches each block directly and only the lines around a match are sliced out,
+so the per-line Python overhead applies to printed lines only.  Before-context
+that crosses a block boundary is served from a small ring buffer.
+"""
+
+import re
+from collections import deque
+from functools import lru_cache
+from typing import BinaryIO, Deque, Iterable, Iterator, List, Optional, Pattern, Sequence, Tuple
+
+from .config import log_debug
+from .posix_regex import bre_to_python
+
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024
+GROUP_SEPARATOR = b"--\n"
+
+
+@lru_cache(maxsize=32)
+def compile_patterns(patterns: Tuple[str, ...]) -> Pattern[bytes]:
+    """Compile grep ``-e`` patterns into one multi-line bytes regex (cached)."""
+    if not patterns:
+        return re.compile(b"(?!)")  # no pattern selects no line
+    alternatives = "|".join(f"(?:{bre_to_python(p)})" for p in patterns)
+    log_debug(f"Compiled context patterns: {alternatives}")
+    return re.compile(alternatives.encode("utf-8"), re.MULTILINE)
+
+
+def iter_line_blocks(handle: BinaryIO, block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[bytes]:
+    """Yield chunks of whole lines; a missing final newline is added like grep does."""
+    carry = b""
+    while True:
+        chunk = handle.read(block_size)
+        if not chunk:
+            break
+        data = carry + chunk if carry else chunk
+        cut = data.rfind(b"\n") + 1
+        if cut == 0:
+            carry = data
+            continue
+        carry = data[cut:]
+        yield data[:cut]
+    if carry:
+        yield carry + b"\n"
+
+
+class ContextExtractor:
+    """Stateful ``grep -B/-A`` emulation fed with blocks of whole lines.
+
+    ``feed`` yields output lines (including ``--`` group separators) for each
+    block; ``finish`` is a no-op kept for symmetry with other block consumers.
+    """
+
+    def __init__(self, pattern: Pattern[bytes], before: int, after: int):
+        if before < 0 or after < 0:
+            raise ValueError("context line counts must be non-negative")
+        self.pattern = pattern
+        self.before = before
+        self.after = after
+        self._tail: Deque[bytes] = deque(maxlen=before or 1)
+        self._base = 0  # global number of the first line of the current block
+        self._last_printed = -1
+        self._after_until = -1
+        self.matches = 0
+
+    def _emit_after(self, buf: bytes, print_pos: int, upto: int) -> Iterator[Tuple[bytes, int]]:
+        target = min(self._after_until, upto)
+        while self._last_printed < target:
+            end = buf.index(b"\n", print_pos) + 1
+            yield buf[print_pos:end], end
+            print_pos = end
+            self._last_printed += 1
+
+    def _before_lines(self, buf: bytes, line_start: int, lineno: int) -> List[bytes]:
+        count = lineno - max(lineno - self.before, self._last_printed + 1)
+        in_block = min(count, lineno - self._base)
+        starts = []
+        pos = line_start
+        for _ in range(in_block):
+            pos = buf.rfind(b"\n", 0, pos - 1) + 1
+            starts.append(pos)
+        lines = list(self._tail)[len(self._tail) - (count - in_block):] if count > in_block else []
+        bounds = list(reversed(starts)) + [line_start]
+        lines.extend(buf[bounds[k]:bounds[k + 1]] for k in range(len(starts)))
+        return lines
+
+    def feed(self, buf: bytes) -> Iterator[bytes]:
+        nlines = buf.count(b"\n")
+        size = len(buf)
+        pos, pos_line = 0, self._base
+        print_pos = 0  # start of the first line after the last printed one
+        scan = 0
+        search = self.pattern.search
+        while scan < size:
+            match = search(buf, scan)
+            if match is None:
+                break
+            line_start = buf.rfind(b"\n", 0, match.start()) + 1
+            if line_start >= size:
+                break  # empty match after the final newline
+            lineno = pos_line + buf.count(b"\n", pos, line_start)
+            pos, pos_line = line_start, lineno
+            line_end = buf.index(b"\n", line_start) + 1
+
+            for line, print_pos in self._emit_after(buf, print_pos, lineno - 1):
+                yield line
+            first = max(lineno - self.before, self._last_printed + 1)
+            if self._last_printed >= 0 and first > self._last_printed + 1:
+                yield GROUP_SEPARATOR
+            yield from self._before_lines(buf, line_start, lineno)
+            yield buf[line_start:line_end]
+            self.matches += 1
+            self._last_printed = lineno
+            self._after_until = lineno + self.after
+            print_pos = scan = line_end
+
+        for line, print_pos in self._emit_after(buf, print_pos, self._base + nlines - 1):
+            yield line
+        if self.before:
+            self._remember_tail(buf, nlines)
+        self._base += nlines
+
+    def _remember_tail(self, buf: bytes, nlines: int) -> None:
+        keep = min(self.before, nlines)
+        end = len(buf)
+        lines = []
+        for _ in range(keep):
+            start = buf.rfind(b"\n", 0, end - 1) + 1
+            lines.append(buf[start:end])
+            end = start
+        self._tail.extend(reversed(lines))
+
+    def finish(self) -> Iterator[bytes]:
+        return iter(())
+
+
+def iter_matching_lines(pattern: Pattern[bytes], buf: bytes, base: int = 0) -> Iterator[int]:
+    """Yield ``base + offset`` of the start of every line of ``buf`` that matches."""
+    size = len(buf)
+    scan = 0
+    search = pattern.search
+    while scan < size:
+        match = search(buf, scan)
+        if match is None:
+            return
+        line_start = buf.rfind(b"\n", 0, match.start()) + 1
+        if line_start >= size:
+            return
+        yield base + line_start
+        scan = buf.index(b"\n", line_start) + 1
+
+
+def _line_end(buf, line_start: int) -> int:
+    end = buf.find(b"\n", line_start)
+    return len(buf) if end == -1 else end + 1
+
+
+def _full_line(buf, start: int, end: int) -> bytes:
+    line = buf[start:end]
+    return line if line.endswith(b"\n") else line + b"\n"
+
+
+def iter_context_from_offsets(buf, offsets: Iterable[int], before: int, after: int) -> Iterator[bytes]:
+    """grep-style context output for known matching line offsets (ascending).
+
+    ``buf`` is any random-access bytes object over the whole input, typically
+    an ``mmap``; only the lines around each offset are touched.
+    """
+    size = len(buf)
+    last_end = -1  # offset just past the last printed line
+    pending = 0  # after-context lines still owed
+    for offset in offsets:
+        if offset < last_end:
+            continue
+        while pending and last_end < offset:
+            end = _line_end(buf, last_end)
+            yield _full_line(buf, last_end, end)
+            last_end = end
+            pending -= 1
+        start = offset
+        for _ in range(before):
+            if start == 0 or start <= last_end:
+                break
+            start = buf.rfind(b"\n", 0, start - 1) + 1
+        if last_end >= 0 and start > last_end:
+            yield GROUP_SEPARATOR
+        while start <= offset:
+            end = _line_end(buf, start)
+            yield _full_line(buf, start, end)
+            start = end
+        last_end = start
+        pending = after
+    while pending and 0 <= last_end < size:
+        end = _line_end(buf, last_end)
+        yield _full_line(buf, last_end, end)
+        last_end = end
+        pending -= 1
+
+
+def iter_context_lines(
+    handle: BinaryIO,
+    patterns: Sequence[str],
+    before: int,
+    after: int,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Iterator[bytes]:
+    """Yield grep-style context output for ``patterns`` read from ``handle``."""
+    extractor = ContextExtractor(compile_patterns(tuple(patterns)), before, after)
+    for block in iter_line_blocks(handle, block_size):
+        yield from extractor.feed(block)
+    yield from extractor.finish()
+
+
+def parse_context_lines(num_context_lines: Optional[str]) -> int:
+    """Validate the legacy ``context_lines`` argument (a non-negative integer string)."""
+    try:
+        value = int(str(num_context_lines).strip())
+    except ValueError:
+        raise ValueError(f"invalid context length argument: {num_context_lines!r}") from None
+    if value < 0:
+        raise ValueError(f"invalid context length argument: {num_context_lines!r}")
+    return value
+
+
+def stream_context_sections(
+    patterns: Iterable[str],
+    input_file: str,
+    num_context_lines: str,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Iterator[bytes]:
+    """Open ``input_file`` and yield context lines; see ``iter_context_lines``."""
+    context = parse_context_lines(num_context_lines)
+    with open(input_file, "rb") as handle:
+        yield from iter_context_lines(handle, list(patterns), context, context, block_size=block_size)
+
+
+__all__ = [
+    "ContextExtractor",
+    "GROUP_SEPARATOR",
+    "bre_to_python",
+    "compile_patterns",
+    "iter_context_from_offsets",
+    "iter_context_lines",
+    "iter_line_blocks",
+    "iter_matching_lines",
+    "parse_context_lines",
+    "stream_context_sections",
+]
@@ -31,12 +31,18 @@ Optional forensic-style analysis helpers (not wired into the CLI by default).
    - 规避：将节奏打散，但保留 L3/L4 子序列结构（枚举→改写/导出），配合 L2 的长会话时间窗与 L1 的高权限信道确认。
 """
 
+from array import array
 from dataclasses import dataclass, field
 from math import exp
-from typing import Dict, Iterable, Mapping, Sequence
+from typing import Any, Dict, Iterable, List, Mapping, Sequence
 
 from .config import log_debug
 
+try:
+    import numpy
+except ImportError:  # optional: batch scoring falls back to the array module
+    numpy = None  # type: ignore[assignment]
+
 
 @dataclass
 class EvidenceConfig:
@@ -111,6 +117,64 @@ def evaluate_score(score: float, thresholds: Thresholds = Thresholds()) -> str:
     return "normal"
 
 
+def compute_scores(
+    matrix: Any,
+    configs: Sequence[EvidenceConfig],
+    bias: float = 0.0,
+) -> Sequence[float]:
+    """
+    Batch ``compute_score``: ``matrix`` is windows × channels, column j holding
+    the signal of ``configs[j]``.  Returns S per row (a NumPy array when NumPy
+    is installed, else ``array('d')``), bit-identical to ``compute_score``:
+    the weighted terms are added in config order, the bias last, and the
+    sigmoid uses ``math.exp``.
+    """
+    weights = [cfg.weight for cfg in configs]
+    if numpy is not None:
+        values = numpy.asarray(matrix, dtype=float)
+        if values.size == 0:
+            values = values.reshape(0, len(weights))
+        if values.ndim != 2 or values.shape[1] != len(weights):
+            raise ValueError(f"expected a windows x {len(weights)} matrix, got shape {values.shape}")
+        weighted_sum = numpy.zeros(values.shape[0])
+        for column, weight in enumerate(weights):
+            signal = values[:, column]
+            # normalize_signal, NaN included: max(0.0, min(1.0, value))
+            signal = numpy.where(signal < 1.0, signal, 1.0)
+            weighted_sum += weight * numpy.where(signal > 0.0, signal, 0.0)
+        weighted_sum += bias
+        log_debug(f"batch of {values.shape[0]} windows, bias={bias}")
+        # numpy.exp may differ from math.exp in the last bit
+        exps = numpy.fromiter(map(exp, (-weighted_sum).tolist()), dtype=float, count=values.shape[0])
+        return 1.0 / (1.0 + exps)
+
+    scores = array("d")
+    for row in matrix:
+        if len(row) != len(weights):
+            raise ValueError(f"expected {len(weights)} signals per window, got {len(row)}")
+        weighted_sum = 0.0
+        for weight, value in zip(weights, row):
+            weighted_sum += weight * max(0.0, min(1.0, value))
+        weighted_sum += bias
+        scores.append(1.0 / (1.0 + exp(-weighted_sum)))
+    log_debug(f"batch of {len(scores)} windows, bias={bias}")
+    return scores
+
+
+def evaluate_scores(scores: Sequence[float], thresholds: Thresholds = Thresholds()) -> List[str]:
+    """
+    批量版 ``evaluate_score``：逐行返回分层标签。
+    """
+    if numpy is not None and isinstance(scores, numpy.ndarray):
+        labels = numpy.where(
+            scores >= thresholds.high,
+            "high_suspicion",
+            numpy.where(scores >= thresholds.medium, "warning", "normal"),
+        )
+        return labels.tolist()
+    return [evaluate_score(score, thresholds) for score in scores]
+
+
 # --- Feature group definitions (for documentation and optional future use) ---
 FEATURE_GROUPS: Sequence[FeatureGroup] = [
     FeatureGroup(
@@ -174,6 +238,20 @@ def fuse_signals(
     return {"score": score, "label": label}
 
 
+def fuse_signals_batch(
+    matrix: Any,
+    configs: Sequence[EvidenceConfig],
+    bias: float = 0.0,
+    thresholds: Thresholds = Thresholds(),
+) -> Dict[str, Any]:
+    """
+    ``fuse_signals`` 的批量版：矩阵每行一个时间窗，列顺序与 ``configs`` 一致；
+    返回 {"scores": 各行 S, "labels": 各行分层标签}。
+    """
+    scores = compute_scores(matrix, configs, bias=bias)
+    return {"scores": scores, "labels": evaluate_scores(scores, thresholds)}
+
+
 def run_analysis(
     signals: Mapping[str, float],
     configs: Iterable[EvidenceConfig],
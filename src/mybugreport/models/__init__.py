@@ -1,8 +1,11 @@
 """Data models for the myBugReport pipeline (JSON-serializable)."""
 
-from dataclasses import dataclass, field
+import sys
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
+
+_intern = sys.intern
 
 
 @dataclass
@@ -40,6 +43,111 @@ class LogRecord:
     msg: str
     raw: str
     source: str
+    pid: Optional[int] = None  # 新增：进程号（threadtime/brief 可解析时填充）
+    tid: Optional[int] = None  # 新增：线程号（仅 threadtime）
+
+
+def _shared_int(value: Optional[int]) -> Optional[int]:
+    """pid/tid 去重：相同数值共享同一个 int 对象（缓存有上限）。"""
+    if value is None:
+        return None
+    shared = _INT_CACHE.get(value)
+    if shared is None:
+        if len(_INT_CACHE) >= _INT_CACHE_LIMIT:
+            return value
+        shared = _INT_CACHE[value] = value
+    return shared
+
+
+_INT_CACHE: Dict[int, int] = {}
+_INT_CACHE_LIMIT = 1 << 12
+
+
+class CompactLogRecord:
+    """紧凑版 LogRecord：__slots__ 存储、tag/level/source 驻留（intern），pid/tid 共享，
+    ts/msg 以 raw 内偏移保存（分别为 raw 的前缀与后缀）。
+
+    序列化结果（to_dict）与 LogRecord 的 asdict 完全一致。
+    """
+
+    __slots__ = ("level", "tag", "raw", "source", "pid", "tid", "_ts", "_msg")
+
+    def __init__(
+        self,
+        ts: Optional[str],
+        level: Optional[str],
+        tag: Optional[str],
+        msg: str,
+        raw: str,
+        source: str,
+        pid: Optional[int] = None,
+        tid: Optional[int] = None,
+    ):
+        self.level = None if level is None else _intern(level)
+        self.tag = None if tag is None else _intern(tag)
+        self.raw = raw
+        self.source = _intern(source)
+        self.pid = _shared_int(pid)
+        self.tid = _shared_int(tid)
+        # ts is normally the head of raw and msg its tail: keep only the offsets
+        self._ts: Union[int, str, None] = len(ts) if ts is not None and raw.startswith(ts) else ts
+        self._msg: Union[int, str] = len(raw) - len(msg) if raw.endswith(msg) else msg
+
+    @property
+    def ts(self) -> Optional[str]:
+        ts = self._ts
+        return self.raw[:ts] if ts.__class__ is int else ts
+
+    @property
+    def msg(self) -> str:
+        msg = self._msg
+        return self.raw[msg:] if msg.__class__ is int else msg
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ts": self.ts,
+            "level": self.level,
+            "tag": self.tag,
+            "msg": self.msg,
+            "raw": self.raw,
+            "source": self.source,
+            "pid": self.pid,
+            "tid": self.tid,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CompactLogRecord":
+        return cls(**data)
+
+    @classmethod
+    def from_record(cls, record: "LogRecord") -> "CompactLogRecord":
+        return cls(**asdict(record))
+
+    def to_record(self) -> "LogRecord":
+        return LogRecord(**self.to_dict())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (CompactLogRecord, LogRecord)):
+            other_dict = other.to_dict() if isinstance(other, CompactLogRecord) else asdict(other)
+            return self.to_dict() == other_dict
+        return NotImplemented
+
+    __hash__ = None  # mutable, like the dataclass
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{key}={value!r}" for key, value in self.to_dict().items())
+        return f"CompactLogRecord({fields})"
+
+
+@dataclass
+class BugreportSection:
+    """bugreport 段落索引项（名称、命令与字节区间 [start, end)）。"""
+
+    name: str
+    start: int
+    end: int
+    command: Optional[str] = None
+    kind: str = "section"  # section: ------ NAME (cmd) ------；service: DUMP OF SERVICE name
 
 
 @dataclass
@@ -71,6 +179,8 @@ __all__ = [
     "DeviceInfo",
     "CollectArtifact",
     "LogRecord",
+    "CompactLogRecord",
+    "BugreportSection",
     "Finding",
     "ReportData",
 ]
@@ -0,0 +1,194 @@
+"""
+Parallel chunked processing for multi-GB inputs.
+
+The input is split at line boundaries into byte ranges that worker processes
+scan independently.  Workers only report *where* things match (line offsets),
+so state that spans chunk edges -- context windows, open rule2 sections -- is
+resolved afterwards in the parent from those offsets.  Translation, which is
+line-local, runs in the pool again and results are merged in input order.
+The output is identical to the serial paths.
+"""
+
+import os
+import sys
+from array import array
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from mmap import ACCESS_READ, mmap
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from .config import debug_iterable, log_debug
+from .context_extractor import compile_patterns, iter_context_from_offsets, iter_matching_lines, parse_context_lines
+from .hooks import apply_hooks
+from .io_utils import check_output_nonempty
+from .processor import OutputTranslator, legacy_date_patterns
+from .sections import AwkSectionScanner, resolve_section_spans
+from .translation import compile_translations
+
+DEFAULT_CHUNK_SIZE = 32 * 1024 * 1024
+TRANSLATE_BATCH_BYTES = 1024 * 1024
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """Normalize a ``--workers`` value: ``0`` means one per CPU, ``None``/``1`` serial."""
+    if workers is None:
+        return 1
+    if workers < 0:
+        raise ValueError("workers must be >= 0")
+    return workers or (os.cpu_count() or 1)
+
+
+def split_line_ranges(path: str, parts: int, min_chunk: int = 1024 * 1024) -> List[Tuple[int, int]]:
+    """Split ``path`` into at most ``parts`` byte ranges that start at line starts."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    target = max(min_chunk, -(-size // max(1, parts)))
+    ranges: List[Tuple[int, int]] = []
+    with open(path, "rb") as handle:
+        start = 0
+        while start < size:
+            cut = start + target
+            if cut >= size:
+                ranges.append((start, size))
+                break
+            handle.seek(cut)
+            handle.readline()  # advance to the next line start
+            end = handle.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def ordered_map(executor: Executor, func: Callable[[T], R], items: Iterable[T], window: int) -> Iterator[R]:
+    """``executor.map`` that keeps at most ``window`` tasks in flight (bounded memory)."""
+    pending: Deque = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def read_range(path: str, start: int, end: int) -> bytes:
+    """Read ``[start, end)``; a last line without newline gets one, as in the serial scan."""
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        data = handle.read(end - start)
+    if data and not data.endswith(b"\n"):
+        data += b"\n"
+    return data
+
+
+_ScanTask = Tuple[str, int, int, Tuple[str, ...], Tuple[Tuple[str, str], ...]]
+_ScanResult = Tuple["array[int]", List[Tuple["array[int]", "array[int]"]]]
+
+
+def _scan_chunk(task: _ScanTask) -> _ScanResult:
+    path, start, end, patterns, section_rules = task
+    buf = read_range(path, start, end)
+    matches = array("Q", iter_matching_lines(compile_patterns(patterns), buf, start))
+    events = [AwkSectionScanner(rule_start, rule_end).line_events(buf, start) for rule_start, rule_end in section_rules]
+    return matches, events
+
+
+_worker_translator: Optional[OutputTranslator] = None
+
+
+def _init_translator(replacements: Dict[str, str]) -> None:
+    global _worker_translator
+    _worker_translator = OutputTranslator(compile_translations(replacements))
+
+
+def _translate_batch(data: bytes) -> bytes:
+    assert _worker_translator is not None, "pool initializer did not run"
+    return _worker_translator(data)
+
+
+def _batches(lines: Iterable[bytes], limit: int = TRANSLATE_BATCH_BYTES) -> Iterator[bytes]:
+    batch: List[bytes] = []
+    size = 0
+    for line in lines:
+        batch.append(line)
+        size += len(line)
+        if size >= limit:
+            yield b"".join(batch)
+            batch, size = [], 0
+    if batch:
+        yield b"".join(batch)
+
+
+def _iter_span_lines(buf, spans: Sequence[Tuple[int, int]]) -> Iterator[bytes]:
+    for start, end in spans:
+        while start < end:
+            stop = buf.find(b"\n", start, end)
+            stop = end if stop == -1 else stop + 1
+            line = buf[start:stop]
+            yield line if line.endswith(b"\n") else line + b"\n"
+            start = stop
+
+
+def run_parallel_pipeline(
+    dates: Iterable[str],
+    input_file: str,
+    output_file: str,
+    num_context_lines: str,
+    section_rules: Sequence[Tuple[str, str]],
+    replacements: Dict[str, str],
+    workers: int,
+    post_processors: Optional[Iterable[Callable[[str], None]]] = None,
+    repeat_sections: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> None:
+    """Legacy CLI output computed with a process pool; identical to the serial flow."""
+    context = parse_context_lines(num_context_lines)
+    patterns = tuple(legacy_date_patterns(dates))
+    debug_iterable("date_patterns", patterns)
+    rules = tuple((start, end) for start, end in section_rules if start and end)
+
+    with open(output_file, "wb") as outfile:
+        if not os.path.exists(input_file):
+            sys.stderr.write(f"[WARN] input file not found: {input_file}\n")
+        elif os.path.getsize(input_file):
+            size = os.path.getsize(input_file)
+            parts = max(workers, -(-size // chunk_size))
+            ranges = split_line_ranges(input_file, parts, min_chunk=min(chunk_size, 1024 * 1024))
+            log_debug(f"Parallel scan of {input_file}: {len(ranges)} chunks, {workers} workers")
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_translator, initargs=(dict(replacements),)
+            ) as executor:
+                tasks = [(input_file, start, end, patterns, rules) for start, end in ranges]
+                matches = array("Q")
+                events: List[Tuple[List[int], List[int]]] = [([], []) for _ in rules]
+                for chunk_matches, chunk_events in ordered_map(executor, _scan_chunk, tasks, 2 * workers):
+                    matches.extend(chunk_matches)
+                    for idx, (starts, ends) in enumerate(chunk_events):
+                        events[idx][0].extend(starts)
+                        events[idx][1].extend(ends)
+                spans = resolve_section_spans(events, size, repeat=repeat_sections)
+
+                with open(input_file, "rb") as handle, mmap(handle.fileno(), 0, access=ACCESS_READ) as buf:
+                    output_lines = iter_context_from_offsets(buf, matches, context, context)
+                    for data in ordered_map(executor, _translate_batch, _batches(output_lines), 2 * workers):
+                        outfile.write(data)
+                    for data in ordered_map(
+                        executor, _translate_batch, _batches(_iter_span_lines(buf, spans)), 2 * workers
+                    ):
+                        outfile.write(data)
+
+    log_debug("Finished parallel extraction, translations and time conversions")
+    apply_hooks(output_file, post_processors)
+    check_output_nonempty(output_file)
+
+
+__all__ = [
+    "ordered_map",
+    "read_range",
+    "resolve_workers",
+    "run_parallel_pipeline",
+    "split_line_ranges",
+]
@@ -1,16 +1,65 @@
 """Analyze stage skeleton: derive findings from normalized records."""
 
 from pathlib import Path
-from typing import List
+from typing import Iterator, List, Optional, Sequence, Union
 
-from ...models import Finding
-from ...utils import read_jsonl, write_json
+from ...models import CompactLogRecord, Finding
+from ...utils import ColumnarRecords, RecordDatabase, iter_jsonl, read_json, write_json, write_jsonl
+from .l1_extractor import DEFAULT_WINDOW, extract_l1, seconds_ts
+from .window_score import score_timeline
 
+# Bump whenever the findings derived from the same records change (stage cache key).
+ANALYZER_VERSION = "1"
 
-def summarize_records(records_path: Path, output_path: Path) -> List[Finding]:
-    records = read_jsonl(Path(records_path))
-    count = len(records)
+
+def iter_log_records(records_path: Path, fmt: str = "jsonl") -> Iterator[CompactLogRecord]:
+    """Stream records back as compact records (interned tags, msg as a slice of raw)."""
+    if fmt == "columnar":
+        with ColumnarRecords(Path(records_path)) as store:
+            yield from store
+        return
+    if fmt == "sqlite":
+        with RecordDatabase(Path(records_path)) as database:
+            yield from database.query()
+        return
+    for item in iter_jsonl(Path(records_path)):
+        yield CompactLogRecord.from_dict(item)
+
+
+def count_records(records_path: Path, fmt: str = "jsonl") -> int:
+    """Number of records; the columnar header has it without reading any column."""
+    if fmt == "columnar":
+        with ColumnarRecords(Path(records_path)) as store:
+            return len(store)
+    if fmt == "sqlite":
+        with RecordDatabase(Path(records_path)) as database:
+            return len(database)
+    return sum(1 for _ in iter_jsonl(Path(records_path)))
+
+
+def summarize_records(
+    records_path: Union[Path, Sequence[Path]],
+    output_path: Path,
+    sections_index: Optional[Path] = None,
+    fmt: str = "jsonl",
+) -> List[Finding]:
+    """Baseline finding; with ``sections_index`` the per-section byte sizes are added as
+    evidence straight from the sidecar, without reading the bugreport.
+
+    Several records files (one per artifact) are counted together, with a
+    per-file breakdown in the evidence.
+    """
+    paths = [Path(records_path)] if isinstance(records_path, (str, Path)) else [Path(p) for p in records_path]
+    counts = {path.name: count_records(path, fmt) for path in paths}
+    count = sum(counts.values())
     evidence = {"records": count}
+    if len(paths) > 1:
+        evidence["files"] = counts
+    if sections_index is not None and Path(sections_index).exists():
+        sections = read_json(Path(sections_index)).get("sections", [])
+        evidence["sections"] = {
+            item["name"]: item["end"] - item["start"] for item in sections if item.get("kind") == "section"
+        }
     confidence = 0.0 if count == 0 else min(1.0, 0.2 + 0.05 * count)
     finding = Finding(
         rule_id="baseline.count",
@@ -23,4 +72,70 @@ def summarize_records(records_path: Path, output_path: Path) -> List[Finding]:
     return [finding]
 
 
-__all__ = ["summarize_records"]
+def write_l1_events(
+    records_path: Union[Path, Sequence[Path]],
+    output_path: Path,
+    fmt: str = "jsonl",
+    window: float = DEFAULT_WINDOW,
+) -> int:
+    """Stream the L1 (ADB connection/auth) observations of each records file to
+    ``output_path`` as jsonl, each with the windowed strengths after it; returns
+    the number written.  Files are separate captures, so each gets its own window state.
+    """
+    paths = [Path(records_path)] if isinstance(records_path, (str, Path)) else [Path(p) for p in records_path]
+
+    def rows():
+        for path in paths:
+            for sample in extract_l1(iter_log_records(path, fmt), window):
+                event = sample.event
+                yield {
+                    "file": path.name,
+                    "ts": event.ts,
+                    "seconds": sample.seconds,
+                    "feature": event.feature,
+                    "value": event.value,
+                    "tag": event.tag,
+                    "msg": event.msg,
+                    "strengths": sample.strengths,
+                }
+
+    return write_jsonl(rows(), Path(output_path))
+
+
+def write_score_timeline(
+    records_path: Union[Path, Sequence[Path]],
+    output_path: Path,
+    fmt: str = "jsonl",
+    length: float = DEFAULT_WINDOW,
+    step: Optional[float] = None,
+) -> int:
+    """Stream the sliding-window φ1–φ4 and S of each records file to ``output_path``
+    as jsonl; returns the number of windows written.  Like ``write_l1_events``,
+    every file is scored on its own.
+    """
+    paths = [Path(records_path)] if isinstance(records_path, (str, Path)) else [Path(p) for p in records_path]
+
+    def rows():
+        for path in paths:
+            for window in score_timeline(iter_log_records(path, fmt), length, step):
+                yield {
+                    "file": path.name,
+                    "start": seconds_ts(window.start),
+                    "end": seconds_ts(window.end),
+                    "groups": window.groups,
+                    "score": window.score,
+                    "label": window.label,
+                    "features": window.features,
+                }
+
+    return write_jsonl(rows(), Path(output_path))
+
+
+__all__ = [
+    "ANALYZER_VERSION",
+    "count_records",
+    "iter_log_records",
+    "summarize_records",
+    "write_l1_events",
+    "write_score_timeline",
+]
@@ -0,0 +1,200 @@
+"""Streaming extractor for the L1 (ADB connection/auth) sub-features.
+
+``forensic_analysis.FEATURE_GROUPS`` names four L1 sub-features; this module
+derives them from log records:
+
+- ``has_adbd_auth``: adbd / AdbDebuggingManager report a host key accepted or
+  the device online (an event).
+- ``functions_has_adb``: the USB functions include adb (``sys.usb.config`` /
+  ``sys.usb.state`` property changes, UsbDeviceManager config lines).
+- ``adbd_root_hint``: adbd runs as root (``service.adb.root``, "restarting
+  adbd as root").
+- ``adb_over_tcp_hint``: adbd listens on TCP (``service.adb.tcp.port``,
+  "restarting in TCP mode", adb wifi).
+
+The last three are states: they hold until a line turns them off.  The
+strength of a sub-feature at time t is 1.0 when it was on at any point of
+the window (t - T, t], else 0.0; φ1 is the mean of the four.  The extractor
+keeps a fixed amount of state per sub-feature, so memory does not grow with
+the input and records can come from a full capture or a live stream.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ...forensic_analysis import FEATURE_GROUPS
+
+L1_GROUP = next(group for group in FEATURE_GROUPS if group.name.startswith("L1"))
+L1_FEATURES: Tuple[str, ...] = tuple(L1_GROUP.sub_features)
+DEFAULT_WINDOW = 60.0
+EVENT_FEATURES = frozenset({"has_adbd_auth"})
+
+# Cheap gate before any pattern runs: the tags that log these changes, or "adb" in the text
+_AUTH_TAGS = frozenset({"adbd", "AdbDebuggingManager", "AdbService"})
+_TAGS = _AUTH_TAGS | {"UsbDeviceManager", "init"}
+_AUTH_RE = re.compile(
+    r"adbd_auth_confirm|public key|key (?:accepted|authorized)|auth(?:entication)? (?:ok|succeeded)"
+    r"|\bonline\b|adb connection (?:established|opened)",
+    re.IGNORECASE,
+)
+_AUTH_FAIL_RE = re.compile(r"fail|reject|denied|revoke", re.IGNORECASE)
+# "name=value", "name: value", "setprop name value", "'name' to 'value'"
+_SET = r"['\"]?(?:\s*[=:]\s*|\s+(?:to\s+)?)['\"]?"
+_USB_PROP_RE = re.compile(r"(?:persist\.)?sys\.usb\.(?:config|state)" + _SET + r"([\w,]+)")
+_USB_CONFIG_RE = re.compile(r"(?:USB config to|[Ff]unctions?\s*[=:]\s*|setCurrentFunctions\()\s*([\w,]+)")
+_ROOT_PROP_RE = re.compile(r"service\.adb\.root" + _SET + r"(\d)")
+_ROOT_ON_RE = re.compile(r"restarting adbd as root|adbd is already running as root", re.IGNORECASE)
+_ROOT_OFF_RE = re.compile(r"as non root|cannot run as root", re.IGNORECASE)
+_TCP_PROP_RE = re.compile(r"(?:service|persist)\.adb\.tcp\.port" + _SET + r"(-?\d+)")
+_TCP_ON_RE = re.compile(r"restarting in TCP mode|listening on tcp:|adb ?wifi (?:enabled|connected)", re.IGNORECASE)
+_TCP_OFF_RE = re.compile(r"restarting in USB mode|adb ?wifi disabled", re.IGNORECASE)
+
+_DAYS_BEFORE_MONTH = (0, 0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334)
+
+
+@dataclass
+class L1Event:
+    ts: Optional[str]
+    feature: str
+    value: float  # 1.0 on / observed, 0.0 turned off
+    tag: Optional[str]
+    msg: str
+
+
+@dataclass
+class L1Sample:
+    """One event and the windowed strengths right after it."""
+
+    event: L1Event
+    seconds: Optional[float]
+    strengths: Dict[str, float]
+
+
+def ts_seconds(ts: Optional[str]) -> Optional[float]:
+    """``[YYYY-]MM-DD HH:MM:SS.mmm`` → seconds since the start of the year (None if unparsable)."""
+    if not ts:
+        return None
+    if ts[4:5] == "-":
+        ts = ts[5:]
+    try:
+        days = _DAYS_BEFORE_MONTH[int(ts[0:2])] + int(ts[3:5]) - 1
+        return days * 86400 + int(ts[6:8]) * 3600 + int(ts[9:11]) * 60 + float(ts[12:])
+    except (ValueError, IndexError):
+        return None
+
+
+def seconds_ts(seconds: float) -> str:
+    """Inverse of ``ts_seconds``: ``MM-DD HH:MM:SS.mmm`` (no year)."""
+    millis = round(seconds * 1000)
+    days, millis = divmod(millis, 86400000)
+    month = max(m for m in range(1, 13) if _DAYS_BEFORE_MONTH[m] <= days)
+    day = days - _DAYS_BEFORE_MONTH[month] + 1
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    return f"{month:02d}-{day:02d} {hours:02d}:{minutes:02d}:{millis // 1000:02d}.{millis % 1000:03d}"
+
+
+def _usb_has_adb(functions: str) -> float:
+    return 1.0 if "adb" in functions.split(",") else 0.0
+
+
+def match_l1(tag: Optional[str], msg: str) -> List[Tuple[str, float]]:
+    """``(feature, value)`` observations in one log line."""
+    if tag not in _TAGS and "adb" not in msg and "usb" not in msg:
+        return []
+    found: List[Tuple[str, float]] = []
+    if tag in _AUTH_TAGS and _AUTH_RE.search(msg) and not _AUTH_FAIL_RE.search(msg):
+        found.append(("has_adbd_auth", 1.0))
+    match = _USB_PROP_RE.search(msg)
+    if match is None and tag == "UsbDeviceManager":
+        match = _USB_CONFIG_RE.search(msg)
+    if match is not None:
+        found.append(("functions_has_adb", _usb_has_adb(match.group(1))))
+    match = _ROOT_PROP_RE.search(msg)
+    if match is not None:
+        found.append(("adbd_root_hint", 1.0 if match.group(1) == "1" else 0.0))
+    elif _ROOT_ON_RE.search(msg):
+        found.append(("adbd_root_hint", 1.0))
+    elif _ROOT_OFF_RE.search(msg):
+        found.append(("adbd_root_hint", 0.0))
+    match = _TCP_PROP_RE.search(msg)
+    if match is not None:
+        found.append(("adb_over_tcp_hint", 1.0 if int(match.group(1)) > 0 else 0.0))
+    elif _TCP_ON_RE.search(msg):
+        found.append(("adb_over_tcp_hint", 1.0))
+    elif _TCP_OFF_RE.search(msg):
+        found.append(("adb_over_tcp_hint", 0.0))
+    return found
+
+
+class L1Extractor:
+    """Incremental L1 state: feed records in time order, read strengths at any time."""
+
+    def __init__(self, window: float = DEFAULT_WINDOW):
+        self.window = window
+        self._ts: Optional[str] = None
+        self._now: Optional[float] = None
+        # per feature: current value and the last time it was on
+        self._value: Dict[str, float] = dict.fromkeys(L1_FEATURES, 0.0)
+        self._last_on: Dict[str, Optional[float]] = dict.fromkeys(L1_FEATURES, None)
+
+    @property
+    def now(self) -> Optional[float]:
+        """Time of the latest timestamped record, in ``ts_seconds`` units."""
+        if self._ts is not None:
+            seconds = ts_seconds(self._ts)
+            if seconds is not None:  # 01-01 00:00:00.000 is a valid 0.0
+                self._now = seconds
+            self._ts = None
+        return self._now
+
+    def feed(self, ts: Optional[str], tag: Optional[str], msg: str) -> List[L1Event]:
+        if ts:
+            # converted only when needed: most records carry no L1 observation
+            self._ts = ts
+        events = []
+        for feature, value in match_l1(tag, msg):
+            if value or self._value[feature]:
+                # switching off still counts as "on" up to now for the window; without
+                # any timestamp yet, "on" is not tied to a time
+                self._last_on[feature] = self.now if self.now is not None else float("-inf")
+            self._value[feature] = 0.0 if feature in EVENT_FEATURES else value
+            events.append(L1Event(ts, feature, value, tag, msg))
+        return events
+
+    def strengths(self, at: Optional[float] = None) -> Dict[str, float]:
+        at = self.now if at is None else at
+        result = {}
+        for feature in L1_FEATURES:
+            last_on = self._last_on[feature]
+            if self._value[feature]:
+                on = True
+            elif last_on is None:
+                on = False
+            else:
+                on = at is None or at - last_on < self.window
+            result[feature] = 1.0 if on else 0.0
+        result[L1_GROUP.name] = sum(result[feature] for feature in L1_FEATURES) / len(L1_FEATURES)
+        return result
+
+
+def extract_l1(records: Iterable, window: float = DEFAULT_WINDOW) -> Iterator[L1Sample]:
+    """Yield an ``L1Sample`` for every L1 observation in ``records`` (LogRecord-like, time-ordered)."""
+    extractor = L1Extractor(window)
+    for record in records:
+        for event in extractor.feed(record.ts, record.tag, record.msg):
+            yield L1Sample(event, extractor.now, extractor.strengths())
+
+
+__all__ = [
+    "DEFAULT_WINDOW",
+    "L1Event",
+    "L1Extractor",
+    "L1Sample",
+    "L1_FEATURES",
+    "extract_l1",
+    "match_l1",
+    "seconds_ts",
+    "ts_seconds",
+]
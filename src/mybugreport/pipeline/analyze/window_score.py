@@ -0,0 +1,436 @@
+"""Sliding-window scoring: φ1–φ4 and S along the time axis.
+
+``forensic_analysis.compute_score`` fuses one set of group strengths for a
+whole input, while the design it documents judges a window T.
+``WindowScorer`` slides windows of ``length`` seconds every ``step`` seconds
+over time-ordered records and scores each one.  A window covers
+(end - length, end] and window ends sit on multiples of ``step`` (in
+``ts_seconds`` units).
+
+Each channel keeps aggregates of the events inside the current window.
+Deques with running counts, distinct-key counters and running moments are
+updated as events enter and leave, so no window is recomputed from its
+records and a day of logs is scored in one linear pass:
+
+- L1: ``L1Extractor`` with the window length as its strength window.
+- L2: USB plug state and battery level from ``battery_status`` /
+  ``battery_level`` events and BatteryService lines.  Plugged time is a
+  running integral; the level slope is a running least-squares fit.
+- L3: content providers started (distinct count), URI grants (rate, share
+  to sensitive authorities) and how regular these events are (1 - the
+  coefficient of variation of the gaps between them).
+- L4: adb shell commands: enumerate→export bigrams, rate, distinct command
+  types, privileged execution.
+
+Each φ is the mean of its sub-feature strengths.  Windows without any
+evidence (S = σ(b)) are left out of the timeline, so quiet stretches cost
+nothing.
+"""
+
+import math
+import re
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from ...forensic_analysis import FEATURE_GROUPS, EvidenceConfig, Thresholds, compute_score, evaluate_score
+from .l1_extractor import L1_GROUP, L1Extractor, seconds_ts, ts_seconds
+
+GROUP_NAMES: Tuple[str, ...] = tuple(group.name for group in FEATURE_GROUPS)
+DEFAULT_LENGTH = 60.0
+# L3/L4 weigh most (see the tuning notes in forensic_analysis); a window with
+# nothing but L1 stays normal, L1 plus a command burst reaches a warning
+DEFAULT_CONFIGS: Tuple[EvidenceConfig, ...] = tuple(
+    EvidenceConfig(name, weight) for name, weight in zip(GROUP_NAMES, (2.0, 1.0, 3.0, 3.0))
+)
+DEFAULT_BIAS = -4.0
+
+# Saturation points: a sub-feature strength reaches 1.0 here
+DISTINCT_PROVIDERS = 5
+GRANTS_PER_MINUTE = 10.0
+COMMANDS_PER_MINUTE = 20.0
+DISTINCT_COMMANDS = 6
+NGRAM_MATCHES = 3
+# |battery level slope| (%/h) above which a plugged window is no longer a steady session
+SLOW_CHARGE_PER_HOUR = 30.0
+
+USB_PLUGGED = 2  # BatteryManager.BATTERY_PLUGGED_USB
+SENSITIVE_AUTHORITIES = frozenset(
+    {
+        "browser",
+        "call_log",
+        "com.android.browser",
+        "com.android.calendar",
+        "com.android.contacts",
+        "com.android.externalstorage.documents",
+        "com.android.providers.downloads.documents",
+        "com.android.providers.media.documents",
+        "contacts",
+        "downloads",
+        "icc",
+        "media",
+        "mms",
+        "mms-sms",
+        "sms",
+        "telephony",
+        "user_dictionary",
+    }
+)
+ENUMERATE_COMMANDS = frozenset(
+    {"cmd", "df", "dumpsys", "find", "getprop", "id", "ls", "pm", "ps", "service", "settings", "stat"}
+)
+EXPORT_COMMANDS = frozenset(
+    {"base64", "bugreport", "bugreportz", "cat", "content", "cp", "dd", "gzip", "run-as", "screencap", "sqlite3", "tar"}
+)
+PRIVILEGED_COMMANDS = frozenset({"run-as", "setenforce", "su"})
+
+_BATTERY_TAGS = frozenset({"battery_status", "battery_level", "BatteryService"})
+_SHELL_TAGS = frozenset({"adbd", "adb"})
+_USB_ONLINE_RE = re.compile(r"chargerUsbOnline=(true|false)")
+_LEVEL_RE = re.compile(r"batteryLevel=(\d+)")
+_PROVIDER_RE = re.compile(r"content provider \{?([\w.$]+/[\w.$]+)")
+_URI_RE = re.compile(r"content://([\w.\-]+)")
+_GRANT_RE = re.compile(r"grant", re.IGNORECASE)
+# "shell:cmd", "shell,v2,raw:cmd", "exec:cmd"
+_SHELL_RE = re.compile(r"\b(?:shell(?:,[^:\s']*)?|exec):([^'\n]+)")
+
+
+@dataclass
+class ScoreWindow:
+    start: float
+    end: float
+    features: Dict[str, float]  # sub-feature strengths
+    groups: Dict[str, float]  # φ1–φ4 by group name
+    score: float
+    label: str
+
+
+def command_type(command: str) -> str:
+    """``/system/bin/pm list packages`` → ``pm``."""
+    words = command.strip().strip("'\"").split()
+    return words[0].rsplit("/", 1)[-1] if words else ""
+
+
+def match_channels(tag: Optional[str], msg: str) -> List[Tuple[str, object]]:
+    """``(kind, value)`` observations of one log line for the L2–L4 channels:
+    ``usb`` (bool), ``level`` (percent), ``provider``, ``grant`` (authority), ``command`` (type)."""
+    found: List[Tuple[str, object]] = []
+    if tag in _BATTERY_TAGS:
+        if tag == "BatteryService":
+            match = _USB_ONLINE_RE.search(msg)
+            if match is not None:
+                found.append(("usb", match.group(1) == "true"))
+            match = _LEVEL_RE.search(msg)
+            if match is not None:
+                found.append(("level", float(match.group(1))))
+            return found
+        fields = msg.strip("[]").split(",")
+        try:
+            if tag == "battery_status" and len(fields) >= 4:
+                found.append(("usb", int(fields[3]) == USB_PLUGGED))
+            elif tag == "battery_level" and fields[0]:
+                found.append(("level", float(fields[0])))
+        except ValueError:
+            pass
+        return found
+    if "content" in msg:
+        match = _PROVIDER_RE.search(msg)
+        if match is not None:
+            found.append(("provider", match.group(1)))
+        match = _URI_RE.search(msg)
+        if match is not None and _GRANT_RE.search(msg):
+            found.append(("grant", match.group(1)))
+    if tag in _SHELL_TAGS:
+        match = _SHELL_RE.search(msg)
+        if match is not None:
+            kind = command_type(match.group(1))
+            if kind:
+                found.append(("command", kind))
+    return found
+
+
+class _Sliding:
+    """Events in the window: per-key counts and running moments of the gaps between events."""
+
+    def __init__(self) -> None:
+        self.events: Deque[Tuple[float, Hashable]] = deque()
+        self.keys: Counter = Counter()
+        self._gaps = 0.0
+        self._gaps_sq = 0.0
+
+    def add(self, at: float, key: Hashable) -> None:
+        if self.events:
+            gap = at - self.events[-1][0]
+            self._gaps += gap
+            self._gaps_sq += gap * gap
+        self.events.append((at, key))
+        self.keys[key] += 1
+
+    def expire(self, start: float) -> None:
+        events = self.events
+        while events and events[0][0] <= start:
+            at, key = events.popleft()
+            if events:
+                gap = events[0][0] - at
+                self._gaps -= gap
+                self._gaps_sq -= gap * gap
+            else:
+                # nothing left to subtract from: drop any rounding drift too
+                self._gaps = self._gaps_sq = 0.0
+            self.keys[key] -= 1
+            if not self.keys[key]:
+                del self.keys[key]
+
+    def gap_cv(self) -> Optional[float]:
+        """Coefficient of variation of the gaps (None below two gaps)."""
+        count = len(self.events) - 1
+        if count < 2:
+            return None
+        mean = self._gaps / count
+        if mean <= 0:
+            return 0.0
+        variance = max(0.0, self._gaps_sq / count - mean * mean)
+        return math.sqrt(variance) / mean
+
+
+class _Power:
+    """USB plug state as a running integral of plugged time, and the level samples of the window."""
+
+    def __init__(self) -> None:
+        self.plugged = False
+        self.since = 0.0  # start of the current plugged run
+        # (time, plugged seconds up to that time, state from that time on)
+        self._marks: Deque[Tuple[float, float, bool]] = deque()
+        self._levels: Deque[Tuple[float, float]] = deque()
+        self._origin = 0.0
+        self._sums = [0.0, 0.0, 0.0, 0.0]  # Σx, Σy, Σxx, Σxy with x = t - origin
+
+    def _integral(self, mark: Tuple[float, float, bool], at: float) -> float:
+        mark_at, total, plugged = mark
+        return total + max(0.0, at - mark_at) if plugged else total
+
+    def set_plugged(self, at: float, plugged: bool) -> None:
+        if plugged == self.plugged:
+            return
+        total = self._integral(self._marks[-1], at) if self._marks else 0.0
+        self._marks.append((at, total, plugged))
+        self.plugged = plugged
+        if plugged:
+            self.since = at
+
+    def add_level(self, at: float, level: float) -> None:
+        if not self._levels:
+            self._origin = at
+        x = at - self._origin
+        self._levels.append((at, level))
+        self._update(x, level, 1.0)
+
+    def _update(self, x: float, y: float, sign: float) -> None:
+        sums = self._sums
+        sums[0] += sign * x
+        sums[1] += sign * y
+        sums[2] += sign * x * x
+        sums[3] += sign * x * y
+
+    def expire(self, start: float) -> None:
+        marks = self._marks
+        while len(marks) > 1 and marks[1][0] <= start:
+            marks.popleft()
+        levels = self._levels
+        while levels and levels[0][0] <= start:
+            at, level = levels.popleft()
+            self._update(at - self._origin, level, -1.0)
+        if not levels:
+            self._sums = [0.0, 0.0, 0.0, 0.0]
+
+    def plugged_seconds(self, start: float, end: float) -> float:
+        if not self._marks:
+            return 0.0
+        return self._integral(self._marks[-1], end) - self._integral(self._marks[0], start)
+
+    def slope_per_hour(self) -> Optional[float]:
+        count = len(self._levels)
+        sum_x, sum_y, sum_xx, sum_xy = self._sums
+        denominator = count * sum_xx - sum_x * sum_x
+        if count < 2 or denominator <= 1e-9:
+            return None
+        return (count * sum_xy - sum_x * sum_y) / denominator * 3600.0
+
+
+class WindowScorer:
+    """Incremental scorer: feed records in time order, collect the windows each call closes."""
+
+    def __init__(
+        self,
+        length: float = DEFAULT_LENGTH,
+        step: Optional[float] = None,
+        configs: Sequence[EvidenceConfig] = DEFAULT_CONFIGS,
+        bias: float = DEFAULT_BIAS,
+        thresholds: Thresholds = Thresholds(),
+    ):
+        if length <= 0 or (step is not None and step <= 0):
+            raise ValueError("window length and step must be positive")
+        self.length = length
+        self.step = step or length
+        self.configs = tuple(configs)
+        self.bias = bias
+        self.thresholds = thresholds
+        self._l1 = L1Extractor(length)
+        self._power = _Power()
+        self._providers = _Sliding()
+        self._grants = _Sliding()  # keyed by "sensitive authority"
+        self._l3 = _Sliding()  # times of provider/grant events, for the gap CV
+        self._commands = _Sliding()  # keyed by command type
+        self._pairs = _Sliding()  # keyed by "bigram matches enumerate→export"
+        self._index: Optional[int] = None  # current window end = index * step
+        self._end_ts: Optional[str] = None  # the same end as a timestamp, for string comparison
+        self._now: Optional[float] = None
+        self._ts: Optional[str] = None
+
+    @property
+    def now(self) -> Optional[float]:
+        """Time of the latest timestamped record, in ``ts_seconds`` units."""
+        if self._ts is not None:
+            seconds = ts_seconds(self._ts)
+            # a record older than the latest one (merged buffers) counts as "now"
+            if seconds is not None and (self._now is None or seconds > self._now):
+                self._now = seconds
+            self._ts = None
+        return self._now
+
+    def feed(self, ts: Optional[str], tag: Optional[str], msg: str) -> List[ScoreWindow]:
+        windows: List[ScoreWindow] = []
+        if ts:
+            # timestamps sort as strings within a year: convert only past the window end
+            if self._end_ts is not None and (ts[5:] if ts[4:5] == "-" else ts) <= self._end_ts:
+                self._ts = ts
+            else:
+                seconds = ts_seconds(ts)
+                if seconds is not None and (self._now is None or seconds > self._now):
+                    windows = self._advance(seconds)
+                    self._now = seconds
+                    self._ts = None
+        self._l1.feed(ts, tag, msg)
+        observations = match_channels(tag, msg)
+        if observations and self.now is not None:
+            for kind, value in observations:
+                self._observe(kind, value)
+        return windows
+
+    def flush(self) -> List[ScoreWindow]:
+        """Close the window holding the latest record; call once after the last record."""
+        if self._index is None:
+            return []
+        window = self._close(self._index * self.step)
+        self._index += 1
+        self._end_ts = seconds_ts(self._index * self.step)
+        return [window] if window is not None else []
+
+    def _advance(self, at: float) -> List[ScoreWindow]:
+        windows = []
+        if self._index is None:
+            self._index = math.ceil(at / self.step)
+        while at > self._index * self.step:
+            window = self._close(self._index * self.step)
+            if window is None:
+                # no evidence now means none until the next record: skip straight to it
+                self._index = max(self._index + 1, math.ceil(at / self.step))
+            else:
+                windows.append(window)
+                self._index += 1
+        self._end_ts = seconds_ts(self._index * self.step)
+        return windows
+
+    def _observe(self, kind: str, value: object) -> None:
+        now = self.now
+        if kind == "usb":
+            self._power.set_plugged(now, bool(value))
+        elif kind == "level":
+            self._power.add_level(now, value)
+        elif kind in ("provider", "grant"):
+            if kind == "provider":
+                self._providers.add(now, value)
+            else:
+                self._grants.add(now, value in SENSITIVE_AUTHORITIES)
+            # the gap CV is over distinct event times: lines logged together are one event
+            if not self._l3.events or self._l3.events[-1][0] != now:
+                self._l3.add(now, kind)
+        elif kind == "command":
+            commands = self._commands
+            if commands.events:
+                previous = commands.events[-1][1]
+                matched = previous in EXPORT_COMMANDS or previous in ENUMERATE_COMMANDS
+                self._pairs.add(now, matched and value in EXPORT_COMMANDS)
+            commands.add(now, value)
+
+    def _close(self, end: float) -> Optional[ScoreWindow]:
+        start = end - self.length
+        for channel in (self._providers, self._grants, self._l3, self._commands, self._pairs):
+            channel.expire(start)
+        self._power.expire(start)
+        features = self._features(start, end)
+        if not any(features.values()):
+            return None
+        groups = {
+            group.name: sum(features[name] for name in group.sub_features) / len(group.sub_features)
+            for group in FEATURE_GROUPS
+        }
+        score = compute_score(groups, self.configs, bias=self.bias)
+        return ScoreWindow(start, end, features, groups, score, evaluate_score(score, self.thresholds))
+
+    def _features(self, start: float, end: float) -> Dict[str, float]:
+        length = self.length
+        minutes = length / 60.0
+        features = self._l1.strengths(end)
+        del features[L1_GROUP.name]
+
+        power = self._power
+        plugged = power.plugged_seconds(start, end)
+        slope = power.slope_per_hour()
+        features["plugged_usb_ratio"] = plugged / length
+        features["stable_power_duration"] = min(end - power.since, length) / length if power.plugged else 0.0
+        features["battery_level_slope"] = (
+            1.0 - min(1.0, abs(slope) / SLOW_CHARGE_PER_HOUR) if plugged and slope is not None else 0.0
+        )
+
+        grants = len(self._grants.events)
+        cv = self._l3.gap_cv()
+        features["distinct_providers_count"] = min(1.0, len(self._providers.keys) / DISTINCT_PROVIDERS)
+        features["uri_grants_count_rate"] = min(1.0, grants / minutes / GRANTS_PER_MINUTE)
+        features["grant_subject_class"] = self._grants.keys[True] / grants if grants else 0.0
+        features["inter_event_cv"] = 1.0 - min(1.0, cv) if cv is not None else 0.0
+
+        commands = self._commands
+        features["ngram_match_score"] = min(1.0, self._pairs.keys[True] / NGRAM_MATCHES)
+        features["cmd_burst_density"] = min(1.0, len(commands.events) / minutes / COMMANDS_PER_MINUTE)
+        features["unique_cmd_types"] = min(1.0, len(commands.keys) / DISTINCT_COMMANDS)
+        features["priv_exec_hint"] = 1.0 if any(commands.keys[name] for name in PRIVILEGED_COMMANDS) else 0.0
+        return features
+
+
+def score_timeline(
+    records: Iterable,
+    length: float = DEFAULT_LENGTH,
+    step: Optional[float] = None,
+    configs: Sequence[EvidenceConfig] = DEFAULT_CONFIGS,
+    bias: float = DEFAULT_BIAS,
+    thresholds: Thresholds = Thresholds(),
+) -> Iterator[ScoreWindow]:
+    """Scored windows of ``records`` (LogRecord-like, time-ordered), in time order."""
+    scorer = WindowScorer(length, step, configs, bias, thresholds)
+    for record in records:
+        yield from scorer.feed(record.ts, record.tag, record.msg)
+    yield from scorer.flush()
+
+
+__all__ = [
+    "DEFAULT_BIAS",
+    "DEFAULT_CONFIGS",
+    "DEFAULT_LENGTH",
+    "GROUP_NAMES",
+    "ScoreWindow",
+    "WindowScorer",
+    "command_type",
+    "match_channels",
+    "score_timeline",
+]
@@ -0,0 +1,156 @@
+"""Content-addressed cache for stage outputs, shared by ``pipeline`` runs.
+
+An entry is keyed by the sha256 of everything its output depends on (see
+``parse_cache_key``/``analyze_cache_key``) and stored as
+``<root>/<key[:2]>/<key>/`` holding the output files plus ``entry.json``
+(stage, size, last use).  Entries are written to a temporary directory and
+renamed into place, so a crashed run never leaves a partial entry behind.
+Once the cache is larger than ``max_bytes``, the least recently used entries
+are evicted.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from ..config import STAGE_CACHE_MAX_BYTES, log_debug
+
+ENTRY_FILE = "entry.json"
+_SIZE_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+
+def cache_key(stage: str, **parts: Any) -> str:
+    """Stable key over ``stage`` and the JSON-serializable ``parts``."""
+    payload = json.dumps({"stage": stage, **parts}, sort_keys=True, separators=(",", ":"), default=str)
+    return sha256(payload.encode("utf-8")).hexdigest()
+
+
+def parse_size(value: str) -> int:
+    """``"512M"``/``"2G"``/``"1048576"`` → bytes."""
+    text = value.strip().upper().rstrip("B")
+    unit = text[-1:] if text[-1:] in _SIZE_UNITS else ""
+    number = text[: len(text) - len(unit)]
+    try:
+        return int(float(number) * _SIZE_UNITS[unit])
+    except ValueError:
+        raise ValueError(f"invalid size: {value!r}") from None
+
+
+class StageCache:
+    def __init__(self, root: Path, max_bytes: Optional[int] = None):
+        self.root = Path(root)
+        self.max_bytes = STAGE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def _entries(self) -> List[Dict[str, Any]]:
+        entries = []
+        for meta_path in self.root.glob(f"*/*/{ENTRY_FILE}"):
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            meta["dir"] = meta_path.parent
+            entries.append(meta)
+        return entries
+
+    def fetch(self, key: str, outputs: Dict[str, Path]) -> bool:
+        """Copy a cached entry to ``outputs`` (name → destination); False on a miss."""
+        entry_dir = self._entry_dir(key)
+        meta_path = entry_dir / ENTRY_FILE
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        if sorted(meta.get("files", [])) != sorted(outputs):
+            return False
+        for name, destination in outputs.items():
+            destination = Path(destination)
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            # copy rather than link: stage writers truncate their outputs in place
+            shutil.copyfile(entry_dir / name, destination)
+        meta["last_used"] = time.time()
+        meta_path.write_text(json.dumps(meta), encoding="utf-8")
+        log_debug(f"stage cache hit: {meta.get('stage')} {key[:12]}")
+        return True
+
+    def store(self, key: str, stage: str, outputs: Dict[str, Path]) -> None:
+        entry_dir = self._entry_dir(key)
+        entry_dir.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=".tmp-", dir=entry_dir.parent))
+        try:
+            size = 0
+            for name, source in outputs.items():
+                shutil.copyfile(source, staging / name)
+                size += (staging / name).stat().st_size
+            now = time.time()
+            meta = {"key": key, "stage": stage, "files": sorted(outputs), "size": size, "created": now, "last_used": now}
+            (staging / ENTRY_FILE).write_text(json.dumps(meta), encoding="utf-8")
+            if entry_dir.exists():
+                shutil.rmtree(entry_dir)
+            os.replace(staging, entry_dir)
+        finally:
+            if staging.exists():
+                shutil.rmtree(staging, ignore_errors=True)
+        self.prune()
+
+    def run(self, key: str, stage: str, outputs: Dict[str, Path], produce: Callable[[], Any]) -> bool:
+        """Restore ``outputs`` from the cache or call ``produce`` and store them; True on a hit."""
+        if self.fetch(key, outputs):
+            return True
+        produce()
+        self.store(key, stage, outputs)
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self._entries()
+        stages: Dict[str, Dict[str, int]] = {}
+        for meta in entries:
+            bucket = stages.setdefault(meta.get("stage", "?"), {"entries": 0, "bytes": 0})
+            bucket["entries"] += 1
+            bucket["bytes"] += meta.get("size", 0)
+        return {
+            "root": str(self.root),
+            "entries": len(entries),
+            "bytes": sum(meta.get("size", 0) for meta in entries),
+            "max_bytes": self.max_bytes,
+            "stages": stages,
+        }
+
+    def prune(self, max_bytes: Optional[int] = None) -> int:
+        """Evict least recently used entries until the cache fits; returns the number removed."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self._entries(), key=lambda meta: meta.get("last_used", 0))
+        total = sum(meta.get("size", 0) for meta in entries)
+        removed = 0
+        for meta in entries:
+            if total <= limit:
+                break
+            shutil.rmtree(meta["dir"], ignore_errors=True)
+            total -= meta.get("size", 0)
+            removed += 1
+        return removed
+
+
+def parse_cache_key(artifact_sha256: str, parser_version: str, **options: Any) -> str:
+    return cache_key("parse", artifact=artifact_sha256, version=parser_version, **options)
+
+
+def analyze_cache_key(records_sha256: str, analyzer_version: str, config: Dict[str, Any]) -> str:
+    config_hash = cache_key("config", **config)
+    return cache_key("analyze", records=records_sha256, version=analyzer_version, config=config_hash)
+
+
+__all__ = [
+    "StageCache",
+    "analyze_cache_key",
+    "cache_key",
+    "parse_cache_key",
+    "parse_size",
+]
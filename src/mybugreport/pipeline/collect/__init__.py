@@ -5,13 +5,34 @@ from hashlib import sha256
 from pathlib import Path
 from typing import Iterable, List
 
+from ...archive import archive_kind, container_path, list_members, split_member
 from ...models import CollectArtifact, DeviceInfo
 from ...utils import write_json
 
 
+class HashingWriter:
+    """Binary sink that computes sha256 and size of what passes through it."""
+
+    def __init__(self, handle):
+        self._handle = handle
+        self._digest = sha256()
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self._digest.update(data)
+        self.size += len(data)
+        return self._handle.write(data)
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+
 def fingerprint_file(path: Path) -> str:
-    data = Path(path).read_bytes()
-    return sha256(data).hexdigest()
+    digest = sha256()
+    with Path(path).open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
 
 def collect_existing_artifact(
@@ -20,12 +41,19 @@ def collect_existing_artifact(
     artifacts_dir: Path,
     artifact_type: str = "bugreport",
 ) -> CollectArtifact:
-    bugreport_path = Path(bugreport_path)
+    """Index an existing capture; zip/gz/xz files are fingerprinted as they are (never
+    unpacked) and their layout is noted in ``metadata``."""
     artifacts_dir = Path(artifacts_dir)
     artifacts_dir.mkdir(parents=True, exist_ok=True)
     captured_at = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-    digest = fingerprint_file(bugreport_path)
-    size_bytes = bugreport_path.stat().st_size
+    container = container_path(bugreport_path)
+    digest = fingerprint_file(container)
+    size_bytes = container.stat().st_size
+    kind = archive_kind(container)
+    metadata = None
+    if kind is not None:
+        members = [split_member(path)[1] for path in list_members(bugreport_path)]
+        metadata = {"archive": kind, "members": [member for member in members if member]}
     return CollectArtifact(
         path=str(bugreport_path),
         captured_at=captured_at,
@@ -33,6 +61,7 @@ def collect_existing_artifact(
         artifact_type=artifact_type,
         sha256=digest,
         size_bytes=size_bytes,
+        metadata=metadata,
     )
 
 
@@ -43,6 +72,7 @@ def write_artifacts_index(artifacts: Iterable[CollectArtifact], output_path: Pat
 
 
 __all__ = [
+    "HashingWriter",
     "collect_existing_artifact",
     "write_artifacts_index",
     "fingerprint_file",
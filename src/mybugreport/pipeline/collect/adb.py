@@ -1,25 +1,74 @@
 """ADB-based collection utilities with layered fallbacks and logging.
 
 All functions are designed to be testable by injecting a custom runner.
+Captures are streamed: a ``StreamRunner`` copies the command's stdout to the
+output file in chunks while the sha256 and size are computed on the way, so
+memory stays flat however large the capture is.  A plain ``CommandRunner``
+(returning ``stdout`` as text, as test fakes do) still works; its output is
+hashed as it is written.
 """
 
+import os
 import shlex
+import shutil
 import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Callable, Iterable, List, Optional
+from typing import Any, BinaryIO, Callable, Dict, Iterable, List, Optional, Tuple
 
+from ...archive import archive_kind, list_members, split_member
+from ...config import ADB_BACKEND, CONCURRENT_COLLECT
 from ...models import CollectArtifact, DeviceInfo
-from ...utils import write_json
-from . import collect_existing_artifact, fingerprint_file, write_artifacts_index
+from ...utils import read_json, write_json
+from . import HashingWriter, collect_existing_artifact, write_artifacts_index
+from .cursor import CURSOR_FILE, DeltaWriter, load_cursor, save_cursor
 
 CommandRunner = Callable[[List[str], Optional[float]], subprocess.CompletedProcess]
+# Writes the command's stdout to the sink; the returned process has stdout=None.
+StreamRunner = Callable[[List[str], BinaryIO, Optional[float]], subprocess.CompletedProcess]
+
+STREAM_CHUNK_SIZE = 1024 * 1024
+ADB_BACKENDS = ("process", "socket")
 
 
 def default_runner(cmd: List[str], timeout: Optional[float] = None) -> subprocess.CompletedProcess:
     return subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, check=False)
 
 
+def default_stream_runner(
+    cmd: List[str], sink: BinaryIO, timeout: Optional[float] = None
+) -> subprocess.CompletedProcess:
+    """Copy stdout to ``sink`` in ``STREAM_CHUNK_SIZE`` chunks; stderr is spooled to a temp file."""
+    with tempfile.TemporaryFile() as stderr:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr)
+        # _kill sets timed_out before killing, so a late cancel() cannot mask the timeout
+        timed_out = threading.Event()
+
+        def _kill() -> None:
+            timed_out.set()
+            proc.kill()
+
+        timer = threading.Timer(timeout, _kill) if timeout else None
+        if timer is not None:
+            timer.start()
+        try:
+            shutil.copyfileobj(proc.stdout, sink, STREAM_CHUNK_SIZE)
+            returncode = proc.wait()
+        finally:
+            if timer is not None:
+                timer.cancel()
+            proc.stdout.close()
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        stderr.seek(0)
+        error = stderr.read().decode("utf-8", errors="replace")
+    return subprocess.CompletedProcess(cmd, returncode, stdout=None, stderr=error)
+
+
 def log_line(handle, message: str) -> None:
     ts = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
     handle.write(f"[{ts}] {message}\n")
@@ -30,15 +79,35 @@ def ensure_dir(path: Path) -> None:
     Path(path).mkdir(parents=True, exist_ok=True)
 
 
-def get_device_info(serial: str, runner: CommandRunner, log_handle) -> DeviceInfo:
-    props = {
-        "model": _adb_getprop(serial, "ro.product.model", runner, log_handle),
-        "android_version": _adb_getprop(serial, "ro.build.version.release", runner, log_handle),
-        "build_fingerprint": _adb_getprop(serial, "ro.build.fingerprint", runner, log_handle),
-    }
+DEVICE_PROPS = {
+    "model": "ro.product.model",
+    "android_version": "ro.build.version.release",
+    "build_fingerprint": "ro.build.fingerprint",
+}
+
+
+def get_device_info(serial: str, runner: CommandRunner, log_handle, batched: bool = False) -> DeviceInfo:
+    """Device properties; ``batched`` reads them all in a single ``adb shell`` round trip."""
+    if batched:
+        values = _adb_getprops(serial, list(DEVICE_PROPS.values()), runner, log_handle)
+        props = dict(zip(DEVICE_PROPS, values))
+    else:
+        props = {field: _adb_getprop(serial, key, runner, log_handle) for field, key in DEVICE_PROPS.items()}
     return DeviceInfo(serial=serial, **props)
 
 
+def _adb_getprops(serial: str, keys: List[str], runner: CommandRunner, log_handle) -> List[Optional[str]]:
+    # getprop prints one line per key (empty when unset), so the output lines line up with the keys
+    script = "; ".join(f"getprop {shlex.quote(key)}" for key in keys)
+    cmd = ["adb", "-s", serial, "shell", script]
+    proc = runner(cmd, timeout=15)
+    log_line(log_handle, f"run {' '.join(shlex.quote(c) for c in cmd)} -> {proc.returncode}")
+    lines = (proc.stdout or "").splitlines() if proc.returncode == 0 else []
+    if len(lines) != len(keys):
+        return [None] * len(keys)
+    return [line.strip() or None for line in lines]
+
+
 def _adb_getprop(serial: str, key: str, runner: CommandRunner, log_handle) -> Optional[str]:
     cmd = ["adb", "-s", serial, "shell", "getprop", key]
     proc = runner(cmd, timeout=15)
@@ -54,13 +123,171 @@ def run_and_save(
     runner: CommandRunner,
     log_handle,
     timeout: Optional[float] = None,
-) -> None:
-    proc = runner(cmd, timeout=timeout)
-    log_line(log_handle, f"run {' '.join(shlex.quote(c) for c in cmd)} -> {proc.returncode}")
-    if proc.returncode != 0:
-        raise RuntimeError(f"Command failed ({proc.returncode}): {' '.join(cmd)}\n{proc.stderr}")
+    stream_runner: Optional[StreamRunner] = None,
+    line_filter: Optional[Callable[[BinaryIO], Any]] = None,
+) -> Tuple[str, int]:
+    """Run ``cmd`` into ``output_path``; returns the sha256 and size of what was written.
+
+    line_filter: wraps the file sink (e.g. ``cursor.DeltaWriter``); the wrapper
+    is closed once the command's output has been written through it.
+
+    The output goes to ``<output_path>.partial`` and is renamed into place only
+    when the command succeeded, so a failed command leaves no artifact behind.
+    """
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(proc.stdout or "")
+    partial = output_path.with_name(output_path.name + ".partial")
+    try:
+        with partial.open("wb") as handle:
+            sink = HashingWriter(handle)
+            target = sink if line_filter is None else line_filter(sink)
+            if stream_runner is not None:
+                proc = stream_runner(cmd, target, timeout)
+            else:
+                proc = runner(cmd, timeout=timeout)
+                stdout = proc.stdout or ""
+                target.write(stdout.encode("utf-8") if isinstance(stdout, str) else stdout)
+            if target is not sink:
+                target.close()
+        log_line(log_handle, f"run {' '.join(shlex.quote(c) for c in cmd)} -> {proc.returncode}")
+        if proc.returncode != 0:
+            raise RuntimeError(f"Command failed ({proc.returncode}): {' '.join(cmd)}\n{proc.stderr}")
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    os.replace(partial, output_path)
+    return sink.hexdigest(), sink.size
+
+
+@dataclass
+class _Capture:
+    artifact_type: str
+    cmd: List[str]
+    path: Path
+    timeout: Optional[float]
+    metadata: Optional[Dict[str, Any]] = None
+    # resumable logcat: where the previous capture stopped, and the filter dropping its entries
+    resume: bool = False
+    cursor: Optional[Dict[str, Any]] = None
+    delta: Optional[DeltaWriter] = None
+    # adb bugreport: cmd runs bugreportz, whose zip is then streamed from the device to path
+    bugreportz: bool = False
+
+
+def _next_segment(logs_dir: Path) -> Path:
+    numbers = [int(path.stem.rsplit("-", 1)[1]) for path in logs_dir.glob("logcat-[0-9]*.txt")]
+    return logs_dir / f"logcat-{max(numbers, default=0) + 1:04d}.txt"
+
+
+def _capture_plan(
+    serial: str,
+    logs_dir: Path,
+    duration: Optional[int],
+    since: Optional[str],
+    buffers: Optional[Iterable[str]],
+    include_dmesg: bool,
+    include_bugreport: bool,
+    cursor: Optional[Dict[str, Any]] = None,
+    resume: bool = False,
+    binary: bool = False,
+) -> List[_Capture]:
+    # -B: raw logger_entry structs (see parse.binary_logcat), about half the size of threadtime text
+    logcat_cmd = ["adb", "-s", serial, "logcat", *(["-B"] if binary else ["-v", "threadtime"]), "-d"]
+    if buffers:
+        for buf in buffers:
+            logcat_cmd.extend(["-b", buf])
+    if cursor:
+        since = cursor["ts"]
+    if since:
+        logcat_cmd.extend(["-T", since])
+    metadata: Dict[str, Any] = {"buffers": list(buffers) if buffers else None, "since": since}
+    if binary:
+        logcat_path = logs_dir / "logcat.bin"
+        metadata["format"] = "binary"
+    else:
+        logcat_path = _next_segment(logs_dir) if resume else logs_dir / "logcat.txt"
+    plan = [_Capture("logcat", logcat_cmd, logcat_path, duration, metadata=metadata, resume=resume, cursor=cursor)]
+    if binary:
+        # names of the events buffer tags, read by the decoder from next to logcat.bin
+        tags_cmd = ["adb", "-s", serial, "shell", "cat /system/etc/event-log-tags"]
+        plan.append(_Capture("event_tags", tags_cmd, logs_dir / "event-log-tags.txt", duration))
+    if include_dmesg:
+        plan.append(_Capture("dmesg", ["adb", "-s", serial, "shell", "dmesg"], logs_dir / "dmesg.txt", duration))
+    if include_bugreport:
+        bugreportz_cmd = ["adb", "-s", serial, "shell", "bugreportz"]
+        plan.append(
+            _Capture("bugreport", bugreportz_cmd, logs_dir / "bugreport.zip", duration or 300, bugreportz=True)
+        )
+    return plan
+
+
+def _run_bugreportz(
+    capture: _Capture, runner: CommandRunner, log_handle, stream_runner: Optional[StreamRunner]
+) -> Tuple[str, int, str]:
+    """``adb bugreport`` as adb itself runs it: ``bugreportz`` writes the zip on the
+    device and prints ``OK:<path>``, the zip is streamed into ``capture.path`` and
+    its text members are listed in the metadata.  Devices without bugreportz
+    (before Android 7) get the flat text of ``adb bugreport`` instead."""
+    serial = capture.cmd[2]
+    proc = runner(capture.cmd, timeout=capture.timeout)
+    log_line(log_handle, f"run {' '.join(shlex.quote(c) for c in capture.cmd)} -> {proc.returncode}")
+    lines = (proc.stdout or "").splitlines()
+    status = next((line.strip() for line in lines if line.startswith(("OK:", "FAIL:"))), None)
+    if status is None:
+        capture.cmd = ["adb", "-s", serial, "bugreport"]
+        capture.path = capture.path.with_suffix(".txt")
+        capture.bugreportz = False
+        return _run_capture(capture, runner, log_handle, stream_runner)
+    if status.startswith("FAIL:"):
+        raise RuntimeError(f"bugreportz failed: {status[5:]}")
+    remote = status[3:]
+    pull_cmd = ["adb", "-s", serial, "exec-out", "cat", remote]
+    digest, size = run_and_save(pull_cmd, capture.path, runner, log_handle, capture.timeout, stream_runner)
+    if archive_kind(capture.path) != "zip":
+        capture.path.unlink()
+        raise RuntimeError(f"bugreportz output is not a zip: {remote}")
+    # adb bugreport removes the device copy once pulled; a leftover is only wasted space
+    rm_cmd = ["adb", "-s", serial, "shell", "rm", "-f", remote]
+    proc = runner(rm_cmd, timeout=15)
+    log_line(log_handle, f"run {' '.join(shlex.quote(c) for c in rm_cmd)} -> {proc.returncode}")
+    members = [split_member(path)[1] for path in list_members(capture.path)]
+    capture.metadata = {"archive": "zip", "members": [member for member in members if member]}
+    captured_at = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    return digest, size, captured_at
+
+
+def _run_capture(
+    capture: _Capture, runner: CommandRunner, log_handle, stream_runner: Optional[StreamRunner]
+) -> Tuple[str, int, str]:
+    if capture.bugreportz:
+        return _run_bugreportz(capture, runner, log_handle, stream_runner)
+    line_filter = None
+    if capture.resume:
+
+        def line_filter(sink: BinaryIO) -> DeltaWriter:
+            capture.delta = DeltaWriter(sink, capture.cursor)
+            return capture.delta
+
+    digest, size = run_and_save(
+        capture.cmd, capture.path, runner, log_handle, capture.timeout, stream_runner, line_filter
+    )
+    captured_at = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    return digest, size, captured_at
+
+
+class _LockedLog:
+    """Serializes ``log_line`` calls from the collection threads."""
+
+    def __init__(self, handle):
+        self._handle = handle
+        self._lock = threading.Lock()
+
+    def write(self, text: str) -> None:
+        with self._lock:
+            self._handle.write(text)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._handle.flush()
 
 
 def collect_adb(
@@ -72,80 +299,130 @@ def collect_adb(
     include_dmesg: bool = False,
     include_bugreport: bool = False,
     runner: CommandRunner = default_runner,
+    stream_runner: Optional[StreamRunner] = None,
+    concurrent: Optional[bool] = None,
+    backend: Optional[str] = None,
+    resume: bool = False,
+    binary: bool = False,
 ) -> Path:
     """
     Collect logs from adb. Raises RuntimeError on failures.
     Returns path to artifacts.json.
+
+    Captures are streamed to disk via ``stream_runner`` (``default_stream_runner``
+    when ``runner`` is the default); with a custom ``runner`` only, its text
+    output is written and hashed as before.
+
+    concurrent: run the device properties (one batched ``getprop`` round trip)
+    and every capture at the same time, each with its own timeout (defaults
+    to MYBUGREPORT_CONCURRENT_COLLECT).  Wall time is then about the longest
+    command; artifacts.json keeps the serial order.
+
+    backend: ``"process"`` runs the adb client per command, ``"socket"`` talks
+    to the adb server directly (see ``adb_socket``); defaults to
+    MYBUGREPORT_ADB_BACKEND.  Only used with the default runners.
+
+    resume: capture only the logcat entries logged since the previous resumed
+    capture of this device and buffer set (see ``cursor``), into a new
+    ``logs/logcat-NNNN.txt`` segment.  The segment is added to the existing
+    artifacts.json as a delta artifact; other entries are replaced by path.
+
+    include_bugreport: capture ``adb bugreport`` as ``logs/bugreport.zip`` (through
+    ``bugreportz``, see ``_run_bugreportz``); the artifact is the zip, with its
+    text members in ``metadata`` for the parse stage (``bugreport.zip::member``).
+    Devices before Android 7 give the flat text in ``logs/bugreport.txt``.
+
+    binary: capture ``logcat -B`` into ``logs/logcat.bin`` (decoded by the parse
+    stage without a text round trip) along with the device's event-log-tags.
+    Not combinable with ``resume``.
     """
+    if binary and resume:
+        raise ValueError("resume needs a text logcat capture")
+    backend = backend or ADB_BACKEND
+    if backend not in ADB_BACKENDS:
+        raise ValueError(f"unknown adb backend: {backend}")
+    if stream_runner is None and runner is default_runner:
+        if backend == "socket":
+            from .adb_socket import AdbSocketClient
+
+            client = AdbSocketClient()
+            runner, stream_runner = client.run, client.stream
+        else:
+            stream_runner = default_stream_runner
+    concurrent = CONCURRENT_COLLECT if concurrent is None else concurrent
     out_dir = Path(out_dir)
     logs_dir = out_dir / "logs"
     ensure_dir(logs_dir)
-    artifacts: List[CollectArtifact] = []
+    artifacts_dir = out_dir / "collect"
+    cursor_path = artifacts_dir / CURSOR_FILE
+    cursor = load_cursor(cursor_path, serial, buffers) if resume else None
+    plan = _capture_plan(
+        serial,
+        logs_dir,
+        duration,
+        since,
+        buffers,
+        include_dmesg,
+        include_bugreport,
+        cursor=cursor,
+        resume=resume,
+        binary=binary,
+    )
     log_handle = (out_dir / "collect.log").open("a", encoding="utf-8")
 
     try:
-        device = get_device_info(serial, runner, log_handle)
-
-        logcat_cmd = ["adb", "-s", serial, "logcat", "-v", "threadtime", "-d"]
-        if buffers:
-            for buf in buffers:
-                logcat_cmd.extend(["-b", buf])
-        if since:
-            logcat_cmd.extend(["-T", since])
-        logcat_path = logs_dir / "logcat.txt"
-        run_and_save(logcat_cmd, logcat_path, runner, log_handle, timeout=duration)
-        artifacts.append(
-            CollectArtifact(
-                path=str(logcat_path),
-                captured_at=datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
-                device=device,
-                artifact_type="logcat",
-                sha256=fingerprint_file(logcat_path),
-                size_bytes=logcat_path.stat().st_size,
-                command=" ".join(logcat_cmd),
-                metadata={"buffers": list(buffers) if buffers else None, "since": since},
-            )
-        )
+        if concurrent:
+            log = _LockedLog(log_handle)
+            with ThreadPoolExecutor(max_workers=len(plan) + 1) as executor:
+                device_future = executor.submit(get_device_info, serial, runner, log, True)
+                futures = [executor.submit(_run_capture, capture, runner, log, stream_runner) for capture in plan]
+                wait([device_future, *futures])
+            device = device_future.result()
+            outcomes = [future.result() for future in futures]  # first failure in plan order
+        else:
+            device = get_device_info(serial, runner, log_handle)
+            outcomes = [_run_capture(capture, runner, log_handle, stream_runner) for capture in plan]
 
-        if include_dmesg:
-            dmesg_cmd = ["adb", "-s", serial, "shell", "dmesg"]
-            dmesg_path = logs_dir / "dmesg.txt"
-            run_and_save(dmesg_cmd, dmesg_path, runner, log_handle, timeout=duration)
-            artifacts.append(
-                CollectArtifact(
-                    path=str(dmesg_path),
-                    captured_at=datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
-                    device=device,
-                    artifact_type="dmesg",
-                    sha256=fingerprint_file(dmesg_path),
-                    size_bytes=dmesg_path.stat().st_size,
-                    command=" ".join(dmesg_cmd),
+        artifacts: List[CollectArtifact] = []
+        for capture, (digest, size, captured_at) in zip(plan, outcomes):
+            if capture.delta is not None:
+                if not capture.delta.written:
+                    log_line(log_handle, f"No new logcat entries since {capture.metadata['since']}")
+                    capture.path.unlink()
+                    continue
+                capture.metadata.update(
+                    delta=True,
+                    until=capture.delta.cursor()["ts"],
+                    dropped_duplicates=capture.delta.dropped,
                 )
-            )
-
-        if include_bugreport:
-            bugreport_cmd = ["adb", "-s", serial, "bugreport"]
-            bugreport_path = logs_dir / "bugreport.txt"
-            run_and_save(bugreport_cmd, bugreport_path, runner, log_handle, timeout=duration or 300)
             artifacts.append(
                 CollectArtifact(
-                    path=str(bugreport_path),
-                    captured_at=datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+                    path=str(capture.path),
+                    captured_at=captured_at,
                     device=device,
-                    artifact_type="bugreport",
-                    sha256=fingerprint_file(bugreport_path),
-                    size_bytes=bugreport_path.stat().st_size,
-                    command=" ".join(bugreport_cmd),
+                    artifact_type=capture.artifact_type,
+                    sha256=digest,
+                    size_bytes=size,
+                    command=" ".join(capture.cmd),
+                    metadata=capture.metadata,
                 )
             )
 
         device_info_path = logs_dir / "device_info.json"
         write_json(device, device_info_path)
 
-        artifacts_dir = out_dir / "collect"
         ensure_dir(artifacts_dir)
         artifacts_index = artifacts_dir / "artifacts.json"
-        write_artifacts_index(artifacts, artifacts_index)
+        if resume and artifacts_index.exists():
+            captured = {artifact.path for artifact in artifacts}
+            previous = [item for item in read_json(artifacts_index) if item.get("path") not in captured]
+            write_artifacts_index([*previous, *artifacts], artifacts_index)
+        else:
+            write_artifacts_index(artifacts, artifacts_index)
+        # only advance once the segment is indexed, so a failed run is captured again
+        delta = plan[0].delta
+        if delta is not None and delta.cursor() is not None:
+            save_cursor(cursor_path, serial, buffers, delta.cursor())
         log_line(log_handle, f"Artifacts indexed at {artifacts_index}")
         return artifacts_index
     except FileNotFoundError as exc:
@@ -161,4 +438,4 @@ def collect_adb(
         log_handle.close()
 
 
-__all__ = ["collect_adb", "default_runner"]
+__all__ = ["collect_adb", "default_runner", "default_stream_runner", "run_and_save"]
@@ -0,0 +1,237 @@
+"""adb host protocol client: talk to the adb server instead of spawning ``adb``.
+
+Every ``adb -s SERIAL ...`` call starts an adb client process that connects
+to the server (localhost:5037), forwards one request and exits.
+``AdbSocketClient`` sends the same requests itself: ``host:transport:SERIAL``
+selects the device, then ``shell:``/``exec:`` opens the command, whose output
+is streamed back until the server closes the connection.  A request is a
+4-hex-digit length plus the payload; the server answers ``OKAY``, or ``FAIL``
+followed by a length-prefixed message.
+
+On devices that advertise the ``shell_v2`` feature (Android 7+) commands
+run through ``shell,v2,raw:``, whose output is framed as packets (1-byte id,
+4-byte little-endian length): stdout, stderr and finally the exit status,
+so a failing command reports its exit code like the adb client does.  Older
+devices only offer ``shell:``/``exec:``, which carry no exit status: there a
+failing command reports 0 and only its output tells.
+
+``run`` and ``stream`` have the ``CommandRunner``/``StreamRunner``
+signatures, so the client plugs into ``collect_adb`` unchanged.  Argv it
+does not translate (``adb bugreport``, ``pull``...) goes to the subprocess
+runners.  The server ends the connection along with the command, so each
+command gets a fresh localhost connection; the saving is the process spawn.
+"""
+
+import io
+import os
+import shlex
+import socket
+import struct
+import subprocess
+import time
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+
+from .adb import STREAM_CHUNK_SIZE, CommandRunner, StreamRunner, default_runner, default_stream_runner
+
+ADB_SERVER_HOST = "127.0.0.1"
+DEFAULT_ADB_SERVER_PORT = 5037
+# shell protocol v2 packet ids (adb's shell_protocol.h)
+_SHELL_STDOUT = 1
+_SHELL_STDERR = 2
+_SHELL_EXIT = 3
+_SHELL_HEADER = struct.Struct("<BI")
+
+
+class AdbProtocolError(RuntimeError):
+    """The adb server answered FAIL (or something unexpected)."""
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise AdbProtocolError("adb server closed the connection")
+        data += chunk
+    return data
+
+
+def _copy_shell_v2(recv: Callable[[int], bytes], sink: BinaryIO) -> Tuple[int, str]:
+    """Demultiplex shell v2 packets: stdout to ``sink``; returns ``(exit code, stderr)``."""
+    stderr = bytearray()
+
+    def exact(size: int) -> bytes:
+        data = b""
+        while len(data) < size:
+            chunk = recv(size - len(data))
+            if not chunk:
+                raise AdbProtocolError("adb server closed the connection")
+            data += chunk
+        return data
+
+    while True:
+        packet_id, length = _SHELL_HEADER.unpack(exact(_SHELL_HEADER.size))
+        if packet_id == _SHELL_EXIT:
+            return exact(length)[0], stderr.decode("utf-8", errors="replace")
+        while length:
+            chunk = recv(min(length, STREAM_CHUNK_SIZE))
+            if not chunk:
+                raise AdbProtocolError("adb server closed the connection")
+            length -= len(chunk)
+            if packet_id == _SHELL_STDOUT:
+                sink.write(chunk)
+            elif packet_id == _SHELL_STDERR:
+                stderr += chunk
+
+
+def translate_command(cmd: List[str]) -> Optional[Tuple[Optional[str], str]]:
+    """``(serial, service)`` for an adb argv, or None when it has no socket equivalent.
+
+    ``serial`` is None for ``host:`` services, which need no transport.
+    """
+    if not cmd or os.path.basename(cmd[0]) not in ("adb", "adb.exe"):
+        return None
+    args = list(cmd[1:])
+    serial = None
+    if len(args) >= 2 and args[0] == "-s":
+        serial, args = args[1], args[2:]
+    if not args:
+        return None
+    verb, rest = args[0], args[1:]
+    if verb == "devices" and serial is None and rest in ([], ["-l"]):
+        return None, "host:devices-l" if rest else "host:devices"
+    if serial is None:
+        return None
+    if verb == "shell" and rest:
+        # like the adb client: the arguments are joined and run by the device shell
+        return serial, f"shell:{' '.join(rest)}"
+    if verb == "logcat":
+        return serial, f"exec:{shlex.join(['logcat', *rest])}"
+    return None
+
+
+class AdbSocketClient:
+    def __init__(
+        self,
+        host: str = ADB_SERVER_HOST,
+        port: Optional[int] = None,
+        fallback: CommandRunner = default_runner,
+        fallback_stream: StreamRunner = default_stream_runner,
+        connect_timeout: float = 5.0,
+    ):
+        self.host = host
+        # same override as the adb client itself
+        self.port = port or int(os.environ.get("ANDROID_ADB_SERVER_PORT", "") or DEFAULT_ADB_SERVER_PORT)
+        self.fallback = fallback
+        self.fallback_stream = fallback_stream
+        self.connect_timeout = connect_timeout
+        self._started_server = False
+        self._shell_v2: Dict[str, bool] = {}
+
+    def _connect(self) -> socket.socket:
+        try:
+            return socket.create_connection((self.host, self.port), timeout=self.connect_timeout)
+        except ConnectionRefusedError:
+            if self._started_server:
+                raise
+            # the adb client starts the server on demand; do the same, once
+            self._started_server = True
+            self.fallback(["adb", "start-server"], timeout=30)
+            return socket.create_connection((self.host, self.port), timeout=self.connect_timeout)
+
+    def _request(self, sock: socket.socket, payload: str) -> None:
+        data = payload.encode("utf-8")
+        sock.sendall(b"%04x" % len(data) + data)
+        status = _recv_exact(sock, 4)
+        if status == b"FAIL":
+            raise AdbProtocolError(self._read_message(sock))
+        if status != b"OKAY":
+            raise AdbProtocolError(f"unexpected adb server reply {status!r}")
+
+    def _read_message(self, sock: socket.socket) -> str:
+        length = int(_recv_exact(sock, 4), 16)
+        return _recv_exact(sock, length).decode("utf-8", errors="replace")
+
+    def host_query(self, service: str) -> str:
+        """Answer of a ``host:`` service (``host:version``, ``host:devices-l``...)."""
+        with self._connect() as sock:
+            self._request(sock, service)
+            return self._read_message(sock)
+
+    def open_service(self, serial: str, service: str) -> socket.socket:
+        """Socket carrying the output of ``service`` (``shell:...``/``exec:...``) on ``serial``."""
+        sock = self._connect()
+        try:
+            self._request(sock, f"host:transport:{serial}")
+            self._request(sock, service)
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    def supports_shell_v2(self, serial: str) -> bool:
+        """Whether ``serial`` speaks the v2 shell protocol (asked once per device)."""
+        if serial not in self._shell_v2:
+            features = self.host_query(f"host-serial:{serial}:features")
+            self._shell_v2[serial] = "shell_v2" in features.split(",")
+        return self._shell_v2[serial]
+
+    def _copy(
+        self, cmd: List[str], serial: str, service: str, sink: BinaryIO, timeout: Optional[float]
+    ) -> Optional[Tuple[int, str]]:
+        """Copy stdout to ``sink``; ``(exit code, stderr)`` under shell v2, else None."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if self.supports_shell_v2(serial):
+            command = service.partition(":")[2]
+            service = f"shell,v2,raw:{command}"
+        try:
+            with self.open_service(serial, service) as sock:
+
+                def recv(size: int) -> bytes:
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise subprocess.TimeoutExpired(cmd, timeout)
+                        sock.settimeout(remaining)
+                    else:
+                        sock.settimeout(None)
+                    return sock.recv(size)
+
+                if service.startswith("shell,v2,"):
+                    return _copy_shell_v2(recv, sink)
+                while True:
+                    chunk = recv(STREAM_CHUNK_SIZE)
+                    if not chunk:
+                        return None
+                    sink.write(chunk)
+        except socket.timeout:
+            raise subprocess.TimeoutExpired(cmd, timeout) from None
+
+    def stream(self, cmd: List[str], sink: BinaryIO, timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        """``StreamRunner``: copy the command's output to ``sink``."""
+        target = translate_command(cmd)
+        if target is None:
+            return self.fallback_stream(cmd, sink, timeout)
+        serial, service = target
+        try:
+            if serial is None:
+                sink.write(self.host_query(service).encode("utf-8"))
+                return subprocess.CompletedProcess(cmd, 0, stdout=None, stderr="")
+            status = self._copy(cmd, serial, service, sink, timeout)
+        except AdbProtocolError as exc:
+            # same shape as the adb client's own failure
+            return subprocess.CompletedProcess(cmd, 1, stdout=None, stderr=f"error: {exc}\n")
+        returncode, stderr = status if status is not None else (0, "")
+        return subprocess.CompletedProcess(cmd, returncode, stdout=None, stderr=stderr)
+
+    def run(self, cmd: List[str], timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        """``CommandRunner``: the command's output as text."""
+        if translate_command(cmd) is None:
+            return self.fallback(cmd, timeout=timeout)
+        buffer = io.BytesIO()
+        proc = self.stream(cmd, buffer, timeout)
+        proc.stdout = buffer.getvalue().decode("utf-8", errors="replace")
+        return proc
+
+
+__all__ = ["AdbProtocolError", "AdbSocketClient", "translate_command"]
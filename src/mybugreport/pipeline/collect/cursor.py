@@ -0,0 +1,100 @@
+"""Resumable logcat collection: where the previous capture of a device stopped.
+
+The cursor is the timestamp of the last captured entry plus the hashes of
+the entries carrying that timestamp.  The next capture asks logcat for
+entries since that time (``-T``), which repeats the entries of the boundary
+millisecond; ``DeltaWriter`` drops exactly those (by hash, so distinct
+entries logged in the same millisecond are kept) as the output streams
+through.  Cursors live in ``<out_dir>/collect/logcat_cursor.json``, keyed by
+serial and by the set of logcat buffers captured.
+"""
+
+import json
+import re
+from collections import Counter
+from datetime import datetime, timezone
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional
+
+from ...utils import write_json
+
+CURSOR_FILE = "logcat_cursor.json"
+# threadtime timestamp, optionally with the year (-v year)
+_TIMESTAMP = re.compile(rb"(?:\d{4}-)?\d\d-\d\d \d\d:\d\d:\d\d\.\d+")
+
+
+def buffer_key(buffers: Optional[Iterable[str]]) -> str:
+    return ",".join(sorted(buffers)) if buffers else "default"
+
+
+def load_cursor(path: Path, serial: str, buffers: Optional[Iterable[str]]) -> Optional[Dict[str, Any]]:
+    try:
+        cursors = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return cursors.get(serial, {}).get(buffer_key(buffers))
+
+
+def save_cursor(path: Path, serial: str, buffers: Optional[Iterable[str]], cursor: Dict[str, Any]) -> None:
+    path = Path(path)
+    try:
+        cursors = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        cursors = {}
+    entry = dict(cursor, updated_at=datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"))
+    cursors.setdefault(serial, {})[buffer_key(buffers)] = entry
+    write_json(cursors, path)
+
+
+def _line_hash(line: bytes) -> str:
+    return sha256(line.rstrip(b"\r\n")).hexdigest()[:16]
+
+
+class DeltaWriter:
+    """Binary sink that drops the entries ``cursor`` already covers and tracks the next cursor."""
+
+    def __init__(self, sink: BinaryIO, cursor: Optional[Dict[str, Any]] = None):
+        self._sink = sink
+        self._tail = b""
+        self._skip_ts = cursor["ts"].encode("utf-8") if cursor else None
+        self._skip = Counter(cursor.get("hashes", [])) if cursor else Counter()
+        self._last_ts: Optional[bytes] = self._skip_ts
+        self._last_hashes: List[str] = list(cursor.get("hashes", [])) if cursor else []
+        self.written = 0
+        self.dropped = 0
+
+    def write(self, data: bytes) -> int:
+        lines = (self._tail + data).split(b"\n")
+        self._tail = lines.pop()
+        for line in lines:
+            self._line(line + b"\n")
+        return len(data)
+
+    def _line(self, line: bytes) -> None:
+        match = _TIMESTAMP.match(line)
+        if match is not None:
+            ts = match.group()
+            digest = _line_hash(line)
+            if ts != self._last_ts:
+                self._last_ts, self._last_hashes = ts, []
+            self._last_hashes.append(digest)
+            if ts == self._skip_ts and self._skip[digest]:
+                self._skip[digest] -= 1
+                self.dropped += 1
+                return
+            self.written += 1
+        self._sink.write(line)
+
+    def close(self) -> None:
+        if self._tail:
+            self._line(self._tail)
+            self._tail = b""
+
+    def cursor(self) -> Optional[Dict[str, Any]]:
+        if self._last_ts is None:
+            return None
+        return {"ts": self._last_ts.decode("utf-8"), "hashes": self._last_hashes}
+
+
+__all__ = ["CURSOR_FILE", "DeltaWriter", "buffer_key", "load_cursor", "save_cursor"]
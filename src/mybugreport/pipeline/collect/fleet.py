@@ -0,0 +1,200 @@
+"""Collect from many attached devices at once.
+
+Each device gets its own ``collect_adb`` run under ``<out_dir>/<serial>/``
+(so its own ``collect/artifacts.json``); ``<out_dir>/fleet.json`` lists the
+outcome of every device.  At most ``max_parallel`` devices are collected at
+a time and at most ``per_hub`` per USB hub, since devices behind one hub
+share its bandwidth.  Transient adb failures (timeouts, a device dropping
+off the bus) are retried with a growing delay.
+
+The adb ``runner``/``stream_runner`` hooks are passed through unchanged, so
+a fleet run is testable with the same fake runners as ``collect_adb``.
+"""
+
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from ...utils import write_json
+from .adb import CommandRunner, StreamRunner, collect_adb, default_runner
+
+FLEET_MANIFEST = "fleet.json"
+# adb error text that means "try again": the device or its connection, not the request, failed.
+# Matched against adb's own wording so a failing shell command ("sh: dmesg: not found") is not retried.
+_TRANSIENT_ERROR = re.compile(
+    r"command timeout|timed out"
+    r"|device offline|device '[^']*' not found|no devices(?:/emulators)? found|device still authorizing"
+    r"|error: closed|closed the connection|protocol fault|connection reset"
+)
+_UNSAFE_NAME = re.compile(r"[^A-Za-z0-9._-]")
+
+
+@dataclass
+class FleetDevice:
+    serial: str
+    hub: Optional[str] = None
+
+
+@dataclass
+class FleetResult:
+    serial: str
+    hub: Optional[str]
+    status: str  # ok | failed
+    attempts: int
+    artifacts: Optional[str] = None
+    error: Optional[str] = None
+    wall_time: float = 0.0
+
+
+def _hub_of(usb_path: str) -> str:
+    # usb:1-1.4 is port 4 of the hub on port 1-1; a port directly on the root hub is its own hub
+    return usb_path.rsplit(".", 1)[0] if "." in usb_path else usb_path
+
+
+def parse_devices(text: str) -> List[FleetDevice]:
+    """Devices ready for collection from ``adb devices [-l]`` output or a plain serial list.
+
+    Offline/unauthorized entries are dropped.  The hub comes from the
+    ``usb:`` field of ``adb devices -l``, or an explicit ``hub:NAME`` field.
+    """
+    devices: List[FleetDevice] = []
+    for line in text.splitlines():
+        fields = line.split()
+        if not fields or line.startswith(("List of devices", "*")) or fields[0].startswith("#"):
+            continue
+        if len(fields) > 1 and ":" not in fields[1] and fields[1] != "device":
+            continue
+        hub = None
+        for field in fields[1:]:
+            key, _, value = field.partition(":")
+            if key == "hub" and value:
+                hub = value
+            elif key == "usb" and value and hub is None:
+                hub = _hub_of(value)
+        devices.append(FleetDevice(fields[0], hub))
+    return devices
+
+
+def list_devices(runner: CommandRunner = default_runner) -> List[FleetDevice]:
+    proc = runner(["adb", "devices", "-l"], timeout=15)
+    if proc.returncode != 0:
+        raise RuntimeError(f"adb devices failed ({proc.returncode}): {proc.stderr}")
+    return parse_devices(proc.stdout or "")
+
+
+def is_transient(exc: BaseException) -> bool:
+    return _TRANSIENT_ERROR.search(str(exc).lower()) is not None
+
+
+def _interleave_hubs(devices: List[FleetDevice]) -> List[FleetDevice]:
+    # Round-robin over hubs so a crowded hub cannot hold every worker waiting on its limit
+    queues: Dict[Optional[str], List[FleetDevice]] = {}
+    for device in devices:
+        queues.setdefault(device.hub, []).append(device)
+    ordered: List[FleetDevice] = []
+    while queues:
+        for hub in list(queues):
+            ordered.append(queues[hub].pop(0))
+            if not queues[hub]:
+                del queues[hub]
+    return ordered
+
+
+def device_dir_name(serial: str) -> str:
+    """Directory name for a serial (``host:port`` serials of network devices included)."""
+    return _UNSAFE_NAME.sub("_", serial)
+
+
+def collect_fleet(
+    devices: Iterable[FleetDevice],
+    out_dir: Path,
+    max_parallel: int = 4,
+    per_hub: int = 2,
+    retries: int = 2,
+    retry_delay: float = 2.0,
+    runner: CommandRunner = default_runner,
+    stream_runner: Optional[StreamRunner] = None,
+    sleep: Callable[[float], None] = time.sleep,
+    **collect_options: Any,
+) -> Path:
+    """Run ``collect_adb`` for every device; returns the path to ``fleet.json``.
+
+    ``collect_options`` (duration, buffers, include_dmesg, ...) go to every
+    ``collect_adb`` call.  A device is retried up to ``retries`` times on
+    transient errors, waiting ``retry_delay`` × attempt between tries.  A
+    failed device does not stop the others; the manifest records the error.
+    """
+    unique: Dict[str, FleetDevice] = {}
+    for device in devices:
+        unique.setdefault(device.serial, device)
+    devices = list(unique.values())
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    hub_limits: Dict[Optional[str], threading.Semaphore] = {}
+    for device in devices:
+        # devices with no known hub are only bound by max_parallel
+        if device.hub is not None:
+            hub_limits.setdefault(device.hub, threading.Semaphore(max(1, per_hub)))
+    results: Dict[str, FleetResult] = {}
+
+    def collect_one(device: FleetDevice) -> None:
+        hub_limit = hub_limits.get(device.hub)
+        started = time.perf_counter()
+        attempts = 0
+        result = None
+        while result is None:
+            attempts += 1
+            try:
+                if hub_limit is not None:
+                    hub_limit.acquire()
+                try:
+                    index = collect_adb(
+                        device.serial,
+                        out_dir / device_dir_name(device.serial),
+                        runner=runner,
+                        stream_runner=stream_runner,
+                        **collect_options,
+                    )
+                finally:
+                    if hub_limit is not None:
+                        hub_limit.release()
+                result = FleetResult(device.serial, device.hub, "ok", attempts, artifacts=str(index))
+            except Exception as exc:
+                if attempts <= retries and is_transient(exc):
+                    sleep(retry_delay * attempts)
+                    continue
+                error = f"{type(exc).__name__}: {exc}"
+                result = FleetResult(device.serial, device.hub, "failed", attempts, error=error)
+        result.wall_time = round(time.perf_counter() - started, 3)
+        results[device.serial] = result
+
+    started_at = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as executor:
+        list(executor.map(collect_one, _interleave_hubs(devices)))
+
+    manifest = {
+        "started_at": started_at,
+        "finished_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "max_parallel": max_parallel,
+        "per_hub": per_hub,
+        "devices": [asdict(results[device.serial]) for device in devices],
+    }
+    manifest_path = out_dir / FLEET_MANIFEST
+    write_json(manifest, manifest_path)
+    return manifest_path
+
+
+__all__ = [
+    "FleetDevice",
+    "FleetResult",
+    "collect_fleet",
+    "device_dir_name",
+    "is_transient",
+    "list_devices",
+    "parse_devices",
+]
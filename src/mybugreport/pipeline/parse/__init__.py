@@ -1,10 +1,43 @@
 """Parse stage skeleton: normalize bugreport text into structured log records."""
 
+import io
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Type, Union
 
-from ...models import LogRecord
-from ...utils import write_jsonl
+from ...archive import input_stem, is_archive, open_input
+from ...models import CompactLogRecord, LogRecord
+from ...parallel import DEFAULT_CHUNK_SIZE, ordered_map, read_range, split_line_ranges
+from ...utils import dump_jsonl_line, write_columnar, write_jsonl, write_sqlite
+from ...utils.columnar import COLUMNAR_SUFFIX
+from ...utils.record_db import SQLITE_SUFFIX
+from .binary_logcat import is_binary_logcat, iter_binary_records
+from .logcat import parse_log_line
+from .sections import (
+    index_sections,
+    iter_span_text_lines,
+    load_sections_index,
+    section_spans_for,
+    sections_index_path,
+    select_sections,
+    write_sections_index,
+)
+
+RECORD_FORMATS = ("jsonl", "columnar", "sqlite")
+# Bump whenever the records written for the same input change (stage cache key).
+PARSER_VERSION = "1"
+
+AnyRecord = Union[LogRecord, CompactLogRecord]
+
+
+def record_from_line(line: str, source: str, record_type: Type[AnyRecord] = LogRecord) -> AnyRecord:
+    raw = line.rstrip("\n")
+    parsed = parse_log_line(raw)
+    if parsed is None:
+        return record_type(ts=None, level=None, tag=None, msg=raw, raw=raw, source=source)
+    ts, pid, tid, level, tag, msg = parsed
+    return record_type(ts=ts, level=level, tag=tag, msg=msg, raw=raw, source=source, pid=pid, tid=tid)
 
 
 def parse_bugreport_lines(
@@ -12,40 +45,172 @@ def parse_bugreport_lines(
     output_path: Path,
     source: str = "bugreport",
     max_lines: Optional[int] = None,
-) -> List[LogRecord]:
-    bugreport_path = Path(bugreport_path)
-    records: List[LogRecord] = []
-    with bugreport_path.open("r", encoding="utf-8") as handle:
-        for idx, line in enumerate(handle):
-            if max_lines is not None and idx >= max_lines:
-                break
-            raw = line.rstrip("\n")
-            records.append(
-                LogRecord(
-                    ts=None,
-                    level=None,
-                    tag=None,
-                    msg=raw,
-                    raw=raw,
-                    source=source,
-                )
-            )
+    spans: Optional[Sequence[Tuple[int, int]]] = None,
+    compact: bool = False,
+) -> List[AnyRecord]:
+    """Parse every line, or only the byte ``spans`` (see ``section_spans_for``).
+
+    Keeps every record in memory for the return value (``compact`` returns
+    ``CompactLogRecord`` objects, same file); ``parse_bugreport_stream``
+    writes the same file in constant memory.
+    """
+    records = list(iter_records(bugreport_path, source, max_lines=max_lines, spans=spans, compact=compact))
     write_jsonl(records, Path(output_path))
     return records
 
 
+def iter_records(
+    bugreport_path: Path,
+    source: str = "bugreport",
+    max_lines: Optional[int] = None,
+    spans: Optional[Sequence[Tuple[int, int]]] = None,
+    compact: bool = False,
+) -> Iterator[AnyRecord]:
+    """Yield one record per input line, lazily (``CompactLogRecord`` when ``compact``).
+
+    Binary logcat captures (``logcat -B``) are decoded instead of read as text.
+    """
+    if spans is None and is_binary_logcat(bugreport_path):
+        yield from islice(iter_binary_records(Path(bugreport_path), source, compact=compact), max_lines)
+        return
+    record_type = CompactLogRecord if compact else LogRecord
+    for idx, line in enumerate(_iter_text_lines(Path(bugreport_path), spans)):
+        if max_lines is not None and idx >= max_lines:
+            return
+        yield record_from_line(line, source, record_type)
+
+
+def parse_bugreport_stream(
+    bugreport_path: Path,
+    output_path: Path,
+    source: str = "bugreport",
+    max_lines: Optional[int] = None,
+    spans: Optional[Sequence[Tuple[int, int]]] = None,
+    fmt: str = "jsonl",
+) -> int:
+    """Same output as ``parse_bugreport_lines`` without holding the records; returns the count.
+
+    fmt: ``jsonl`` (default), ``columnar`` (see ``utils.columnar``) or ``sqlite``
+    (an indexed database for ``query``, see ``utils.record_db``).
+    """
+    records = iter_records(bugreport_path, source, max_lines=max_lines, spans=spans, compact=True)
+    if fmt == "columnar":
+        return write_columnar(records, Path(output_path))
+    if fmt == "sqlite":
+        return write_sqlite(records, Path(output_path))
+    if fmt != "jsonl":
+        raise ValueError(f"unknown records format: {fmt}")
+    return write_jsonl(records, Path(output_path))
+
+
+def records_file_name(artifact: Path, fmt: str = "jsonl") -> str:
+    stem = input_stem(artifact)
+    suffix = {"columnar": COLUMNAR_SUFFIX, "sqlite": SQLITE_SUFFIX}.get(fmt, ".records.jsonl")
+    return f"{stem}{suffix}"
+
+
+def _iter_text_lines(bugreport_path: Path, spans: Optional[Sequence[Tuple[int, int]]]) -> Iterator[str]:
+    if spans is not None:
+        yield from iter_span_text_lines(bugreport_path, spans)
+        return
+    if is_archive(bugreport_path):
+        with open_input(bugreport_path) as handle:
+            yield from io.TextIOWrapper(handle, encoding="utf-8")
+        return
+    with bugreport_path.open("r", encoding="utf-8") as handle:
+        yield from handle
+
+
+def _parse_chunk(task: Tuple[str, int, int, str]) -> Tuple[str, int]:
+    path, start, end, source = task
+    text = io.TextIOWrapper(io.BytesIO(read_range(path, start, end)), encoding="utf-8")
+    lines = [dump_jsonl_line(record_from_line(line, source, CompactLogRecord)) for line in text]
+    return "\n".join(lines), len(lines)
+
+
+def parse_bugreport_parallel(
+    bugreport_path: Path,
+    output_path: Path,
+    source: str = "bugreport",
+    workers: int = 2,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """Parse line-aligned chunks in a process pool; output equals ``parse_bugreport_lines``.
+
+    Returns the number of records written.
+    """
+    bugreport_path = Path(bugreport_path)
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    size = bugreport_path.stat().st_size
+    parts = max(workers, -(-size // chunk_size))
+    ranges = split_line_ranges(str(bugreport_path), parts, min_chunk=min(chunk_size, 1024 * 1024))
+    tasks = [(str(bugreport_path), start, end, source) for start, end in ranges]
+    count = 0
+    with output_path.open("w") as handle, ProcessPoolExecutor(max_workers=workers) as executor:
+        for text, chunk_count in ordered_map(executor, _parse_chunk, tasks, 2 * workers):
+            if not chunk_count:
+                continue
+            if count:
+                handle.write("\n")
+            handle.write(text)
+            count += chunk_count
+    return count
+
+
 def parse_artifacts_to_records(
-    artifacts: Iterable[Path], output_dir: Path, source: str = "bugreport"
+    artifacts: Iterable[Path],
+    output_dir: Path,
+    source: str = "bugreport",
+    workers: int = 1,
+    sections: Optional[Sequence[str]] = None,
+    index_dir: Optional[Path] = None,
+    fmt: str = "jsonl",
 ) -> List[Path]:
+    """Parse each artifact; with ``sections``, only those named sections are read.
+
+    ``index_dir`` is where ``<stem>.sections.json`` sidecars live (the collect
+    directory); without a usable sidecar the sections are indexed on the fly.
+    ``fmt="columnar"``/``"sqlite"`` write ``<stem>.records.cols``/``.records.sqlite``
+    instead of jsonl (serially).  Compressed artifacts (zip/gz/xz, or a
+    ``capture.zip::member`` path) are decompressed as a stream, also serially,
+    and so are binary logcat captures.
+    """
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
     outputs: List[Path] = []
     for artifact in artifacts:
         artifact = Path(artifact)
-        output_path = output_dir / f"{artifact.stem}.records.jsonl"
-        parse_bugreport_lines(artifact, output_path, source=source)
+        output_path = output_dir / records_file_name(artifact, fmt)
+        if sections:
+            index_path = sections_index_path(index_dir, artifact) if index_dir is not None else None
+            spans = section_spans_for(artifact, sections, index_path)
+            parse_bugreport_stream(artifact, output_path, source=source, spans=spans, fmt=fmt)
+        elif workers > 1 and fmt == "jsonl" and not is_archive(artifact) and not is_binary_logcat(artifact):
+            parse_bugreport_parallel(artifact, output_path, source=source, workers=workers)
+        else:
+            parse_bugreport_stream(artifact, output_path, source=source, fmt=fmt)
         outputs.append(output_path)
     return outputs
 
 
-__all__ = ["parse_bugreport_lines", "parse_artifacts_to_records"]
+__all__ = [
+    "index_sections",
+    "is_binary_logcat",
+    "iter_binary_records",
+    "iter_records",
+    "load_sections_index",
+    "parse_bugreport_lines",
+    "parse_bugreport_stream",
+    "records_file_name",
+    "RECORD_FORMATS",
+    "PARSER_VERSION",
+    "parse_bugreport_parallel",
+    "parse_artifacts_to_records",
+    "parse_log_line",
+    "record_from_line",
+    "section_spans_for",
+    "sections_index_path",
+    "select_sections",
+    "write_sections_index",
+]
@@ -0,0 +1,241 @@
+"""Decoder for binary logcat captures (``logcat -B``).
+
+A capture is a sequence of ``logger_entry`` structs, all little-endian::
+
+    v1  u16 len, u16 pad(0), i32 pid, i32 tid, i32 sec, i32 nsec            (20 bytes)
+    v2  u16 len, u16 hdr_size(24), pid, tid, sec, nsec, u32 euid            (24 bytes)
+    v3  u16 len, u16 hdr_size(24), pid, tid, sec, nsec, u32 lid             (24 bytes)
+    v4  u16 len, u16 hdr_size(28), pid, tid, sec, nsec, u32 lid, u32 uid    (28 bytes)
+
+followed by ``len`` payload bytes.  Text buffers (main, system, crash...)
+carry ``prio, tag\\0, msg\\0``; the events/stats/security buffers carry a
+u32 tag number and one typed value (int, long, float, string or a list of
+those), named through ``/system/etc/event-log-tags``.  v1/v2 headers have no
+buffer id, so their events entries need ``buffer="events"``.
+
+v2 and v3 headers have the same size and cannot be told apart by their
+bytes: the version follows from what wrote the capture, the kernel logger
+driver (v2, Android 4.4 and older) or logd (v3, Android 5.0+).  It is taken
+from the ``device_info.json`` collected next to the capture, and is v3
+when the device is unknown.
+
+Records are built straight from the fields, one per message line as
+``logcat -v threadtime`` prints them, with the equivalent threadtime line as
+``raw``.  Timestamps are epoch based and rendered in ``tz`` (default: the
+host's local time); text captures use the device's time zone.
+"""
+
+import struct
+import time
+from datetime import timedelta, tzinfo
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple, Type, Union
+
+from ...archive import container_path, open_input
+from ...config import log_debug
+from ...models import CompactLogRecord, LogRecord
+from ...utils import read_json
+
+V1_HEADER_SIZE = 20
+LOGGER_ENTRY_MAX_PAYLOAD = 4068
+LOG_IDS = {0: "main", 1: "radio", 2: "events", 3: "system", 4: "crash", 5: "stats", 6: "security", 7: "kernel"}
+EVENT_BUFFERS = frozenset({"events", "stats", "security"})
+PRIORITIES = "??VDIWEFS"
+EVENT_TAGS_NAMES = ("event-log-tags", "event-log-tags.txt")
+DEVICE_INFO_NAME = "device_info.json"
+_READ_SIZE = 1024 * 1024
+_HEADS_LIMIT = 1 << 16
+_MILLIS = [f".{ms:03d}" for ms in range(1000)]
+_HEADER = struct.Struct("<HH")
+_V1 = struct.Struct("<iiii")
+_V3 = struct.Struct("<iiiiI")
+_V4 = struct.Struct("<iIIII")
+
+AnyRecord = Union[LogRecord, CompactLogRecord]
+# pid, tid, sec, nsec, buffer, payload
+Entry = Tuple[int, int, int, int, Optional[str], bytes]
+
+
+def load_event_tags(path: Path) -> Dict[int, str]:
+    """``/system/etc/event-log-tags`` → {tag number: name}."""
+    tags: Dict[int, str] = {}
+    with Path(path).open("r", encoding="utf-8", errors="replace") as handle:
+        for line in handle:
+            fields = line.split(None, 2)
+            if len(fields) >= 2 and fields[0].isdigit():
+                tags[int(fields[0])] = fields[1]
+    return tags
+
+
+def find_event_tags(capture: Path) -> Optional[Path]:
+    """The ``event-log-tags`` file collected next to ``capture``, if any."""
+    directory = container_path(capture).parent
+    return next((directory / name for name in EVENT_TAGS_NAMES if (directory / name).is_file()), None)
+
+
+def capture_header_version(capture: Path) -> int:
+    """Layout of the capture's 24-byte headers: 2 (euid) before logd, else 3 (buffer id)."""
+    info_path = container_path(capture).parent / DEVICE_INFO_NAME
+    try:
+        release = str(read_json(info_path).get("android_version") or "")
+    except (OSError, ValueError, AttributeError):
+        return 3
+    major = release.split(".", 1)[0]
+    return 2 if major.isdigit() and int(major) < 5 else 3
+
+
+def _header_size(head: bytes) -> Optional[int]:
+    length, hdr_size = _HEADER.unpack_from(head)
+    if length > LOGGER_ENTRY_MAX_PAYLOAD or (hdr_size not in (0, 24) and hdr_size < 28):
+        return None
+    return hdr_size or V1_HEADER_SIZE
+
+
+def is_binary_logcat(path: Path) -> bool:
+    """Sniff the first entry header.  Text never passes: two printable bytes
+    read as a payload length are far above ``LOGGER_ENTRY_MAX_PAYLOAD``."""
+    try:
+        with open_input(path) as handle:
+            head = handle.read(V1_HEADER_SIZE + 1)
+    except (OSError, ValueError):
+        return False
+    if len(head) <= V1_HEADER_SIZE:
+        return False
+    length = _HEADER.unpack_from(head)[0]
+    return length > 0 and _header_size(head) is not None
+
+
+def iter_entries(handle: BinaryIO, buffer: Optional[str] = None, header_version: int = 3) -> Iterator[Entry]:
+    """Raw entries; ``buffer`` names the buffer of headers without a buffer id.
+
+    ``header_version`` (2 or 3) is the layout of 24-byte headers, see ``capture_header_version``.
+    """
+    data = b""
+    pos = 0
+    while True:
+        available = len(data) - pos
+        if available >= 4:
+            length, hdr_size = _HEADER.unpack_from(data, pos)
+            if length > LOGGER_ENTRY_MAX_PAYLOAD or (hdr_size not in (0, 24) and hdr_size < 28):
+                raise ValueError(f"corrupt logger_entry header at offset {pos}")
+            hdr_size = hdr_size or V1_HEADER_SIZE
+            if available >= hdr_size + length:
+                if hdr_size == V1_HEADER_SIZE:
+                    pid, tid, sec, nsec = _V1.unpack_from(data, pos + 4)
+                    log_id = None
+                elif hdr_size == 24 and header_version == 2:
+                    pid, tid, sec, nsec = _V1.unpack_from(data, pos + 4)  # then the euid
+                    log_id = None
+                elif hdr_size == 24:
+                    pid, tid, sec, nsec, log_id = _V3.unpack_from(data, pos + 4)
+                else:
+                    pid, tid, sec, nsec, log_id = _V4.unpack_from(data, pos + 4)
+                start = pos + hdr_size
+                name = LOG_IDS.get(log_id, buffer)
+                yield pid, tid, sec, nsec, name, data[start : start + length]
+                pos = start + length
+                continue
+        chunk = handle.read(_READ_SIZE)
+        if not chunk:
+            if available:
+                log_debug(f"binary logcat: dropped {available} trailing bytes of a truncated entry")
+            return
+        data = data[pos:] + chunk
+        pos = 0
+
+
+def _event_value(payload: bytes, pos: int) -> Tuple[str, int]:
+    kind = payload[pos]
+    pos += 1
+    if kind == 0:
+        return str(struct.unpack_from("<i", payload, pos)[0]), pos + 4
+    if kind == 1:
+        return str(struct.unpack_from("<q", payload, pos)[0]), pos + 8
+    if kind == 4:
+        return f"{struct.unpack_from('<f', payload, pos)[0]:f}", pos + 4
+    if kind == 2:
+        size = struct.unpack_from("<i", payload, pos)[0]
+        pos += 4
+        return payload[pos : pos + size].decode("utf-8", errors="replace"), pos + size
+    if kind == 3:
+        count = payload[pos]
+        pos += 1
+        items = []
+        for _ in range(count):
+            item, pos = _event_value(payload, pos)
+            items.append(item)
+        return "[" + ",".join(items) + "]", pos
+    raise ValueError(f"unknown event value type {kind}")
+
+
+def decode_payload(
+    payload: bytes, buffer: Optional[str], event_tags: Optional[Dict[int, str]] = None
+) -> Tuple[str, str, str]:
+    """``(level, tag, message)`` of one entry."""
+    if buffer in EVENT_BUFFERS:
+        number = struct.unpack_from("<I", payload)[0]
+        tag = (event_tags or {}).get(number, str(number))
+        try:
+            message = _event_value(payload, 4)[0] if len(payload) > 4 else ""
+        except (ValueError, IndexError, struct.error):
+            message = payload[4:].hex()
+        return "I", tag, message
+    level = PRIORITIES[payload[0]] if payload and payload[0] < len(PRIORITIES) else "?"
+    tag, _, rest = payload[1:].decode("utf-8", errors="replace").partition("\0")
+    return level, tag, rest.partition("\0")[0]
+
+
+def iter_binary_records(
+    path: Path,
+    source: str = "logcat",
+    compact: bool = False,
+    event_tags: Optional[Dict[int, str]] = None,
+    buffer: Optional[str] = None,
+    tz: Optional[tzinfo] = None,
+    header_version: Optional[int] = None,
+) -> Iterator[AnyRecord]:
+    """Records of a binary capture; ``event_tags`` defaults to the file found by
+    ``find_event_tags``, ``header_version`` to ``capture_header_version``."""
+    record_type: Type[AnyRecord] = CompactLogRecord if compact else LogRecord
+    if header_version is None:
+        header_version = capture_header_version(Path(path))
+    if event_tags is None:
+        tags_path = find_event_tags(Path(path))
+        event_tags = load_event_tags(tags_path) if tags_path is not None else {}
+    offset = None if tz is None else tz.utcoffset(None)
+    last_sec: Optional[int] = None
+    stamp = ""
+    # the " pid tid L tag: " columns repeat for every entry of a thread and tag
+    heads: Dict[Tuple[int, int, str, str], str] = {}
+    with open_input(path) as handle:
+        for pid, tid, sec, nsec, name, payload in iter_entries(handle, buffer, header_version):
+            if sec != last_sec:
+                # entries arrive in time order, so the formatted second is reused
+                moment = time.localtime(sec) if offset is None else time.gmtime(sec + offset // timedelta(seconds=1))
+                stamp = time.strftime("%m-%d %H:%M:%S", moment)
+                last_sec = sec
+            ts = stamp + _MILLIS[nsec // 1000000]
+            level, tag, message = decode_payload(payload, name, event_tags)
+            key = (pid, tid, level, tag)
+            columns = heads.get(key)
+            if columns is None:
+                if len(heads) >= _HEADS_LIMIT:
+                    heads.clear()
+                columns = heads[key] = f" {pid:5d} {tid:5d} {level} {tag:<8}: "
+            prefix = ts + columns
+            if "\n" not in message:
+                yield record_type(ts, level, tag, message, prefix + message, source, pid, tid)
+                continue
+            for line in message.rstrip("\n").split("\n"):
+                yield record_type(ts, level, tag, line, prefix + line, source, pid, tid)
+
+
+__all__ = [
+    "capture_header_version",
+    "decode_payload",
+    "find_event_tags",
+    "is_binary_logcat",
+    "iter_binary_records",
+    "iter_entries",
+    "load_event_tags",
+]
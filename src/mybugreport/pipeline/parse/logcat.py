@@ -0,0 +1,74 @@
+"""Logcat line parser for the parse stage (``threadtime``, ``brief`` and section headers).
+
+``parse_log_line`` returns ``(ts, pid, tid, level, tag, msg)`` or None for
+lines that are not log entries.  The common threadtime layout
+
+    06-21 12:34:56.789  1000  1234 I ActivityManager: Start proc ...
+
+is recognized by a fixed-column check and split with ``str`` methods, with or
+without the uid column that bugreport SYSTEM LOG sections add
+(``-v threadtime -v uid``; numeric or a name such as ``root`` or ``u0_a12``,
+accepted and dropped).  Other variants (``-v year``, odd spacing) go through
+precompiled patterns.  Lines
+are classified by their first character, so non-log lines cost a couple of
+comparisons.
+"""
+
+import re
+from typing import Optional, Tuple
+
+LEVELS = frozenset("VDIWEFAS")
+SECTION_TAG = "section"
+
+ParsedLine = Tuple[Optional[str], Optional[int], Optional[int], Optional[str], Optional[str], str]
+
+_THREADTIME_RE = re.compile(
+    r"((?:\d{4}-)?\d\d-\d\d \d\d:\d\d:\d\d\.\d+)\s+(?:(?:\d+|[A-Za-z_]\w*)\s+)?(\d+)\s+(\d+)\s+([VDIWEFAS])\s+(.*?)\s*: (.*)"
+)
+_BRIEF_RE = re.compile(r"([VDIWEFAS])/(.*?)\s*\(\s*(\d+)\): (.*)")
+_SECTION_RE = re.compile(r"------ (.*?) ------")
+
+
+def _parse_other(line: str) -> Optional[ParsedLine]:
+    first = line[0]
+    if "0" <= first <= "9":
+        match = _THREADTIME_RE.match(line)
+        if match is None:
+            return None
+        ts, pid, tid, level, tag, msg = match.groups()
+        return ts, int(pid), int(tid), level, tag, msg
+    if first in LEVELS and line[1:2] == "/":
+        match = _BRIEF_RE.match(line)
+        if match is None:
+            return None
+        level, tag, pid, msg = match.groups()
+        return None, int(pid), None, level, tag, msg
+    if first == "-" and line.startswith("------ "):
+        match = _SECTION_RE.match(line)
+        if match is not None:
+            return None, None, None, None, SECTION_TAG, match.group(1)
+    return None
+
+
+def parse_log_line(line: str) -> Optional[ParsedLine]:
+    """Parse one line (without trailing newline); None when it is not a log line."""
+    # Fast path: threadtime "MM-DD HH:MM:SS.mmm" in columns 0-17, then whitespace-separated fields.
+    if line[14:15] == "." and line[18:19] == " " and line[2:3] == "-":
+        fields = line[18:].split(None, 3)
+        if len(fields) == 4 and fields[2] in LEVELS:
+            pid, tid, level, rest = fields
+            tag, sep, msg = rest.partition(": ")
+            if sep and pid.isdigit() and tid.isdigit():
+                return line[:18], int(pid), int(tid), level, tag.rstrip(), msg
+        elif len(fields) == 4 and fields[3][1:2] == " " and fields[3][0] in LEVELS:
+            # -v uid: "uid pid tid L tag: msg"
+            uid, pid, tid, rest = fields
+            tag, sep, msg = rest[2:].partition(": ")
+            if sep and pid.isdigit() and tid.isdigit() and (uid.isdigit() or uid.isidentifier()):
+                return line[:18], int(pid), int(tid), rest[0], tag.strip(), msg
+    if not line:
+        return None
+    return _parse_other(line)
+
+
+__all__ = ["LEVELS", "SECTION_TAG", "parse_log_line"]
@@ -0,0 +1,294 @@
+"""Section offset index for bugreports.
+
+A bugreport is a concatenation of dumpstate sections
+
+    ------ SYSTEM LOG (logcat -v threadtime -v printable -d *:v) ------
+    ...
+    ------ 0.512s was the duration of 'SYSTEM LOG' ------
+
+with ``DUMP OF SERVICE <name>:`` blocks nested inside the dumpsys sections.
+``index_sections`` locates these headers with ``bytes.find`` over an ``mmap``
+(no per-line work) and records each section's name, command and byte range, so
+later stages can seek to the few sections they need.  The index is stored as
+``<stem>.sections.json`` next to ``artifacts.json``.
+
+Compressed inputs (see ``archive``) are indexed in one streamed pass; their
+offsets refer to the decompressed text and ``read_spans`` reaches them by
+reading forward.
+"""
+
+import heapq
+import io
+import re
+from mmap import ACCESS_READ, mmap
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from ...archive import container_path, input_stem, is_archive, open_input, skip_bytes
+from ...context_extractor import DEFAULT_BLOCK_SIZE
+from ...models import BugreportSection
+from ...timestamp_index import default_index_dir, input_fingerprint
+from ...utils import read_json, write_json
+
+SECTION_PREFIX = b"------ "
+SERVICE_PREFIX = b"DUMP OF SERVICE "
+SECTIONS_INDEX_SUFFIX = ".sections.json"
+_OPEN_END = -1  # end of a section still open when the input ends
+
+_HEADER_RE = re.compile(rb"------ (.*?)(?: \((.*)\))? ------\s*$")
+_DURATION_RE = re.compile(rb"------ [\d.]+s was the duration of '.*' ------")
+_SERVICE_RE = re.compile(rb"DUMP OF SERVICE (?:(?:CRITICAL|HIGH|NORMAL) )?(.+?):\s*$")
+
+
+def _iter_prefixed_lines(buf, prefix: bytes) -> Iterator[int]:
+    if buf[: len(prefix)] == prefix:
+        yield 0
+    pos = buf.find(b"\n" + prefix)
+    while pos != -1:
+        yield pos + 1
+        pos = buf.find(b"\n" + prefix, pos + 1)
+
+
+def _decode(value: bytes) -> str:
+    return value.decode("utf-8", errors="replace")
+
+
+def _buffer_markers(buf) -> Iterator[Tuple[int, bytes, bool]]:
+    size = len(buf)
+    markers = heapq.merge(
+        ((offset, False) for offset in _iter_prefixed_lines(buf, SECTION_PREFIX)),
+        ((offset, True) for offset in _iter_prefixed_lines(buf, SERVICE_PREFIX)),
+    )
+    for offset, is_service in markers:
+        newline = buf.find(b"\n", offset)
+        yield offset, buf[offset : size if newline == -1 else newline], is_service
+
+
+def index_sections_buffer(buf) -> List[BugreportSection]:
+    """Index the sections of an in-memory/mmap'd bugreport, ordered by start offset."""
+    return _close_open_sections(_index_markers(_buffer_markers(buf)), len(buf))
+
+
+def index_sections_stream(handle) -> List[BugreportSection]:
+    """Same index from a forward-only binary stream (a compressed member), read line by line."""
+    size = 0
+
+    def markers() -> Iterator[Tuple[int, bytes, bool]]:
+        nonlocal size
+        for line in handle:
+            if line.startswith(SECTION_PREFIX):
+                yield size, line.rstrip(b"\n"), False
+            elif line.startswith(SERVICE_PREFIX):
+                yield size, line.rstrip(b"\n"), True
+            size += len(line)
+
+    sections = _index_markers(markers())
+    return _close_open_sections(sections, size)
+
+
+def _close_open_sections(sections: List[BugreportSection], size: int) -> List[BugreportSection]:
+    for section in sections:
+        if section.end == _OPEN_END:
+            section.end = size
+    return sections
+
+
+def _index_markers(markers: Iterable[Tuple[int, bytes, bool]]) -> List[BugreportSection]:
+    sections: List[BugreportSection] = []
+    current: Optional[BugreportSection] = None
+    service: Optional[BugreportSection] = None
+
+    def close(section: Optional[BugreportSection], end: int) -> None:
+        if section is not None:
+            section.end = end
+
+    for offset, line, is_service in markers:
+        if is_service:
+            match = _SERVICE_RE.match(line)
+            if match is None:
+                continue
+            close(service, offset)
+            name = _decode(match.group(1))
+            service = BugreportSection(name, offset, _OPEN_END, command=f"dumpsys {name}", kind="service")
+            sections.append(service)
+            continue
+        if _DURATION_RE.match(line):
+            close(service, offset)
+            close(current, offset)
+            service = current = None
+            continue
+        match = _HEADER_RE.match(line)
+        if match is None:
+            continue
+        close(service, offset)
+        close(current, offset)
+        service = None
+        name, command = match.groups()
+        current = BugreportSection(_decode(name), offset, _OPEN_END, command=_decode(command) if command else None)
+        sections.append(current)
+    return sections
+
+
+def index_sections(bugreport_path: Path) -> List[BugreportSection]:
+    """Index the sections of ``bugreport_path`` without reading it line by line."""
+    if is_archive(bugreport_path):
+        with open_input(bugreport_path) as handle:
+            return index_sections_stream(handle)
+    bugreport_path = Path(bugreport_path)
+    if bugreport_path.stat().st_size == 0:
+        return []
+    with bugreport_path.open("rb") as handle, mmap(handle.fileno(), 0, access=ACCESS_READ) as buf:
+        return index_sections_buffer(buf)
+
+
+def sections_index_path(artifacts_dir: Path, bugreport_path: Path) -> Path:
+    """Sidecar location: ``<artifacts_dir>/<stem>.sections.json`` (next to artifacts.json)."""
+    return Path(artifacts_dir) / f"{input_stem(bugreport_path)}{SECTIONS_INDEX_SUFFIX}"
+
+
+def write_sections_index(
+    bugreport_path: Path,
+    output_path: Path,
+    sha256: Optional[str] = None,
+    sections: Optional[List[BugreportSection]] = None,
+) -> Path:
+    bugreport_path = Path(bugreport_path)
+    if sections is None:
+        sections = index_sections(bugreport_path)
+    payload = {
+        "path": str(bugreport_path),
+        "size_bytes": container_path(bugreport_path).stat().st_size,
+        "sha256": sha256,
+        "sections": sections,
+    }
+    write_json(payload, Path(output_path))
+    return Path(output_path)
+
+
+def load_sections_index(index_path: Path, bugreport_path: Optional[Path] = None) -> List[BugreportSection]:
+    """Load a sidecar; raises ValueError if it no longer matches ``bugreport_path``'s size."""
+    payload = read_json(Path(index_path))
+    if bugreport_path is not None and payload.get("size_bytes") != container_path(bugreport_path).stat().st_size:
+        raise ValueError(f"sections index {index_path} is stale for {bugreport_path}")
+    return [BugreportSection(**item) for item in payload.get("sections", [])]
+
+
+def select_sections(sections: Iterable[BugreportSection], names: Iterable[str]) -> List[Tuple[int, int]]:
+    """Merged, sorted byte spans of the sections whose name matches one of ``names``.
+
+    Names compare case-insensitively; nested sections (services inside DUMPSYS)
+    collapse into their parent span when both are selected.
+    """
+    wanted = {name.strip().lower() for name in names if name.strip()}
+    spans = sorted((s.start, s.end) for s in sections if s.name.lower() in wanted)
+    merged: List[Tuple[int, int]] = []
+    for start, end in spans:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def section_spans_for(
+    bugreport_path: Path, names: Iterable[str], index_path: Optional[Path] = None
+) -> List[Tuple[int, int]]:
+    """Spans of the named sections, from the sidecar when it is present and current."""
+    sections = None
+    if index_path is not None and Path(index_path).exists():
+        try:
+            sections = load_sections_index(index_path, bugreport_path)
+        except ValueError:
+            sections = None
+    if sections is None:
+        sections = index_sections(bugreport_path)
+    return select_sections(sections, names)
+
+
+def cached_sections(bugreport_path: Path, index_dir: Optional[Path] = None) -> List[BugreportSection]:
+    """Sections of a legacy CLI input, cached as ``<sha256>.sections.json`` in the index directory."""
+    index_dir = Path(index_dir) if index_dir else default_index_dir(str(bugreport_path))
+    digest = input_fingerprint(str(bugreport_path), index_dir)
+    index_path = index_dir / f"{digest}{SECTIONS_INDEX_SUFFIX}"
+    if index_path.exists():
+        try:
+            return load_sections_index(index_path, bugreport_path)
+        except (ValueError, TypeError, KeyError):
+            pass
+    sections = index_sections(bugreport_path)
+    write_sections_index(bugreport_path, index_path, sha256=digest, sections=sections)
+    return sections
+
+
+class SpanReader(io.RawIOBase):
+    """Read-only stream over the next ``size`` bytes of ``handle``; never reads past the span."""
+
+    def __init__(self, handle: BinaryIO, size: int):
+        super().__init__()
+        self._handle = handle
+        self.remaining = size
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        count = min(len(buffer), self.remaining)
+        data = self._handle.read(count) if count else b""
+        buffer[: len(data)] = data
+        # a short file ends the span early
+        self.remaining = self.remaining - len(data) if data else 0
+        return len(data)
+
+
+def iter_span_readers(path: Path, spans: Sequence[Tuple[int, int]]) -> Iterator[SpanReader]:
+    """A ``SpanReader`` per span, positioned with a seek instead of a scan (forward reads for archives)."""
+    if is_archive(path):
+        with open_input(path) as handle:
+            position = 0
+            for start, end in sorted(spans):
+                skip_bytes(handle, start - position)
+                reader = SpanReader(handle, end - start)
+                yield reader
+                # the consumer may stop early: skip what it left of the span
+                skip_bytes(handle, reader.remaining)
+                position = end
+        return
+    with Path(path).open("rb") as handle:
+        for start, end in spans:
+            handle.seek(start)
+            yield SpanReader(handle, end - start)
+
+
+def read_spans(
+    path: Path, spans: Sequence[Tuple[int, int]], block_size: int = DEFAULT_BLOCK_SIZE
+) -> Iterator[bytes]:
+    """Raw bytes of the spans in order, in chunks of at most ``block_size``."""
+    for reader in iter_span_readers(path, spans):
+        while True:
+            chunk = reader.read(block_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def iter_span_text_lines(path: Path, spans: Sequence[Tuple[int, int]], encoding: str = "utf-8") -> Iterator[str]:
+    """Text lines of the selected spans, decoded like ``open(path, "r")`` would, in constant memory."""
+    for reader in iter_span_readers(path, spans):
+        yield from io.TextIOWrapper(io.BufferedReader(reader), encoding=encoding)
+
+
+__all__ = [
+    "cached_sections",
+    "index_sections",
+    "index_sections_buffer",
+    "index_sections_stream",
+    "SpanReader",
+    "iter_span_readers",
+    "iter_span_text_lines",
+    "load_sections_index",
+    "read_spans",
+    "section_spans_for",
+    "sections_index_path",
+    "select_sections",
+    "write_sections_index",
+]
@@ -0,0 +1,236 @@
+"""Make-style DAG scheduler for pipeline stages.
+
+Each ``Node`` declares the files it reads (``inputs``) and writes
+(``outputs``); a node that reads another node's output depends on it, and
+``after`` adds order-only dependencies (run after, but never a reason to
+rebuild).  As with make, a node is skipped when all of its outputs exist and
+are newer than all of its inputs, unless an upstream node ran in this run.
+
+With ``jobs > 1`` ready nodes run concurrently in worker processes (a fresh
+one per node on Python 3.11+), so node functions and their arguments must be
+picklable (module-level functions).  Every node gets its wall time and its
+peak RSS: on Linux the kernel's high-water mark (VmHWM) is reset before the
+node runs, so the peak is the node's own even in a reused worker; elsewhere
+it is the peak of the process that ran it.
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..config import log_debug
+from ..utils import write_json
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
+
+@dataclass
+class Node:
+    name: str
+    func: Callable[..., Any]
+    args: Tuple[Any, ...] = ()
+    inputs: Sequence[Path] = ()
+    outputs: Sequence[Path] = ()
+    after: Sequence[str] = ()
+
+
+@dataclass
+class NodeResult:
+    name: str
+    status: str  # ran | skipped | failed | blocked
+    wall_time: float = 0.0
+    max_rss_kb: Optional[int] = None
+    note: Optional[str] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class _Graph:
+    nodes: Dict[str, Node]
+    deps: Dict[str, List[str]] = field(default_factory=dict)
+    order: List[str] = field(default_factory=list)
+
+
+def _max_rss_kb() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _reset_peak_rss() -> bool:
+    """Reset this process's VmHWM (Linux ``clear_refs``); False where unsupported."""
+    try:
+        with open("/proc/self/clear_refs", "w") as handle:
+            handle.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_kb(reset: bool) -> Optional[int]:
+    if reset:
+        try:
+            with open("/proc/self/status") as handle:
+                for line in handle:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1])
+        except (OSError, ValueError):
+            pass
+    return _max_rss_kb()
+
+
+def _execute(func: Callable[..., Any], args: Tuple[Any, ...]) -> Tuple[Any, float, Optional[int]]:
+    reset = _reset_peak_rss()
+    started = time.perf_counter()
+    value = func(*args)
+    return value, time.perf_counter() - started, _peak_rss_kb(reset)
+
+
+# max_tasks_per_child is new in Python 3.11; older versions reuse workers
+_POOL_OPTIONS: Dict[str, Any] = {"max_tasks_per_child": 1} if sys.version_info >= (3, 11) else {}
+
+
+def build_graph(nodes: Sequence[Node]) -> _Graph:
+    """Resolve dependencies; raises ValueError on duplicate names, outputs or cycles."""
+    by_name: Dict[str, Node] = {}
+    producers: Dict[str, str] = {}
+    for node in nodes:
+        if node.name in by_name:
+            raise ValueError(f"duplicate node name: {node.name}")
+        by_name[node.name] = node
+        for output in node.outputs:
+            key = os.path.abspath(output)
+            if key in producers:
+                raise ValueError(f"{output} is produced by both {producers[key]} and {node.name}")
+            producers[key] = node.name
+    graph = _Graph(nodes=by_name)
+    for node in nodes:
+        deps = [producers[os.path.abspath(path)] for path in node.inputs if os.path.abspath(path) in producers]
+        for name in node.after:
+            if name not in by_name:
+                raise ValueError(f"{node.name} runs after unknown node {name}")
+            deps.append(name)
+        graph.deps[node.name] = sorted(set(deps) - {node.name})
+
+    state: Dict[str, int] = {}  # 1 = visiting, 2 = done
+
+    def visit(name: str, trail: List[str]) -> None:
+        if state.get(name) == 2:
+            return
+        if state.get(name) == 1:
+            raise ValueError(f"dependency cycle: {' -> '.join(trail + [name])}")
+        state[name] = 1
+        for dep in graph.deps[name]:
+            visit(dep, trail + [name])
+        state[name] = 2
+        graph.order.append(name)
+
+    for node in nodes:
+        visit(node.name, [])
+    return graph
+
+
+def is_up_to_date(node: Node) -> bool:
+    """Make's rule: every output exists and is newer than every input."""
+    if not node.outputs:
+        return False
+    try:
+        oldest_output = min(Path(path).stat().st_mtime_ns for path in node.outputs)
+    except FileNotFoundError:
+        return False
+    newest_input = max((Path(path).stat().st_mtime_ns for path in node.inputs), default=0)
+    # equal stamps count as stale: coarse filesystem clocks can give an input and
+    # an output written in quick succession the same mtime
+    return newest_input < oldest_output
+
+
+def run_dag(
+    nodes: Sequence[Node], jobs: int = 1, force: bool = False, stats_path: Optional[Path] = None
+) -> List[NodeResult]:
+    """Run ``nodes`` in dependency order; returns one result per node, in topological order.
+
+    A failed node blocks its dependents while independent nodes still run;
+    RuntimeError is raised once nothing else can run.  ``stats_path`` receives
+    the results as JSON either way.
+    """
+    graph = build_graph(nodes)
+    results: Dict[str, NodeResult] = {}
+    rebuilt: set = set()
+    pending = list(graph.order)
+
+    def ready(name: str) -> bool:
+        return all(dep in results for dep in graph.deps[name])
+
+    def settle(name: str) -> Optional[Node]:
+        """Record skip/blocked outcomes; return the node if it has to run."""
+        node = graph.nodes[name]
+        deps = graph.deps[name]
+        if any(results[dep].status in ("failed", "blocked") for dep in deps):
+            results[name] = NodeResult(name, "blocked")
+            return None
+        missing = [str(path) for path in node.inputs if not Path(path).exists()]
+        if missing:
+            results[name] = NodeResult(name, "failed", error=f"missing inputs: {', '.join(missing)}")
+            return None
+        upstream_ran = any(dep in rebuilt for dep in deps if dep not in node.after)
+        if not force and not upstream_ran and is_up_to_date(node):
+            results[name] = NodeResult(name, "skipped")
+            return None
+        return node
+
+    def finish(name: str, outcome: Tuple[Any, float, Optional[int]]) -> None:
+        value, wall_time, rss = outcome
+        results[name] = NodeResult(name, "ran", wall_time, rss, note=None if value is None else str(value))
+        rebuilt.add(name)
+        log_debug(f"dag node {name} ran in {wall_time:.3f}s")
+
+    def fail(name: str, exc: BaseException) -> None:
+        results[name] = NodeResult(name, "failed", error=f"{type(exc).__name__}: {exc}")
+
+    if jobs <= 1:
+        for name in pending:
+            node = settle(name)
+            if node is None:
+                continue
+            try:
+                finish(name, _execute(node.func, tuple(node.args)))
+            except Exception as exc:
+                fail(name, exc)
+    else:
+        running: Dict[Future, str] = {}
+        with ProcessPoolExecutor(max_workers=jobs, **_POOL_OPTIONS) as executor:
+            while pending or running:
+                for name in [name for name in pending if ready(name)]:
+                    pending.remove(name)
+                    node = settle(name)
+                    if node is not None:
+                        running[executor.submit(_execute, node.func, tuple(node.args))] = name
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        finish(name, future.result())
+                    except Exception as exc:
+                        fail(name, exc)
+
+    ordered = [results[name] for name in graph.order]
+    if stats_path is not None:
+        write_json(ordered, Path(stats_path))
+    failed = [result for result in ordered if result.status == "failed"]
+    if failed:
+        details = "; ".join(f"{result.name}: {result.error}" for result in failed)
+        raise RuntimeError(f"pipeline failed: {details}")
+    return ordered
+
+
+__all__ = ["Node", "NodeResult", "build_graph", "is_up_to_date", "run_dag"]
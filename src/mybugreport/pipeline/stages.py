@@ -0,0 +1,183 @@
+"""Stage nodes of the ``pipeline`` subcommand, wired for ``scheduler.run_dag``.
+
+The graph follows docs/PIPELINE_CONTRACT.md::
+
+    collect ──► parse:<artifact> (one per input, independent) ──► analyze ──► report
+
+Node functions are module-level so that ``--jobs`` can run them in worker
+processes; they return a short note (the stage cache outcome) or None.
+"""
+
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from ..archive import container_path, input_stem, list_members, split_member
+from ..models import DeviceInfo
+from ..utils import read_json
+from .analyze import ANALYZER_VERSION, summarize_records
+from .cache import StageCache, analyze_cache_key, parse_cache_key
+from .collect import collect_existing_artifact, fingerprint_file, write_artifacts_index
+from .parse import (
+    PARSER_VERSION,
+    parse_artifacts_to_records,
+    records_file_name,
+    sections_index_path,
+    write_sections_index,
+)
+from .report import render_report_markdown
+from .scheduler import Node
+
+_KNOWN_TYPES = ("bugreport", "logcat", "dmesg")
+
+
+def artifact_type_for(path: Path) -> str:
+    stem = input_stem(path).lower()
+    return next((kind for kind in _KNOWN_TYPES if kind in stem), "log")
+
+
+def collect_node(inputs: Sequence[str], artifacts_dir: str, serial: str, model: Optional[str]) -> None:
+    device = DeviceInfo(serial=serial, model=model)
+    artifacts = [
+        collect_existing_artifact(
+            path, device, artifacts_dir, artifact_type="bugreport" if idx == 0 else artifact_type_for(Path(path))
+        )
+        for idx, path in enumerate(inputs)
+    ]
+    write_artifacts_index(artifacts, Path(artifacts_dir) / "artifacts.json")
+    write_sections_index(inputs[0], sections_index_path(artifacts_dir, inputs[0]), sha256=artifacts[0].sha256)
+
+
+def _artifact_sha256(artifacts_index: Path, artifact: str) -> str:
+    container = container_path(artifact)
+    for item in read_json(artifacts_index):
+        if container_path(item.get("path", "")) == container and item.get("sha256"):
+            return item["sha256"]
+    return fingerprint_file(container)
+
+
+def parse_node(
+    artifact: str,
+    source: str,
+    records_dir: str,
+    fmt: str,
+    sections: Optional[List[str]],
+    artifacts_dir: str,
+    workers: int,
+    cache_dir: Optional[str],
+) -> Optional[str]:
+    def produce() -> None:
+        parse_artifacts_to_records(
+            [artifact], records_dir, source=source, workers=workers, sections=sections, index_dir=artifacts_dir,
+            fmt=fmt,
+        )
+
+    if cache_dir is None:
+        produce()
+        return None
+    records_path = Path(records_dir) / records_file_name(Path(artifact), fmt)
+    digest = _artifact_sha256(Path(artifacts_dir) / "artifacts.json", artifact)
+    member = split_member(artifact)[1]
+    key = parse_cache_key(digest, PARSER_VERSION, fmt=fmt, sections=sections, source=source, member=member)
+    hit = StageCache(cache_dir).run(key, "parse", {"records": records_path}, produce)
+    return "cache hit" if hit else "cache miss"
+
+
+def analyze_node(
+    records_paths: Sequence[str], findings_path: str, sections_index: str, fmt: str, cache_dir: Optional[str]
+) -> Optional[str]:
+    def produce() -> None:
+        summarize_records(records_paths, findings_path, sections_index=sections_index, fmt=fmt)
+
+    if cache_dir is None:
+        produce()
+        return None
+    config = {"fmt": fmt, "sections": read_json(Path(sections_index)).get("sections", [])}
+    records_hash = ",".join(fingerprint_file(Path(path)) for path in records_paths)
+    key = analyze_cache_key(records_hash, ANALYZER_VERSION, config)
+    hit = StageCache(cache_dir).run(key, "analyze", {"findings": Path(findings_path)}, produce)
+    return "cache hit" if hit else "cache miss"
+
+
+def report_node(findings_path: str, report_path: str, artifacts_index: str) -> None:
+    render_report_markdown(findings_path, report_path, artifacts_path=artifacts_index)
+
+
+def build_pipeline_nodes(
+    bugreport: Path,
+    workdir: Path,
+    serial: str,
+    model: Optional[str] = None,
+    extra_artifacts: Sequence[Path] = (),
+    fmt: str = "jsonl",
+    sections: Optional[List[str]] = None,
+    workers: int = 1,
+    cache_dir: Optional[Path] = None,
+    all_members: bool = False,
+) -> List[Node]:
+    """Nodes for one pipeline run; the bugreport comes first, ``extra_artifacts``
+    (logcat/dmesg captures) are parsed alongside it and analyzed together.
+
+    all_members: parse every text member of a bugreport zip (dumpstate_board.txt...)
+    as its own node, streamed from the archive, instead of the main member only.
+    """
+    workdir = Path(workdir)
+    artifacts_dir = workdir / "collect"
+    records_dir = workdir / "parse"
+    artifacts_index = artifacts_dir / "artifacts.json"
+    sections_index = sections_index_path(artifacts_dir, bugreport)
+    findings_path = workdir / "analyze" / "findings.json"
+    report_path = workdir / "report" / "report.md"
+    cache = None if cache_dir is None else str(cache_dir)
+    inputs = [Path(bugreport), *map(Path, extra_artifacts)]
+
+    nodes = [
+        Node(
+            "collect",
+            collect_node,
+            ([str(path) for path in inputs], str(artifacts_dir), serial, model),
+            inputs=[container_path(path) for path in inputs],
+            outputs=[artifacts_index, sections_index],
+        )
+    ]
+    parse_inputs = [
+        member for path in inputs for member in (list_members(path) if all_members else [str(path)])
+    ]
+    records_paths = []
+    for idx, artifact in enumerate(parse_inputs):
+        records_path = records_dir / records_file_name(Path(artifact), fmt)
+        artifact_sections = sections if idx == 0 else None
+        source = "bugreport" if idx == 0 else artifact_type_for(Path(artifact))
+        container = container_path(artifact)
+        nodes.append(
+            Node(
+                f"parse:{input_stem(artifact)}",
+                parse_node,
+                (artifact, source, str(records_dir), fmt, artifact_sections, str(artifacts_dir), workers, cache),
+                inputs=[container, sections_index] if artifact_sections else [container],
+                outputs=[records_path],
+                after=["collect"],
+            )
+        )
+        records_paths.append(records_path)
+    nodes.append(
+        Node(
+            "analyze",
+            analyze_node,
+            ([str(path) for path in records_paths], str(findings_path), str(sections_index), fmt, cache),
+            inputs=[*records_paths, sections_index],
+            outputs=[findings_path],
+        )
+    )
+    nodes.append(
+        Node(
+            "report",
+            report_node,
+            (str(findings_path), str(report_path), str(artifacts_index)),
+            inputs=[findings_path, artifacts_index],
+            outputs=[report_path],
+        )
+    )
+    return nodes
+
+
+__all__ = ["artifact_type_for", "build_pipeline_nodes"]
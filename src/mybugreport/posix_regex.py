@@ -0,0 +1,173 @@
+"""
+Translate POSIX regular expressions (grep BRE, awk ERE) into Python ``re`` syntax.
+
+The translated patterns are meant to be compiled with ``re.MULTILINE`` and run
+over buffers holding many lines, so nothing produced here may match a newline.
+"""
+
+import re
+from typing import List, Tuple
+
+_POSIX_CLASSES = {
+    "alpha": "a-zA-Z",
+    "digit": "0-9",
+    "alnum": "0-9a-zA-Z",
+    "upper": "A-Z",
+    "lower": "a-z",
+    "space": " \\t\\r\\f\\v",
+    "blank": " \\t",
+    "punct": "!-/:-@\\[-`{-~",
+    "xdigit": "0-9A-Fa-f",
+    "cntrl": "\\x00-\\x09\\x0b-\\x1f\\x7f",
+    "print": " -~",
+    "graph": "!-~",
+}
+
+_BRE_ESCAPES = {
+    "(": "(",
+    ")": ")",
+    "{": "{",
+    "}": "}",
+    "|": "|",
+    "+": "+",
+    "?": "?",
+    "w": "\\w",
+    "W": "[^\\w\\n]",
+    "s": "[^\\S\\n]",
+    "S": "\\S",
+    "b": "\\b",
+    "B": "\\B",
+    "<": "\\b(?=\\w)",
+    ">": "\\b(?<=\\w)",
+    "`": "^",
+    "'": "$",
+}
+
+
+def _translate_bracket(pattern: str, pos: int) -> Tuple[str, int]:
+    """Translate a POSIX bracket expression starting at ``pattern[pos] == '['``."""
+    i = pos + 1
+    negate = False
+    if i < len(pattern) and pattern[i] == "^":
+        negate = True
+        i += 1
+    parts: List[str] = []
+    first = True
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "]" and not first:
+            body = "".join(parts)
+            # Never let a negated class run across the line terminator.
+            return ("[^\\n" + body + "]") if negate else ("[" + body + "]"), i + 1
+        if char == "[" and pattern.startswith("[:", i):
+            end = pattern.find(":]", i + 2)
+            if end != -1 and pattern[i + 2:end] in _POSIX_CLASSES:
+                parts.append(_POSIX_CLASSES[pattern[i + 2:end]])
+                i = end + 2
+                first = False
+                continue
+        if char == "-" and not first and i + 1 < len(pattern) and pattern[i + 1] != "]":
+            parts.append("-")
+        else:
+            parts.append(re.escape(char))
+        first = False
+        i += 1
+    # Unterminated bracket: grep rejects it, treat it as a literal instead.
+    return re.escape("["), pos + 1
+
+
+def bre_to_python(pattern: str) -> str:
+    """Translate a GNU basic regular expression into Python ``re`` syntax."""
+    out: List[str] = []
+    i = 0
+    at_start = True  # positions where '*' is literal and '^' is an anchor
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\" and i + 1 < len(pattern):
+            nxt = pattern[i + 1]
+            i += 2
+            if nxt in _BRE_ESCAPES:
+                out.append(_BRE_ESCAPES[nxt])
+                at_start = nxt in "(|"
+            elif nxt.isdigit() and nxt != "0":
+                out.append("\\" + nxt)
+                at_start = False
+            else:
+                out.append(re.escape(nxt))
+                at_start = False
+            continue
+        if char == "[":
+            translated, i = _translate_bracket(pattern, i)
+            out.append(translated)
+            at_start = False
+            continue
+        if char == "*" and at_start:
+            out.append("\\*")
+        elif char == "^" and at_start:
+            out.append("^")
+            i += 1
+            continue  # '*' right after an anchor is literal as well
+        elif char == "$" and (i + 1 == len(pattern) or pattern.startswith("\\)", i + 1) or pattern.startswith("\\|", i + 1)):
+            out.append("$")
+        elif char in ".*":
+            out.append(char)
+        else:
+            out.append(re.escape(char))
+        at_start = False
+        i += 1
+    return "".join(out)
+
+
+_ERE_ESCAPES = {
+    "y": "\\b",
+    "w": "\\w",
+    "W": "[^\\w\\n]",
+    "s": "[^\\S\\n]",
+    "S": "\\S",
+    "B": "\\B",
+    "<": "\\b(?=\\w)",
+    ">": "\\b(?<=\\w)",
+    "`": "^",
+    "'": "$",
+    "t": "\\t",
+    "r": "\\r",
+    "f": "\\f",
+    "v": "\\v",
+}
+
+
+def ere_to_python(pattern: str) -> str:
+    """Translate an awk (gawk) extended regular expression into Python ``re`` syntax."""
+    out: List[str] = []
+    i = 0
+    at_start = True  # a leading repetition operator is taken literally
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\" and i + 1 < len(pattern):
+            nxt = pattern[i + 1]
+            i += 2
+            out.append(_ERE_ESCAPES.get(nxt) or re.escape(nxt))
+            at_start = False
+            continue
+        if char == "[":
+            translated, i = _translate_bracket(pattern, i)
+            out.append(translated)
+            at_start = False
+            continue
+        if char in "*+?" and at_start:
+            out.append(re.escape(char))
+        elif char in "(|":
+            out.append(char)
+            i += 1
+            at_start = True
+            continue
+        elif char in ".*+?)^${}":
+            out.append(char)
+        else:
+            out.append(re.escape(char))
+        at_start = char == "^"
+        i += 1
+    return "".join(out)
+
+
+__all__ = ["bre_to_python", "ere_to_python"]
@@ -3,39 +3,123 @@ Processing pipeline utilities that keep behavior backward compatible
 while providing clear extension points for future enhancements.
 """
 
-import subprocess
-from typing import Dict, Iterable
+import locale
+import os
+import shutil
+import sys
+import tempfile
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
 
 from typing import Callable, Optional
 
-from .config import debug_iterable, log_debug
+from .archive import container_path, open_input
+from .config import SECTION_SCOPE, TIMESTAMP_INDEX, debug_iterable, log_debug
+from .context_extractor import (
+    DEFAULT_BLOCK_SIZE,
+    ContextExtractor,
+    compile_patterns,
+    iter_line_blocks,
+    parse_context_lines,
+    stream_context_sections,
+)
 from .io_utils import check_output_nonempty
 from .hooks import apply_hooks
-from .rules import escape_pattern
-from .time_utils import replace_time_strings_in_line
+from .sections import SectionExtractor, iter_sections
+from .timestamp_index import indexed_context_lines
+from .translation import TranslationEngine, compile_translations
 
+# Section lines are held back until the context output is complete; beyond this
+# size they spill to a temporary file so memory stays bounded.
+SECTION_SPOOL_BYTES = 8 * 1024 * 1024
 
-def extract_context_sections(dates: Iterable[str], input_file: str, output_file: str, num_context_lines: str) -> None:
-    """Run grep with context around provided timestamps (original behavior)."""
-    dates_arg_list = ['-e ' + d for d in dates]
-    debug_iterable("date_patterns", dates_arg_list)
 
-    command = ['grep', '-A', num_context_lines, '-B', num_context_lines] + dates_arg_list + [input_file]
-    log_debug(f"Running grep command: {' '.join(command)}")
-    with open(output_file, "w") as outfile:
-        subprocess.run(command, stdout=outfile, shell=False)
+def legacy_date_patterns(dates: Iterable[str]) -> List[str]:
+    """Patterns exactly as the original ``grep '-e <date>'`` invocation saw them.
+
+    The old command passed ``'-e ' + date`` as a single argv entry, so grep
+    received the pattern with a leading space; keep that for identical output.
+    """
+    return [' ' + d for d in dates]
+
+
+def extract_context_sections(
+    dates: Iterable[str],
+    input_file: str,
+    output_file: str,
+    num_context_lines: str,
+    use_index: Optional[bool] = None,
+) -> None:
+    """Write grep-style context around provided timestamps (original behavior, in-process).
+
+    use_index: look the timestamps up in the persistent offset index instead of
+    scanning the whole input (defaults to MYBUGREPORT_TIMESTAMP_INDEX); falls
+    back to the scan for patterns without an indexable timestamp.
+    """
+    patterns = legacy_date_patterns(dates)
+    debug_iterable("date_patterns", patterns)
+
+    with open(output_file, "wb") as outfile:
+        if not os.path.exists(input_file):
+            sys.stderr.write(f"[WARN] input file not found: {input_file}\n")
+            return
+        lines = None
+        if TIMESTAMP_INDEX if use_index is None else use_index:
+            lines = indexed_context_lines(patterns, input_file, num_context_lines)
+            if lines is None:
+                log_debug("Timestamp index not applicable to these patterns; scanning input")
+        if lines is None:
+            lines = stream_context_sections(patterns, input_file, num_context_lines)
+        outfile.writelines(lines)
 
 
 def extract_section_with_rules(input_file: str, output_file: str, start_pattern: str, end_pattern: str) -> None:
-    """Extract a log section using rule2 patterns via awk (unchanged output)."""
+    """Extract the first log section matching rule2 patterns (same output as the former awk call)."""
     if not start_pattern or not end_pattern:
         log_debug("Section extraction skipped: missing start/end patterns")
         return
-    escaped_start = escape_pattern(start_pattern)
-    awk_command = f"awk '/{escaped_start}/ {{p=1; print; next}} /{end_pattern}/ && p {{exit}} p' {input_file}"
-    log_debug(f"Running awk command: {awk_command}")
-    with open(output_file, "a") as outfile:
-        subprocess.run(awk_command, stdout=outfile, shell=True)
+    extract_sections(input_file, output_file, [(start_pattern, end_pattern)], repeat=False)
+
+
+def extract_sections(
+    input_file: str,
+    output_file: str,
+    rules: Sequence[Tuple[str, str]],
+    repeat: bool = True,
+    scope: Optional[Sequence[str]] = None,
+) -> None:
+    """Append every section matched by ``rules`` to ``output_file`` in one scan of the input.
+
+    scope: bugreport section names (``SYSTEM LOG``, ``activity``...) to search
+    instead of the whole input (defaults to MYBUGREPORT_SECTION_SCOPE); the
+    byte ranges come from the cached section index, so other sections are
+    never read.
+    """
+    scope = SECTION_SCOPE if scope is None else scope
+    log_debug(f"Extracting sections for {len(rules)} rule(s), repeat={repeat}, scope={list(scope)}")
+    with open(output_file, "ab") as outfile:
+        if not os.path.exists(input_file):
+            sys.stderr.write(f"[WARN] input file not found: {input_file}\n")
+            return
+        if scope:
+            outfile.writelines(_iter_scoped_sections(input_file, rules, repeat, scope))
+        else:
+            outfile.writelines(iter_sections(input_file, rules, repeat=repeat))
+
+
+def _iter_scoped_sections(
+    input_file: str, rules: Sequence[Tuple[str, str]], repeat: bool, scope: Sequence[str]
+) -> Iterator[bytes]:
+    # Imported here: the pipeline package imports parallel, which imports this module.
+    from .pipeline.parse.sections import cached_sections, iter_span_readers, select_sections
+
+    spans = select_sections(cached_sections(input_file), scope)
+    log_debug(f"Section scope {list(scope)} resolved to {len(spans)} byte range(s)")
+    extractor = SectionExtractor(rules, repeat=repeat)
+    for reader in iter_span_readers(input_file, spans):
+        for block in iter_line_blocks(reader):
+            if extractor.done:
+                return
+            yield from extractor.feed(block)
 
 
 def apply_translations_and_time(
@@ -47,16 +131,11 @@ def apply_translations_and_time(
 
     post_processors: optional callable list for future plugin-style hooks (default no-op).
     """
+    engine = compile_translations(replacements)
     with open(output_file, 'r') as file_in:
         lines = file_in.readlines()
 
-    processed_lines = []
-    for line in lines:
-        updated_line = line
-        for key, value in replacements.items():
-            updated_line = updated_line.replace(key, value)
-            updated_line = replace_time_strings_in_line(updated_line)
-        processed_lines.append(updated_line)
+    processed_lines = list(engine.translate_lines(lines))
 
     with open(output_file, 'w') as file_out:
         file_out.writelines(processed_lines)
@@ -67,3 +146,83 @@ def apply_translations_and_time(
     # Optional post-processing hooks for future extensibility (default None)
     apply_hooks(output_file, post_processors)
     check_output_nonempty(output_file)
+
+
+def _split_text_lines(text: str) -> Iterator[str]:
+    start = 0
+    while start < len(text):
+        end = text.find("\n", start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end + 1]
+        start = end + 1
+
+
+class OutputTranslator:
+    """Translate raw output lines the way a text-mode reread of the output file would.
+
+    The legacy flow wrote grep/awk bytes and reopened the file in text mode, so
+    lines are decoded with the locale encoding and universal newlines apply.
+    """
+
+    def __init__(self, engine: TranslationEngine):
+        self.engine = engine
+        self.encoding = locale.getpreferredencoding(False)
+
+    def __call__(self, raw: bytes) -> bytes:
+        text = raw.decode(self.encoding)
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        translate = self.engine.translate_line
+        return "".join(translate(line) for line in _split_text_lines(text)).encode(self.encoding)
+
+
+def run_fused_pipeline(
+    dates: Iterable[str],
+    input_file: str,
+    output_file: str,
+    num_context_lines: str,
+    section_rules: Sequence[Tuple[str, str]],
+    replacements: Dict[str, str],
+    post_processors: Optional[Iterable[Callable[[str], None]]] = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    repeat_sections: bool = False,
+) -> None:
+    """Produce the legacy output with a single read of ``input_file``.
+
+    Context windows and the rule2 section are extracted from the same blocks,
+    translated on the fly and written once.  Section lines follow the context
+    output, so they are spooled (in memory up to ``SECTION_SPOOL_BYTES``) until
+    the scan finishes.  Output is identical to the step-by-step flow.
+    ``input_file`` may be a zip/gz/xz capture; it is decompressed as it is read.
+
+    section_rules: ``(start, end)`` pairs; the legacy flow passes only the first
+    rule2 line, ``repeat_sections`` also extracts later occurrences.
+    """
+    context = parse_context_lines(num_context_lines)
+    patterns = legacy_date_patterns(dates)
+    debug_iterable("date_patterns", patterns)
+    extractor = ContextExtractor(compile_patterns(tuple(patterns)), context, context)
+    sections = SectionExtractor(section_rules, repeat=repeat_sections)
+    if not sections.scanners:
+        log_debug("Section extraction skipped: missing start/end patterns")
+    translate = OutputTranslator(compile_translations(replacements))
+
+    with open(output_file, "wb") as outfile, tempfile.SpooledTemporaryFile(max_size=SECTION_SPOOL_BYTES) as spool:
+        if os.path.exists(container_path(input_file)):
+            with open_input(input_file) as handle:
+                for block in iter_line_blocks(handle, block_size):
+                    for line in extractor.feed(block):
+                        outfile.write(translate(line))
+                    if not sections.done:
+                        for line in sections.feed(block):
+                            spool.write(translate(line))
+        else:
+            sys.stderr.write(f"[WARN] input file not found: {input_file}\n")
+        spool.seek(0)
+        shutil.copyfileobj(spool, outfile)
+
+    log_debug("Finished fused extraction, translations and time conversions")
+    apply_hooks(output_file, post_processors)
+    check_output_nonempty(output_file)
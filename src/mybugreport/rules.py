@@ -3,7 +3,7 @@ Rule loading and escaping helpers.
 These keep the original rule formats while providing extension points.
 """
 
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 
 from .config import (
     ALLOW_MISSING_RULES,
@@ -32,6 +32,34 @@ def read_section_rule(file_path: str = RULE2_FILE) -> Tuple[str, str]:
     return start, end
 
 
+def load_section_rules(file_path: str = RULE2_FILE) -> List[Tuple[str, str]]:
+    """
+    Read every ``start:end`` pair from the section rule file, skipping malformed lines.
+    """
+    rules: List[Tuple[str, str]] = []
+    for line in read_lines(
+        file_path,
+        description="section rules",
+        validate=VALIDATION_ENABLED,
+        allow_missing=ALLOW_MISSING_RULES,
+    ):
+        stripped = line.strip()
+        if not stripped:
+            continue
+        try:
+            start, end = stripped.split(":")
+        except ValueError:
+            log_debug(f"Skipping malformed section rule line: {stripped}")
+            continue
+        if not start or not end:
+            log_debug(f"Skipping section rule with empty pattern: {stripped}")
+            continue
+        rules.append((start, end))
+    if not rules:
+        log_debug("Section rules missing or empty; skipping extraction")
+    return rules
+
+
 def load_translation_pairs(file_path: str = RULE_FILE) -> Dict[str, str]:
     """
     Parse key/value replacements with tolerance for malformed lines.
@@ -0,0 +1,206 @@
+"""
+In-process section extraction for ``rule2.txt`` start/end patterns.
+
+``AwkSectionScanner`` reproduces the legacy awk program
+
+    /START/ {p=1; print; next} /END/ && p {exit} p
+
+on blocks of whole lines, so it can share a single read of the input with the
+context extractor.  With ``repeat=True`` the ``exit`` becomes ``p=0`` and every
+later occurrence is extracted too.  ``SectionExtractor`` runs several rules over
+the same blocks and emits each selected line once, in input order.  Patterns
+are awk extended regular expressions; the start pattern goes through
+``escape_pattern`` exactly like the old command line.
+"""
+
+import re
+from array import array
+from functools import lru_cache
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Pattern, Sequence, Tuple
+
+from .context_extractor import DEFAULT_BLOCK_SIZE, iter_line_blocks, iter_matching_lines
+from .posix_regex import ere_to_python
+from .rules import escape_pattern
+
+
+@lru_cache(maxsize=64)
+def compile_awk_pattern(pattern: str) -> Pattern[bytes]:
+    return re.compile(ere_to_python(pattern).encode("utf-8"), re.MULTILINE)
+
+
+class AwkSectionScanner:
+    """Emit the lines of START..END sections (END line excluded).
+
+    Only the first section is extracted unless ``repeat`` is set.
+    """
+
+    def __init__(self, start_pattern: str, end_pattern: str, repeat: bool = False):
+        self.start_pattern = start_pattern
+        self.end_pattern = end_pattern
+        self.repeat = repeat
+        self._start = compile_awk_pattern(escape_pattern(start_pattern))
+        self._end = compile_awk_pattern(end_pattern)
+        self.active = False
+        self.done = False
+
+    def _line_start(self, buf: bytes, match_pos: int, size: int) -> Optional[int]:
+        line_start = buf.rfind(b"\n", 0, match_pos) + 1
+        return None if line_start >= size else line_start
+
+    def _find_end_line(self, buf: bytes, pos: int) -> Optional[int]:
+        """Start of the first line at/after ``pos`` matching END but not START."""
+        size = len(buf)
+        while pos < size:
+            match = self._end.search(buf, pos)
+            if match is None:
+                return None
+            line_start = self._line_start(buf, match.start(), size)
+            if line_start is None:
+                return None
+            newline = buf.index(b"\n", line_start)
+            if self._start.search(buf, line_start, newline) is None:
+                return line_start
+            pos = newline + 1  # START takes precedence: the line stays in the section
+        return None
+
+    def scan(self, buf: bytes) -> Iterator[Tuple[int, int]]:
+        """Yield ``(start, end)`` offsets of the whole lines of ``buf`` inside a section."""
+        size = len(buf)
+        pos = 0
+        while pos < size and not self.done:
+            search_from = pos
+            if not self.active:
+                match = self._start.search(buf, pos)
+                if match is None:
+                    return
+                line_start = self._line_start(buf, match.start(), size)
+                if line_start is None:
+                    return
+                self.active = True
+                pos = line_start
+                search_from = buf.index(b"\n", pos) + 1  # the START line is always printed
+            end_line = self._find_end_line(buf, search_from)
+            if end_line is None:
+                yield pos, size
+                return
+            yield pos, end_line
+            self.active = False
+            self.done = not self.repeat
+            pos = buf.index(b"\n", end_line) + 1  # the END line itself is not printed
+
+    def feed(self, buf: bytes) -> Iterator[bytes]:
+        """Yield the section lines contained in ``buf`` one by one."""
+        for start, end in self.scan(buf):
+            yield from _split_lines(buf, start, end)
+
+    def line_events(self, buf: bytes, base: int = 0) -> Tuple["array[int]", "array[int]"]:
+        """Stateless scan: offsets of START lines and of END lines that are not START lines.
+
+        Chunks scanned independently (e.g. in worker processes) are combined
+        with ``resolve_section_spans``.
+        """
+        starts = array("Q", iter_matching_lines(self._start, buf, base))
+        ends = array("Q")
+        for offset in iter_matching_lines(self._end, buf, base):
+            line_start = offset - base
+            if self._start.search(buf, line_start, buf.index(b"\n", line_start)) is None:
+                ends.append(offset)
+        return starts, ends
+
+
+def resolve_section_spans(
+    events: Sequence[Tuple[Sequence[int], Sequence[int]]],
+    size: int,
+    repeat: bool = True,
+) -> List[Tuple[int, int]]:
+    """Merge per-rule ``(starts, ends)`` line offsets into sorted, disjoint byte spans."""
+    spans: List[Tuple[int, int]] = []
+    for starts, ends in events:
+        merged = sorted([(offset, 0) for offset in starts] + [(offset, 1) for offset in ends])
+        active_from = None
+        for offset, kind in merged:
+            if kind == 0 and active_from is None:
+                active_from = offset
+            elif kind == 1 and active_from is not None:
+                spans.append((active_from, offset))
+                active_from = None
+                if not repeat:
+                    break
+        if active_from is not None:
+            spans.append((active_from, size))
+    spans.sort()
+    disjoint: List[Tuple[int, int]] = []
+    for start, end in spans:
+        if disjoint and start <= disjoint[-1][1]:
+            if end > disjoint[-1][1]:
+                disjoint[-1] = (disjoint[-1][0], end)
+        else:
+            disjoint.append((start, end))
+    return disjoint
+
+
+def _split_lines(buf: bytes, start: int, end: int) -> Iterator[bytes]:
+    while start < end:
+        stop = buf.index(b"\n", start) + 1
+        yield buf[start:stop]
+        start = stop
+
+
+class SectionExtractor:
+    """Run several start/end rules over the same blocks in one scan.
+
+    Lines covered by more than one active section are emitted once; output
+    keeps the input order.
+    """
+
+    def __init__(self, rules: Iterable[Tuple[str, str]], repeat: bool = True):
+        self.scanners: List[AwkSectionScanner] = [
+            AwkSectionScanner(start, end, repeat=repeat) for start, end in rules if start and end
+        ]
+
+    @property
+    def done(self) -> bool:
+        return all(scanner.done for scanner in self.scanners)
+
+    def feed(self, buf: bytes) -> Iterator[bytes]:
+        spans: List[Tuple[int, int]] = []
+        for scanner in self.scanners:
+            if not scanner.done:
+                spans.extend(scanner.scan(buf))
+        if len(spans) > 1:
+            spans.sort()
+        cursor = 0
+        for start, end in spans:
+            start = max(start, cursor)
+            if start < end:
+                yield from _split_lines(buf, start, end)
+                cursor = end
+
+    def iter_lines(self, handle: BinaryIO, block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[bytes]:
+        for block in iter_line_blocks(handle, block_size):
+            if self.done:
+                return
+            yield from self.feed(block)
+
+
+def iter_sections(
+    input_file: str,
+    rules: Sequence[Tuple[str, str]],
+    repeat: bool = True,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Iterator[bytes]:
+    """Yield the lines of every section matched by ``rules`` in ``input_file``."""
+    extractor = SectionExtractor(rules, repeat=repeat)
+    if not extractor.scanners:
+        return
+    with open(input_file, "rb") as handle:
+        yield from extractor.iter_lines(handle, block_size)
+
+
+__all__ = [
+    "AwkSectionScanner",
+    "SectionExtractor",
+    "compile_awk_pattern",
+    "iter_sections",
+    "resolve_section_spans",
+]
@@ -0,0 +1,171 @@
+"""
+Time-range extraction over the logcat blocks of a bugreport.
+
+Each ``------ ... (logcat ...) ------`` section of a bugreport is a block of
+threadtime lines in time order.  Instead of matching every line against a
+pattern, the start of the requested range is located in each block by binary
+search over the ``mmap``'d input and lines are streamed until the end bound,
+so the cost is O(log n + output) per block.  A file without dumpstate section
+headers (a plain ``logcat -v threadtime`` capture) is treated as one block.
+
+Bounds are ``HH:MM[:SS[.mmm]]`` or ``MM-DD HH:MM[:SS[.mmm]]`` and are compared at
+their own precision, both inclusive: ``--to 12:35:00`` keeps ``12:35:00.999``.
+Lines without a timestamp (continuations, ``--------- beginning of`` markers)
+stay with the entry they follow.
+"""
+
+import os
+import re
+import sys
+from mmap import ACCESS_READ, mmap
+from typing import Iterator, List, Optional, Tuple
+
+from .config import log_debug
+from .context_extractor import GROUP_SEPARATOR
+
+SECTION_PREFIX = b"------ "
+LOGCAT_MARKER = b"(logcat"
+
+# Optional "YYYY-" (logcat -v year), then the threadtime "MM-DD HH:MM:SS.mmm".
+_STAMP_RE = re.compile(rb"(?:\d{4}-)?(\d\d-\d\d \d\d:\d\d:\d\d\.\d{3})")
+_BOUND_RE = re.compile(r"(?:(\d\d-\d\d) )?(\d\d:\d\d(?::\d\d(?:\.\d{1,3})?)?)")
+
+
+def parse_time_bound(value: str) -> bytes:
+    """Normalize a ``--from``/``--to`` value to the comparable key prefix."""
+    match = _BOUND_RE.fullmatch(value.strip())
+    if match is None:
+        raise ValueError(f"invalid time bound (expected [MM-DD ]HH:MM[:SS[.mmm]]): {value!r}")
+    day, clock = match.groups()
+    return f"{day} {clock}".encode("ascii") if day else clock.encode("ascii")
+
+
+def _line_key(buf, line_start: int, dated: bool) -> Optional[bytes]:
+    match = _STAMP_RE.match(buf, line_start)
+    if match is None:
+        return None
+    stamp = match.group(1)
+    return stamp if dated else stamp[6:]
+
+
+def _section_headers(buf) -> Iterator[int]:
+    if buf[: len(SECTION_PREFIX)] == SECTION_PREFIX:
+        yield 0
+    pos = buf.find(b"\n" + SECTION_PREFIX)
+    while pos != -1:
+        yield pos + 1
+        pos = buf.find(b"\n" + SECTION_PREFIX, pos + 1)
+
+
+def find_logcat_blocks(buf) -> List[Tuple[int, int]]:
+    """``(start, end)`` byte ranges of the logcat sections; the whole input if there are none."""
+    size = len(buf)
+    headers = list(_section_headers(buf))
+    blocks: List[Tuple[int, int]] = []
+    for idx, header in enumerate(headers):
+        newline = buf.find(b"\n", header)
+        body = size if newline == -1 else newline + 1
+        end = headers[idx + 1] if idx + 1 < len(headers) else size
+        if buf.find(LOGCAT_MARKER, header, body) != -1:
+            blocks.append((body, end))
+    if not headers and size:
+        blocks.append((0, size))
+    return blocks
+
+
+def _next_line(buf, pos: int, start: int) -> int:
+    if pos <= start or buf[pos - 1] == 0x0A:
+        return pos
+    newline = buf.find(b"\n", pos)
+    return len(buf) if newline == -1 else newline + 1
+
+
+def _first_stamped(buf, pos: int, end: int, dated: bool) -> Optional[Tuple[int, int, bytes]]:
+    """First timestamped line starting in ``[pos, end)`` as ``(start, next_line, key)``."""
+    while pos < end:
+        newline = buf.find(b"\n", pos, end)
+        next_line = end if newline == -1 else newline + 1
+        key = _line_key(buf, pos, dated)
+        if key is not None:
+            return pos, next_line, key
+        pos = next_line
+    return None
+
+
+def _lower_bound(buf, start: int, end: int, bound: bytes, dated: bool) -> int:
+    """Offset of the first timestamped line in the block whose key is >= ``bound``."""
+    width = len(bound)
+    low, high = start, end
+    while low < high:
+        mid = (low + high) // 2
+        found = _first_stamped(buf, _next_line(buf, mid, start), end, dated)
+        if found is None or found[2][:width] >= bound:
+            high = mid
+        else:
+            low = found[1]  # every position up to this line resolves to the same entry
+    found = _first_stamped(buf, _next_line(buf, low, start), end, dated)
+    return end if found is None else found[0]
+
+
+def _iter_until(buf, pos: int, end: int, bound: Optional[bytes], dated: bool) -> Iterator[bytes]:
+    width = len(bound) if bound is not None else 0
+    while pos < end:
+        newline = buf.find(b"\n", pos, end)
+        next_line = end if newline == -1 else newline + 1
+        if bound is not None:
+            key = _line_key(buf, pos, dated)
+            if key is not None and key[:width] > bound:
+                return
+        line = buf[pos:next_line]
+        yield line if line.endswith(b"\n") else line + b"\n"
+        pos = next_line
+
+
+def iter_time_range(buf, start_time: Optional[str] = None, end_time: Optional[str] = None) -> Iterator[bytes]:
+    """Yield the lines between ``start_time`` and ``end_time`` of every logcat block.
+
+    Ranges from different blocks are separated by ``--`` like grep groups.
+    """
+    lower = parse_time_bound(start_time) if start_time else None
+    upper = parse_time_bound(end_time) if end_time else None
+    dated = any(bound is not None and b" " in bound for bound in (lower, upper))
+    if dated and not all(bound is None or b" " in bound for bound in (lower, upper)):
+        raise ValueError("--from and --to must both include a date or both omit it")
+    emitted = False
+    for block_start, block_end in find_logcat_blocks(buf):
+        pos = _lower_bound(buf, block_start, block_end, lower, dated) if lower else block_start
+        lines = _iter_until(buf, pos, block_end, upper, dated)
+        first = next(lines, None)
+        if first is None:
+            continue
+        if emitted:
+            yield GROUP_SEPARATOR
+        emitted = True
+        yield first
+        yield from lines
+
+
+def extract_time_range(
+    input_file: str,
+    output_file: str,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+) -> None:
+    """Write the log lines between ``start_time`` and ``end_time`` (replaces the grep step)."""
+    log_debug(f"Extracting time range {start_time or '-'} .. {end_time or '-'}")
+    with open(output_file, "wb") as outfile:
+        if not os.path.exists(input_file):
+            sys.stderr.write(f"[WARN] input file not found: {input_file}\n")
+            return
+        if os.path.getsize(input_file) == 0:
+            return
+        with open(input_file, "rb") as handle, mmap(handle.fileno(), 0, access=ACCESS_READ) as buf:
+            outfile.writelines(iter_time_range(buf, start_time, end_time))
+
+
+__all__ = [
+    "extract_time_range",
+    "find_logcat_blocks",
+    "iter_time_range",
+    "parse_time_bound",
+]
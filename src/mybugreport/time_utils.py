@@ -7,6 +7,12 @@ from typing import List
 
 from .config import log_debug
 
+_TIME_TOKEN_RE = re.compile(r"(-?\d+d|-?\d+h|-?\d+m|-?\d+s|-?\d+ms)")
+_MINUTE_SECOND_RE = re.compile(r'(\d+)分钟s')
+# A digit directly followed by a unit (or a converted "分钟s") is the only input
+# replace_time_strings_in_line can change; anything else is returned as-is.
+_TIME_HINT_RE = re.compile(r"\d(?:[dhms]|分钟s)")
+
 
 def parse_time(time_str):
     time_str = time_str.strip()
@@ -47,12 +53,16 @@ def parse_time(time_str):
     return ''.join(time_parts)
 
 
+def needs_time_conversion(line: str) -> bool:
+    """Return True when replace_time_strings_in_line would modify ``line``."""
+    return _TIME_HINT_RE.search(line) is not None
+
+
 def replace_time_strings_in_line(line: str) -> str:
-    regex = r"(-?\d+d|-?\d+h|-?\d+m|-?\d+s|-?\d+ms)"
-    matches = re.findall(regex, line)
+    matches = _TIME_TOKEN_RE.findall(line)
 
     for match_str in matches:
         time_length = parse_time(match_str)
         line = line.replace(match_str, str(time_length))
-    line = re.sub(r'(\d+)分钟s', r'\1毫秒', line)
+    line = _MINUTE_SECOND_RE.sub(r'\1毫秒', line)
     return line
@@ -0,0 +1,260 @@
+"""
+Persistent timestamp → line offset index for repeated legacy CLI lookups.
+
+The first indexed lookup scans the input once and stores, for every
+``HH:MM:SS`` and ``YYYY-MM-DD`` token, the byte offsets of the lines containing
+it.  The index file is named after the input's sha256 (``fingerprint_file``)
+and a small stat record maps the input path to that digest, so later lookups
+neither rescan nor rehash the input: they read a few offset lists and jump to
+the candidate lines through ``mmap``.  Candidates are re-checked with the real
+pattern, so the output is identical to a full scan.
+"""
+
+import json
+import os
+import re
+import struct
+import sys
+from array import array
+from hashlib import sha256
+from mmap import ACCESS_READ, mmap
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from .config import STAGE_CACHE_DIR, log_debug
+from .context_extractor import compile_patterns, iter_context_from_offsets, parse_context_lines
+from .pipeline.collect import fingerprint_file
+
+INDEX_VERSION = 1
+INDEX_MAGIC = b"MBRTSIX1"
+INDEX_DIR_NAME = ".mybugreport-index"
+
+# Lookahead keeps overlapping tokens, so "112:34:56" also yields "12:34:56".
+_TOKEN_RE = re.compile(rb"(?=(\d\d:\d\d:\d\d|\d{4}-\d\d-\d\d))")
+_QUERY_TOKEN_RE = re.compile(r"\d\d:\d\d:\d\d|\d{4}-\d\d-\d\d")
+
+
+def default_index_dir(input_file: str) -> Path:
+    """Next to the input, or under ``STAGE_CACHE_DIR`` when the input directory is read-only."""
+    override = os.environ.get("MYBUGREPORT_INDEX_DIR")
+    if override:
+        return Path(override)
+    parent = Path(input_file).resolve().parent
+    if (parent / INDEX_DIR_NAME).is_dir() or os.access(parent, os.W_OK):
+        return parent / INDEX_DIR_NAME
+    return Path(STAGE_CACHE_DIR) / "index"
+
+
+def required_token(pattern: str) -> Optional[str]:
+    """A timestamp token every line matching the BRE ``pattern`` must contain.
+
+    Returns None when no such token can be derived safely (escapes, bracket
+    expressions, or a repetition applied to the token's last character).
+    """
+    if "\\" in pattern or "[" in pattern:
+        return None
+    for match in _QUERY_TOKEN_RE.finditer(pattern):
+        if not pattern.startswith("*", match.end()):
+            return match.group(0)
+    return None
+
+
+def build_token_offsets(buf) -> Dict[str, "array[int]"]:
+    """Scan ``buf`` once and map each timestamp token to its line start offsets."""
+    offsets: Dict[bytes, array] = {}
+    line_start = -1
+    line_end = -1
+    for match in _TOKEN_RE.finditer(buf):
+        pos = match.start()
+        if pos >= line_end:
+            line_start = buf.rfind(b"\n", 0, pos) + 1
+            line_end = buf.find(b"\n", pos)
+            if line_end == -1:
+                line_end = len(buf)
+        token = match.group(1)
+        bucket = offsets.get(token)
+        if bucket is None:
+            offsets[token] = array("Q", [line_start])
+        elif bucket[-1] != line_start:
+            bucket.append(line_start)
+    return {token.decode("ascii"): bucket for token, bucket in offsets.items()}
+
+
+# Sorted fixed-width token table (token, first offset slot, count) searched by bisection,
+# so opening an index costs a few reads regardless of how many timestamps it holds.
+_TABLE_ENTRY = struct.Struct("<10sQQ")
+
+
+def write_index(path: Path, digest: str, size: int, offsets: Dict[str, "array[int]"]) -> None:
+    tokens = sorted(offsets)
+    header = json.dumps(
+        {"version": INDEX_VERSION, "sha256": digest, "size": size, "tokens": len(tokens)},
+        separators=(",", ":"),
+    ).encode("utf-8")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with tmp_path.open("wb") as handle:
+        handle.write(INDEX_MAGIC)
+        handle.write(struct.pack("<I", len(header)))
+        handle.write(header)
+        position = 0
+        for token in tokens:
+            handle.write(_TABLE_ENTRY.pack(token.encode("ascii"), position, len(offsets[token])))
+            position += len(offsets[token])
+        for token in tokens:
+            handle.write(offsets[token].tobytes())
+    os.replace(tmp_path, path)
+
+
+class TimestampIndex:
+    """Read-only view of an index file; offset lists are loaded per token on demand."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with self.path.open("rb") as handle:
+            if handle.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                raise ValueError(f"not a timestamp index: {path}")
+            (header_len,) = struct.unpack("<I", handle.read(4))
+            header = json.loads(handle.read(header_len))
+        if header.get("version") != INDEX_VERSION:
+            raise ValueError(f"unsupported timestamp index version in {path}")
+        self.sha256: str = header["sha256"]
+        self.size: int = header["size"]
+        self.token_count: int = header["tokens"]
+        self._table_start = len(INDEX_MAGIC) + 4 + header_len
+        self._data_start = self._table_start + self.token_count * _TABLE_ENTRY.size
+
+    def _find(self, handle: BinaryIO, token: bytes) -> Optional[Tuple[int, int]]:
+        low, high = 0, self.token_count
+        while low < high:
+            mid = (low + high) // 2
+            handle.seek(self._table_start + mid * _TABLE_ENTRY.size)
+            key, start, count = _TABLE_ENTRY.unpack(handle.read(_TABLE_ENTRY.size))
+            key = key.rstrip(b"\0")
+            if key == token:
+                return start, count
+            if key < token:
+                low = mid + 1
+            else:
+                high = mid
+        return None
+
+    def lookup(self, token: str) -> "array[int]":
+        found = array("Q")
+        with self.path.open("rb") as handle:
+            entry = self._find(handle, token.encode("ascii"))
+            if entry is None:
+                return found
+            start, count = entry
+            handle.seek(self._data_start + start * found.itemsize)
+            found.frombytes(handle.read(count * found.itemsize))
+        return found
+
+    def __contains__(self, token: str) -> bool:
+        with self.path.open("rb") as handle:
+            return self._find(handle, token.encode("ascii")) is not None
+
+
+def _stat_record_path(index_dir: Path, input_file: str) -> Path:
+    key = sha256(str(Path(input_file).resolve()).encode("utf-8")).hexdigest()[:16]
+    return index_dir / f"stat-{key}.json"
+
+
+def _cached_digest(index_dir: Path, input_file: str) -> Optional[str]:
+    record_path = _stat_record_path(index_dir, input_file)
+    try:
+        record = json.loads(record_path.read_text())
+    except (OSError, ValueError):
+        return None
+    stat = os.stat(input_file)
+    if record.get("size") == stat.st_size and record.get("mtime_ns") == stat.st_mtime_ns:
+        return record.get("sha256")
+    return None
+
+
+def _remember_digest(index_dir: Path, input_file: str, digest: str) -> None:
+    stat = os.stat(input_file)
+    record = {
+        "path": str(Path(input_file).resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": digest,
+    }
+    index_dir.mkdir(parents=True, exist_ok=True)
+    _stat_record_path(index_dir, input_file).write_text(json.dumps(record))
+
+
+def input_fingerprint(input_file: str, index_dir: Optional[Path] = None) -> str:
+    """sha256 of ``input_file``, rehashed only when its size or mtime changed."""
+    index_dir = Path(index_dir) if index_dir else default_index_dir(input_file)
+    digest = _cached_digest(index_dir, input_file)
+    if digest is None:
+        digest = fingerprint_file(Path(input_file))
+        _remember_digest(index_dir, input_file, digest)
+    return digest
+
+
+def open_timestamp_index(input_file: str, index_dir: Optional[Path] = None) -> TimestampIndex:
+    """Load the index for ``input_file``, building it on first use."""
+    index_dir = Path(index_dir) if index_dir else default_index_dir(input_file)
+    digest = input_fingerprint(input_file, index_dir)
+    index_path = index_dir / f"{digest}.tsidx"
+    if index_path.exists():
+        try:
+            return TimestampIndex(index_path)
+        except (ValueError, KeyError, struct.error) as exc:
+            log_debug(f"Rebuilding unreadable timestamp index {index_path}: {exc}")
+    log_debug(f"Building timestamp index for {input_file} at {index_path}")
+    size = os.path.getsize(input_file)
+    offsets: Dict[str, array] = {}
+    if size:
+        with open(input_file, "rb") as handle, mmap(handle.fileno(), 0, access=ACCESS_READ) as buf:
+            offsets = build_token_offsets(buf)
+    write_index(index_path, digest, size, offsets)
+    return TimestampIndex(index_path)
+
+
+def indexed_context_lines(
+    patterns: Sequence[str],
+    input_file: str,
+    num_context_lines: str,
+    index_dir: Optional[Path] = None,
+) -> Optional[Iterator[bytes]]:
+    """Context output via the index, or None when a pattern has no indexable token."""
+    tokens = [required_token(pattern) for pattern in patterns]
+    if not patterns or any(token is None for token in tokens):
+        return None
+    context = parse_context_lines(num_context_lines)
+    try:
+        index = open_timestamp_index(input_file, index_dir)
+    except OSError as exc:
+        sys.stderr.write(f"[WARN] timestamp index unavailable ({exc}); scanning input\n")
+        return None
+    candidates = sorted(set().union(*(index.lookup(token) for token in tokens)))
+    return _verified_context(input_file, candidates, compile_patterns(tuple(patterns)), context)
+
+
+def _verified_context(input_file: str, candidates: Iterable[int], pattern, context: int) -> Iterator[bytes]:
+    if not candidates or os.path.getsize(input_file) == 0:
+        return
+    with open(input_file, "rb") as handle, mmap(handle.fileno(), 0, access=ACCESS_READ) as buf:
+        size = len(buf)
+
+        def matching() -> Iterator[int]:
+            for offset in candidates:
+                end = buf.find(b"\n", offset)
+                if pattern.search(buf, offset, size if end == -1 else end) is not None:
+                    yield offset
+
+        yield from iter_context_from_offsets(buf, matching(), context, context)
+
+
+__all__ = [
+    "TimestampIndex",
+    "build_token_offsets",
+    "default_index_dir",
+    "indexed_context_lines",
+    "input_fingerprint",
+    "open_timestamp_index",
+    "required_token",
+]
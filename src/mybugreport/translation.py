@@ -0,0 +1,122 @@
+"""
+Single-pass keyword translation engine for ``rule.txt`` replacements.
+
+The legacy loop applies every rule to every line and re-runs the time-token
+conversion after each rule.  ``TranslationEngine`` keeps those exact semantics
+but only visits the rules that actually occur in a line: all keys are compiled
+into one trie-shaped regular expression, so finding the present keys costs a
+single scan regardless of how many rules are loaded.
+"""
+
+import re
+from typing import Dict, Iterable, List, Mapping, Optional, Pattern, Tuple
+
+from .config import log_debug
+from .time_utils import needs_time_conversion, replace_time_strings_in_line
+
+
+def _build_trie(keys: Iterable[str]) -> Dict[str, dict]:
+    trie: Dict[str, dict] = {}
+    for key in keys:
+        node = trie
+        for char in key:
+            node = node.setdefault(char, {})
+        node[""] = {}  # terminal marker
+    return trie
+
+
+def _trie_to_pattern(node: Dict[str, dict]) -> str:
+    """Render a trie as a regex; optional tails are greedy so the longest key wins."""
+    terminal = "" in node
+    branches = [re.escape(char) + _trie_to_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    if len(branches) == 1:
+        body = branches[0]
+    else:
+        body = "(?:" + "|".join(branches) + ")"
+    if terminal:
+        return "(?:" + body + ")?"
+    return body
+
+
+def compile_keys_pattern(keys: Iterable[str]) -> Optional[Pattern[str]]:
+    """Compile keys into one longest-match alternation (``None`` when empty)."""
+    non_empty = [key for key in keys if key]
+    if not non_empty:
+        return None
+    return re.compile(_trie_to_pattern(_build_trie(non_empty)))
+
+
+class TranslationEngine:
+    """Apply ``rule.txt`` replacements with the legacy per-rule semantics.
+
+    For each rule, in insertion order, the legacy code runs
+    ``line.replace(key, value)`` followed by ``replace_time_strings_in_line``.
+    A rule step is a no-op whenever its key is absent and the line has no time
+    token left to convert, so the engine jumps straight to the next rule whose
+    key is present.  Output is byte-identical to the legacy loop.
+    """
+
+    def __init__(self, replacements: Mapping[str, str]):
+        self._rules: List[Tuple[str, str]] = list(replacements.items())
+        self._index: Dict[str, int] = {key: idx for idx, (key, _) in enumerate(self._rules)}
+        pattern = compile_keys_pattern(self._index)
+        self._pattern = pattern
+        # Lookahead form reports the longest key starting at every position.
+        self._scanner = re.compile("(?=(" + pattern.pattern + "))") if pattern else None
+        # Keys that are prefixes of a matched key start at the same position.
+        self._prefixes: Dict[str, Tuple[int, ...]] = {}
+        for key in self._index:
+            if key:
+                self._prefixes[key] = tuple(
+                    sorted(self._index[key[:size]] for size in range(1, len(key) + 1) if key[:size] in self._index)
+                )
+        self._empty_key = "" in self._index
+        log_debug(f"Compiled translation engine with {len(self._rules)} rules")
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def _next_rule(self, line: str, start: int) -> Optional[int]:
+        """Index of the first rule ``>= start`` whose key occurs in ``line``."""
+        best: Optional[int] = None
+        if self._empty_key and self._index[""] >= start:
+            best = self._index[""]  # an empty key "occurs" in every line
+        if self._pattern is None or self._pattern.search(line) is None:
+            return best
+        for match in self._scanner.finditer(line):
+            for idx in self._prefixes[match.group(1)]:
+                if idx >= start and (best is None or idx < best):
+                    best = idx
+                    if best == start:
+                        return best
+        return best
+
+    def translate_line(self, line: str) -> str:
+        rules = self._rules
+        count = len(rules)
+        idx = 0
+        while idx < count:
+            if not needs_time_conversion(line):
+                found = self._next_rule(line, idx)
+                if found is None:
+                    break
+                idx = found
+            key, value = rules[idx]
+            line = replace_time_strings_in_line(line.replace(key, value))
+            idx += 1
+        return line
+
+    def translate_lines(self, lines: Iterable[str]) -> Iterable[str]:
+        translate = self.translate_line
+        for line in lines:
+            yield translate(line)
+
+
+def compile_translations(replacements: Mapping[str, str]) -> TranslationEngine:
+    """Build a reusable engine from ``load_translation_pairs`` output."""
+    return TranslationEngine(replacements)
+
+
+__all__ = ["TranslationEngine", "compile_translations", "compile_keys_pattern"]
@@ -1,5 +1,19 @@
 """Utility helpers for serialization and shared helpers."""
 
-from .serialization import read_json, read_jsonl, write_json, write_jsonl
+from .columnar import ColumnarRecords, is_columnar, write_columnar
+from .record_db import RecordDatabase, write_sqlite
+from .serialization import dump_jsonl_line, iter_jsonl, read_json, read_jsonl, write_json, write_jsonl
 
-__all__ = ["read_json", "read_jsonl", "write_json", "write_jsonl"]
+__all__ = [
+    "ColumnarRecords",
+    "dump_jsonl_line",
+    "is_columnar",
+    "iter_jsonl",
+    "read_json",
+    "read_jsonl",
+    "RecordDatabase",
+    "write_columnar",
+    "write_json",
+    "write_jsonl",
+    "write_sqlite",
+]
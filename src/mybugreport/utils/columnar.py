@@ -0,0 +1,244 @@
+"""Columnar binary store for parsed log records (alternative to records.jsonl).
+
+Layout (native byte order, recorded in the header)::
+
+    b"MBRCOL01" | uint32 header length | JSON header | columns...
+
+Fixed-width columns hold ``pid``/``tid`` (int32, -1 = None), ``level``,
+``tag`` and ``source`` (dictionary codes, 0 = None) and ``ts`` (``TS_WIDTH``
+NUL-padded ASCII, empty = None).  ``raw`` lines live in a UTF-8 heap indexed by an offset
+column; ``msg`` is stored as a byte offset into its ``raw`` line, since the
+parser's message is the tail of the line.  The few messages that are not
+(section titles) go to a small overflow heap.  ``ColumnarRecords`` maps the
+file and exposes each column as a zero-copy ``memoryview``, so a scan over one
+column never touches the text heaps.
+"""
+
+import json
+import shutil
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from mmap import ACCESS_READ, mmap
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..models import CompactLogRecord
+
+COLUMNAR_MAGIC = b"MBRCOL01"
+COLUMNAR_VERSION = 1
+COLUMNAR_SUFFIX = ".records.cols"
+NO_MSG_OFFSET = 0xFFFFFFFF
+TS_WIDTH = 32  # "YYYY-MM-DD HH:MM:SS.uuuuuu" and friends fit comfortably
+_ALIGN = 8
+
+
+class _Dictionary:
+    """String → code mapping; code 0 is reserved for None."""
+
+    def __init__(self) -> None:
+        self.values: List[Optional[str]] = [None]
+        self._codes: Dict[str, int] = {}
+
+    def code(self, value: Optional[str]) -> int:
+        if value is None:
+            return 0
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+def is_columnar(path: Path) -> bool:
+    with Path(path).open("rb") as handle:
+        return handle.read(len(COLUMNAR_MAGIC)) == COLUMNAR_MAGIC
+
+
+def write_columnar(records: Iterable[Any], path: Path) -> int:
+    """Write ``records`` (LogRecord or CompactLogRecord) in one pass; returns the count.
+
+    Numeric columns stay in memory (about 30 bytes per record); ``ts`` and the
+    text heaps are spooled to temporary files.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    levels, tags, sources = _Dictionary(), _Dictionary(), _Dictionary()
+    pid, tid = array("i"), array("i")
+    level_codes, tag_codes, source_codes = array("B"), array("I"), array("I")
+    raw_offsets, msg_offsets = array("Q", [0]), array("I")
+    overflow_rows, overflow_offsets = array("Q"), array("Q", [0])
+    count = raw_size = overflow_size = 0
+
+    with tempfile.TemporaryFile() as ts_column, tempfile.TemporaryFile() as raw_heap, \
+            tempfile.TemporaryFile() as overflow_heap:
+        for row, record in enumerate(records):
+            raw = record.raw.encode("utf-8")
+            msg = record.msg.encode("utf-8")
+            raw_heap.write(raw)
+            raw_size += len(raw)
+            raw_offsets.append(raw_size)
+            if raw.endswith(msg):
+                msg_offsets.append(len(raw) - len(msg))
+            else:
+                msg_offsets.append(NO_MSG_OFFSET)
+                overflow_heap.write(msg)
+                overflow_size += len(msg)
+                overflow_rows.append(row)
+                overflow_offsets.append(overflow_size)
+            stamp = b"" if record.ts is None else record.ts.encode("ascii")
+            if len(stamp) > TS_WIDTH:
+                raise ValueError(f"timestamp longer than {TS_WIDTH} bytes: {record.ts!r}")
+            ts_column.write(stamp.ljust(TS_WIDTH, b"\0"))
+            pid.append(-1 if record.pid is None else record.pid)
+            tid.append(-1 if record.tid is None else record.tid)
+            level_codes.append(levels.code(record.level))
+            tag_codes.append(tags.code(record.tag))
+            source_codes.append(sources.code(record.source))
+            count += 1
+
+        columns: List[Tuple[str, Any]] = [
+            ("ts", ts_column),
+            ("pid", pid),
+            ("tid", tid),
+            ("level", level_codes),
+            ("tag", tag_codes),
+            ("source", source_codes),
+            ("raw_offsets", raw_offsets),
+            ("msg_offsets", msg_offsets),
+            ("overflow_rows", overflow_rows),
+            ("overflow_offsets", overflow_offsets),
+            ("raw_heap", raw_heap),
+            ("overflow_heap", overflow_heap),
+        ]
+        sizes = {"ts": count * TS_WIDTH, "raw_heap": raw_size, "overflow_heap": overflow_size}
+        layout: Dict[str, Tuple[int, int, str]] = {}
+        position = 0
+        for name, data in columns:
+            size = sizes[name] if name in sizes else len(data) * data.itemsize
+            layout[name] = (position, size, getattr(data, "typecode", "B"))
+            position += -(-size // _ALIGN) * _ALIGN
+        header = json.dumps(
+            {
+                "version": COLUMNAR_VERSION,
+                "byteorder": sys.byteorder,
+                "count": count,
+                "ts_width": TS_WIDTH,
+                "levels": levels.values,
+                "tags": tags.values,
+                "sources": sources.values,
+                "columns": layout,
+            },
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        prefix = len(COLUMNAR_MAGIC) + 4 + len(header)
+        padding = -prefix % _ALIGN
+
+        with path.open("wb") as handle:
+            handle.write(COLUMNAR_MAGIC)
+            handle.write(len(header).to_bytes(4, "little"))
+            handle.write(header)
+            handle.write(b"\0" * padding)
+            for name, data in columns:
+                start = handle.tell()
+                if name in sizes:
+                    data.seek(0)
+                    shutil.copyfileobj(data, handle)
+                else:
+                    data.tofile(handle)
+                handle.write(b"\0" * (-(handle.tell() - start) % _ALIGN))
+    return count
+
+
+class ColumnarRecords:
+    """Memory-mapped reader; columns are decoded lazily and only when asked for."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._handle = self.path.open("rb")
+        try:
+            if self._handle.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+                raise ValueError(f"not a columnar records file: {path}")
+            header_len = int.from_bytes(self._handle.read(4), "little")
+            header = json.loads(self._handle.read(header_len))
+            if header.get("version") != COLUMNAR_VERSION:
+                raise ValueError(f"unsupported columnar records version in {path}")
+            if header["byteorder"] != sys.byteorder:
+                raise ValueError(f"columnar records {path} were written with {header['byteorder']} byte order")
+            prefix = len(COLUMNAR_MAGIC) + 4 + header_len
+            self._base = prefix + (-prefix % _ALIGN)
+            self._map = mmap(self._handle.fileno(), 0, access=ACCESS_READ)
+        except Exception:
+            self._handle.close()
+            raise
+        self._view = memoryview(self._map)
+        self.count: int = header["count"]
+        self.ts_width: int = header["ts_width"]
+        self.levels: List[Optional[str]] = header["levels"]
+        self.tags: List[Optional[str]] = header["tags"]
+        self.sources: List[Optional[str]] = header["sources"]
+        self._layout: Dict[str, List[Any]] = header["columns"]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __enter__(self) -> "ColumnarRecords":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unmap the file; column views handed out earlier must be released first."""
+        self._view.release()
+        self._map.close()
+        self._handle.close()
+
+    def column(self, name: str) -> memoryview:
+        """Zero-copy view of one column (typed: ``view[i]`` is an int for numeric columns)."""
+        offset, size, typecode = self._layout[name]
+        start = self._base + offset
+        return self._view[start : start + size].cast(typecode)
+
+    def tag_values(self) -> Iterator[Optional[str]]:
+        """Decoded tag per record, read from the tag column only."""
+        tags = self.tags
+        return (tags[code] for code in self.column("tag"))
+
+    def __iter__(self) -> Iterator[CompactLogRecord]:
+        ts_column = self.column("ts")
+        pid, tid = self.column("pid"), self.column("tid")
+        level, tag, source = self.column("level"), self.column("tag"), self.column("source")
+        raw_offsets, msg_offsets = self.column("raw_offsets"), self.column("msg_offsets")
+        overflow_rows, overflow_offsets = self.column("overflow_rows"), self.column("overflow_offsets")
+        raw_heap, overflow_heap = self.column("raw_heap"), self.column("overflow_heap")
+        width = self.ts_width
+        for row in range(self.count):
+            raw = bytes(raw_heap[raw_offsets[row] : raw_offsets[row + 1]])
+            msg_offset = msg_offsets[row]
+            if msg_offset == NO_MSG_OFFSET:
+                slot = bisect_left(overflow_rows, row)
+                msg = bytes(overflow_heap[overflow_offsets[slot] : overflow_offsets[slot + 1]]).decode("utf-8")
+            else:
+                msg = raw[msg_offset:].decode("utf-8")
+            stamp = bytes(ts_column[row * width : (row + 1) * width]).rstrip(b"\0")
+            yield CompactLogRecord(
+                ts=stamp.decode("ascii") if stamp else None,
+                level=self.levels[level[row]],
+                tag=self.tags[tag[row]],
+                msg=msg,
+                raw=raw.decode("utf-8"),
+                source=self.sources[source[row]],
+                pid=None if pid[row] == -1 else pid[row],
+                tid=None if tid[row] == -1 else tid[row],
+            )
+
+
+__all__ = [
+    "COLUMNAR_SUFFIX",
+    "ColumnarRecords",
+    "is_columnar",
+    "write_columnar",
+]
@@ -0,0 +1,224 @@
+"""SQLite record store for repeated ad-hoc queries over parsed records.
+
+``write_sqlite`` bulk-loads records into a single ``records`` table and builds
+the indexes after the load: ``tag``, ``pid`` and the time key ``tkey``
+(``MM-DD HH:MM:SS.mmm``, the ``-v year`` prefix dropped so that captures with
+and without a year sort alike), plus an expression index on the clock part for
+bounds given without a date.  Messages get an external-content FTS5 index when
+the sqlite3 build has FTS5; otherwise ``match`` falls back to a substring scan.
+
+Time bounds follow ``time_range``: ``[MM-DD ]HH:MM[:SS[.mmm]]``, inclusive at
+their own precision.
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from ..models import CompactLogRecord
+from ..time_range import parse_time_bound
+
+SQLITE_SUFFIX = ".records.sqlite"
+SCHEMA_VERSION = "1"
+# Sorts after every character a timestamp can contain: "<= bound + _PREFIX_END" keeps
+# all keys that start with the bound, which is what "inclusive at its precision" means.
+_PREFIX_END = "\x7f"
+_CLOCK_EXPR = "substr(tkey, 7)"
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE records (
+    id INTEGER PRIMARY KEY,
+    ts TEXT,
+    tkey TEXT,
+    pid INTEGER,
+    tid INTEGER,
+    level TEXT,
+    tag TEXT,
+    msg TEXT,
+    raw TEXT,
+    source TEXT
+);
+"""
+
+_INDEXES = (
+    "CREATE INDEX records_tag ON records(tag, tkey)",
+    "CREATE INDEX records_pid ON records(pid, tkey)",
+    "CREATE INDEX records_tkey ON records(tkey)",
+    f"CREATE INDEX records_clock ON records({_CLOCK_EXPR})",
+)
+
+_COLUMNS = ("ts", "level", "tag", "msg", "raw", "source", "pid", "tid")
+
+
+def has_fts5() -> bool:
+    connection = sqlite3.connect(":memory:")
+    try:
+        connection.execute("CREATE VIRTUAL TABLE probe USING fts5(body)")
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        connection.close()
+
+
+def _time_key(ts: Optional[str]) -> Optional[str]:
+    if ts is None:
+        return None
+    # "YYYY-MM-DD HH:MM:SS.mmm" -> "MM-DD HH:MM:SS.mmm"
+    return ts[5:] if len(ts) > 4 and ts[4] == "-" else ts
+
+
+def _rows(records: Iterable[Any]) -> Iterator[Tuple[Any, ...]]:
+    for record in records:
+        yield (
+            record.ts,
+            _time_key(record.ts),
+            record.pid,
+            record.tid,
+            record.level,
+            record.tag,
+            record.msg,
+            record.raw,
+            record.source,
+        )
+
+
+def write_sqlite(records: Iterable[Any], path: Path, fts: Optional[bool] = None) -> int:
+    """Bulk-load ``records`` into a fresh database at ``path``; returns the count.
+
+    fts: build the FTS5 message index (defaults to "if available").
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        path.unlink()
+    available = has_fts5()
+    if fts and not available:
+        sys.stderr.write("[WARN] sqlite3 has no FTS5 support, message search will scan\n")
+    fts = available if fts is None else fts and available
+
+    connection = sqlite3.connect(path)
+    try:
+        # A half-written database is simply rebuilt, so durability is not needed during the load.
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.executescript(_SCHEMA)
+        with connection:
+            cursor = connection.executemany(
+                "INSERT INTO records (ts, tkey, pid, tid, level, tag, msg, raw, source) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                _rows(records),
+            )
+            count = cursor.rowcount
+            for statement in _INDEXES:
+                connection.execute(statement)
+            if fts:
+                connection.execute(
+                    "CREATE VIRTUAL TABLE records_fts USING fts5(msg, content='records', content_rowid='id')"
+                )
+                connection.execute("INSERT INTO records_fts(records_fts) VALUES ('rebuild')")
+            connection.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?)",
+                [("version", SCHEMA_VERSION), ("count", str(count)), ("fts", "1" if fts else "0")],
+            )
+        connection.execute("ANALYZE")
+    finally:
+        connection.close()
+    return count
+
+
+def _bound_clause(value: str, upper: bool) -> Tuple[str, str]:
+    bound = parse_time_bound(value).decode("ascii")
+    column = "tkey" if " " in bound else _CLOCK_EXPR
+    if upper:
+        return f"{column} <= ?", bound + _PREFIX_END
+    return f"{column} >= ?", bound
+
+
+class RecordDatabase:
+    """Read side of ``write_sqlite``; ``query`` yields ``CompactLogRecord`` in input order."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        if not self.path.is_file():
+            raise FileNotFoundError(f"record database not found: {path}")
+        # as_uri() percent-encodes the path, so "#" or "?" in a capture name stays part of it
+        self._connection = sqlite3.connect(self.path.resolve().as_uri() + "?mode=ro", uri=True)
+        try:
+            meta = dict(self._connection.execute("SELECT key, value FROM meta"))
+        except sqlite3.DatabaseError as exc:
+            self._connection.close()
+            raise ValueError(f"not a record database: {path}") from exc
+        if meta.get("version") != SCHEMA_VERSION:
+            self._connection.close()
+            raise ValueError(f"unsupported record database version in {path}")
+        self.count = int(meta["count"])
+        self.fts = meta.get("fts") == "1"
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __enter__(self) -> "RecordDatabase":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def query(
+        self,
+        tags: Sequence[str] = (),
+        pid: Optional[int] = None,
+        tid: Optional[int] = None,
+        levels: Sequence[str] = (),
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        match: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CompactLogRecord]:
+        """Records matching every given filter.
+
+        match: an FTS5 query (``"Start proc" AND 42``) when the index exists,
+        a plain substring otherwise.
+        """
+        clauses: List[str] = []
+        params: List[Any] = []
+        if tags:
+            clauses.append(f"tag IN ({', '.join('?' * len(tags))})")
+            params.extend(tags)
+        if levels:
+            clauses.append(f"level IN ({', '.join('?' * len(levels))})")
+            params.extend(levels)
+        if pid is not None:
+            clauses.append("pid = ?")
+            params.append(pid)
+        if tid is not None:
+            clauses.append("tid = ?")
+            params.append(tid)
+        for value, upper in ((start, False), (end, True)):
+            if value is not None:
+                clause, param = _bound_clause(value, upper)
+                clauses.append(clause)
+                params.append(param)
+        if match:
+            if self.fts:
+                clauses.append("id IN (SELECT rowid FROM records_fts WHERE records_fts MATCH ?)")
+            else:
+                clauses.append("instr(msg, ?) > 0")
+            params.append(match)
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM records"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        for row in self._connection.execute(sql, params):
+            yield CompactLogRecord(*row)
+
+
+__all__ = ["RecordDatabase", "SQLITE_SUFFIX", "has_fts5", "write_sqlite"]
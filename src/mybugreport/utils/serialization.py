@@ -3,10 +3,13 @@
 import json
 from dataclasses import asdict, is_dataclass
 from pathlib import Path
-from typing import Any, Iterable, List
+from typing import Any, Iterable, Iterator, List
 
 
 def _to_serializable(obj: Any) -> Any:
+    to_dict = getattr(obj, "to_dict", None)
+    if to_dict is not None:
+        return to_dict()
     if is_dataclass(obj):
         return asdict(obj)
     if isinstance(obj, list):
@@ -23,13 +26,26 @@ def write_json(obj: Any, path: Path) -> None:
     path.write_text(json.dumps(serializable, ensure_ascii=False, indent=2))
 
 
-def write_jsonl(items: Iterable[Any], path: Path) -> None:
+def dump_jsonl_line(item: Any) -> str:
+    """Serialize one item exactly as ``write_jsonl`` stores it (no newline)."""
+    return json.dumps(_to_serializable(item), ensure_ascii=False)
+
+
+def write_jsonl(items: Iterable[Any], path: Path) -> int:
+    """Stream ``items`` to ``path`` one line at a time; returns the number written.
+
+    The layout is unchanged: lines joined by ``\n`` without a trailing newline.
+    """
     path = Path(path)
     path.parent.mkdir(parents=True, exist_ok=True)
-    lines: List[str] = []
-    for item in items:
-        lines.append(json.dumps(_to_serializable(item), ensure_ascii=False))
-    path.write_text("\n".join(lines))
+    count = 0
+    with path.open("w") as handle:
+        for item in items:
+            if count:
+                handle.write("\n")
+            handle.write(dump_jsonl_line(item))
+            count += 1
+    return count
 
 
 def read_json(path: Path) -> Any:
@@ -39,17 +55,28 @@ def read_json(path: Path) -> Any:
     return json.loads(path.read_text())
 
 
-def read_jsonl(path: Path) -> List[Any]:
+def iter_jsonl(path: Path) -> Iterator[Any]:
+    """Yield one decoded item per line without loading the whole file."""
     path = Path(path)
     if not path.exists():
         raise FileNotFoundError(f"JSONL file not found: {path}")
-    content = path.read_text().strip()
-    if not content:
-        return []
-    return [json.loads(line) for line in content.splitlines()]
+    return _iter_jsonl_lines(path)
+
+
+def _iter_jsonl_lines(path: Path) -> Iterator[Any]:
+    with path.open("r") as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_jsonl(path: Path) -> List[Any]:
+    return list(iter_jsonl(path))
 
 
 __all__ = [
+    "dump_jsonl_line",
+    "iter_jsonl",
     "write_json",
     "write_jsonl",
     "read_json",
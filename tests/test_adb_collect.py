@@ -0,0 +1,184 @@
+import hashlib
+import json
+import subprocess
+import sys
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+LOGCAT = "06-21 12:00:01.000  1000  1001 I Tag: 数据\n" * 100
+
+
+def fake_runner(cmd, timeout=None):
+    if "getprop" in cmd:
+        stdout = {"ro.product.model": "Pixel\n"}.get(cmd[-1], "")
+    elif "logcat" in cmd:
+        stdout = LOGCAT
+    else:
+        stdout = "[    0.000000] Booting Linux\n"
+    return subprocess.CompletedProcess(cmd, 0, stdout=stdout, stderr="")
+
+
+def test_collect_with_text_runner(tmp_path):
+    from mybugreport.pipeline.collect.adb import collect_adb
+
+    index = collect_adb("SERIAL", tmp_path, include_dmesg=True, runner=fake_runner)
+    artifacts = json.loads(index.read_text())
+    assert [item["artifact_type"] for item in artifacts] == ["logcat", "dmesg"]
+    assert artifacts[0]["device"]["model"] == "Pixel"
+    for item in artifacts:
+        data = Path(item["path"]).read_bytes()
+        assert item["sha256"] == hashlib.sha256(data).hexdigest() and item["size_bytes"] == len(data)
+    assert Path(artifacts[0]["path"]).read_text(encoding="utf-8") == LOGCAT
+
+
+def test_stream_runner_memory_is_flat(tmp_path):
+    from mybugreport.pipeline.collect.adb import default_stream_runner, run_and_save
+
+    chunk = b"0123456789abcdef" * 65536  # 1 MiB
+    script = f"import sys\nfor _ in range(32): sys.stdout.buffer.write({chunk[:16]!r} * 65536)"
+    output = tmp_path / "capture.txt"
+    with (tmp_path / "collect.log").open("w") as log:
+        tracemalloc.start()
+        try:
+            digest, size = run_and_save(
+                [sys.executable, "-c", script], output, None, log, stream_runner=default_stream_runner
+            )
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    assert size == 32 * len(chunk) == output.stat().st_size
+    assert digest == hashlib.sha256(chunk * 32).hexdigest()
+    assert peak < 4 * 1024 * 1024
+
+
+def test_stream_runner_errors(tmp_path):
+    from mybugreport.pipeline.collect.adb import default_stream_runner, run_and_save
+
+    with (tmp_path / "collect.log").open("w") as log:
+        with pytest.raises(RuntimeError, match="boom"):
+            script = "import sys; sys.stdout.write('partial'); sys.stderr.write('boom'); sys.exit(3)"
+            run_and_save([sys.executable, "-c", script], tmp_path / "out", None, log, stream_runner=default_stream_runner)
+        with pytest.raises(subprocess.TimeoutExpired):
+            script = "import time; time.sleep(30)"
+            run_and_save(
+                [sys.executable, "-c", script], tmp_path / "out", None, log, 0.5, stream_runner=default_stream_runner
+            )
+        # killed by a signal within the timeout: a failure, not a timeout
+        with pytest.raises(RuntimeError, match=r"Command failed \(-9\)"):
+            script = "import os, signal; os.kill(os.getpid(), signal.SIGKILL)"
+            run_and_save(
+                [sys.executable, "-c", script], tmp_path / "out", None, log, 30, stream_runner=default_stream_runner
+            )
+    # failed commands leave no artifact, partial or not
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["collect.log"]
+
+
+def test_concurrent_collect_overlaps_captures(tmp_path):
+    import threading
+    import time
+
+    from mybugreport.pipeline.collect.adb import collect_adb
+
+    calls = []
+    lock = threading.Lock()
+
+    def slow_runner(cmd, timeout=None):
+        with lock:
+            calls.append(cmd)
+        if "getprop" in cmd[-1]:
+            time.sleep(0.2)
+            return subprocess.CompletedProcess(cmd, 0, stdout="Pixel\n14\n\n", stderr="")
+        # dmesg finishes first, logcat last: the index order must not follow completion
+        time.sleep(0.4 if "logcat" in cmd else 0.2)
+        return fake_runner(cmd, timeout)
+
+    started = time.perf_counter()
+    index = collect_adb(
+        "SERIAL", tmp_path, include_dmesg=True, include_bugreport=True, runner=slow_runner, concurrent=True
+    )
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.75  # serially: getprop + three captures = 1.0s
+    artifacts = json.loads(index.read_text())
+    assert [item["artifact_type"] for item in artifacts] == ["logcat", "dmesg", "bugreport"]
+    device = artifacts[0]["device"]
+    assert (device["model"], device["android_version"], device["build_fingerprint"]) == ("Pixel", "14", None)
+    assert sum("getprop" in cmd[-1] for cmd in calls) == 1
+    assert Path(artifacts[0]["path"]).read_text(encoding="utf-8") == LOGCAT
+
+
+def test_concurrent_collect_reports_timeout(tmp_path):
+    from mybugreport.pipeline.collect.adb import collect_adb
+
+    def runner(cmd, timeout=None):
+        if "dmesg" in cmd:
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        return fake_runner(cmd, timeout)
+
+    with pytest.raises(RuntimeError, match="timeout"):
+        collect_adb("SERIAL", tmp_path, include_dmesg=True, runner=runner, concurrent=True)
+    assert "ERROR: command timeout" in (tmp_path / "collect.log").read_text()
+
+
+def test_collect_bugreport_zip(tmp_path):
+    import io
+    import zipfile
+
+    from mybugreport.pipeline.collect.adb import collect_adb
+    from mybugreport.pipeline.parse import iter_records
+
+    remote = "/data/user_de/0/com.android.shell/files/bugreports/bugreport-pixel-2024-06-21.zip"
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("bugreport-pixel-2024-06-21.txt", "== dumpstate: 2024-06-21\n" + LOGCAT)
+        archive.writestr("dumpstate_board.txt", "board\n")
+        archive.writestr("proto/activity.proto", b"\x00\x01")
+    zipped = buffer.getvalue()
+    calls = []
+
+    def runner(cmd, timeout=None):
+        calls.append(cmd[3:])
+        if cmd[3:] == ["shell", "bugreportz"]:
+            return subprocess.CompletedProcess(cmd, 0, stdout=f"OK:{remote}\n", stderr="")
+        if cmd[3:] == ["exec-out", "cat", remote]:
+            return subprocess.CompletedProcess(cmd, 0, stdout=zipped, stderr="")
+        return fake_runner(cmd, timeout)
+
+    index = collect_adb("SERIAL", tmp_path, include_bugreport=True, runner=runner)
+    bugreport = json.loads(index.read_text())[1]
+    assert bugreport["path"] == str(tmp_path / "logs" / "bugreport.zip")
+    assert Path(bugreport["path"]).read_bytes() == zipped
+    assert bugreport["sha256"] == hashlib.sha256(zipped).hexdigest() and bugreport["size_bytes"] == len(zipped)
+    assert bugreport["metadata"] == {
+        "archive": "zip",
+        "members": ["bugreport-pixel-2024-06-21.txt", "dumpstate_board.txt"],
+    }
+    assert ["shell", "rm", "-f", remote] in calls
+    records = list(iter_records(Path(f"{bugreport['path']}::{bugreport['metadata']['members'][0]}")))
+    assert records[0].msg == "== dumpstate: 2024-06-21" and records[1].tag == "Tag"
+
+    def failing(cmd, timeout=None):
+        if cmd[3:] == ["shell", "bugreportz"]:
+            return subprocess.CompletedProcess(cmd, 0, stdout="FAIL:Could not take bugreport\n", stderr="")
+        return fake_runner(cmd, timeout)
+
+    with pytest.raises(RuntimeError, match="bugreportz failed: Could not take bugreport"):
+        collect_adb("SERIAL", tmp_path / "failed", include_bugreport=True, runner=failing)
+
+    def old_device(cmd, timeout=None):
+        if cmd[3:] == ["shell", "bugreportz"]:
+            return subprocess.CompletedProcess(cmd, 127, stdout="/system/bin/sh: bugreportz: not found\n", stderr="")
+        if cmd[3:] == ["bugreport"]:
+            return subprocess.CompletedProcess(cmd, 0, stdout="== dumpstate: 2016-06-21\n", stderr="")
+        return fake_runner(cmd, timeout)
+
+    index = collect_adb("SERIAL", tmp_path / "old", include_bugreport=True, runner=old_device)
+    bugreport = json.loads(index.read_text())[1]
+    assert Path(bugreport["path"]).name == "bugreport.txt" and bugreport["command"] == "adb -s SERIAL bugreport"
+    assert Path(bugreport["path"]).read_text() == "== dumpstate: 2016-06-21\n"
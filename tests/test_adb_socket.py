@@ -0,0 +1,178 @@
+import json
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+LOGCAT = "06-21 12:00:01.000  1000  1001 I Tag: 数据\n" * 2000
+
+
+class FakeAdbHandler(socketserver.BaseRequestHandler):
+    """Speaks just enough of the adb server protocol for the collector."""
+
+    def read_request(self):
+        header = self.request.recv(4, socket.MSG_WAITALL)
+        if len(header) < 4:
+            return None
+        return self.request.recv(int(header, 16), socket.MSG_WAITALL).decode("utf-8")
+
+    def fail(self, message):
+        data = message.encode("utf-8")
+        self.request.sendall(b"FAIL" + b"%04x" % len(data) + data)
+
+    def reply(self, data):
+        self.request.sendall(b"OKAY" + b"%04x" % len(data) + data)
+
+    def packet(self, packet_id, data):
+        self.request.sendall(struct.pack("<BI", packet_id, len(data)) + data)
+
+    def handle(self):
+        server = self.server
+        request = self.read_request()
+        server.requests.append(request)
+        if request == "host:devices-l":
+            self.reply(b"SERIAL device usb:1-1 model:Pixel\n")
+            return
+        if request.startswith("host-serial:"):
+            serial = request.split(":")[1]
+            if serial not in server.devices:
+                self.fail(f"device '{serial}' not found")
+                return
+            self.reply(b"cmd,stat_v2,shell_v2" if serial in server.shell_v2 else b"cmd")
+            return
+        serial = request.split(":", 2)[-1]
+        if serial not in server.devices:
+            self.fail(f"device '{serial}' not found")
+            return
+        self.request.sendall(b"OKAY")
+        service = self.read_request()
+        server.requests.append(service)
+        v2 = service.startswith("shell,v2,raw:")
+        if v2:
+            command = service.partition(":")[2]
+            output = server.outputs.get(f"shell:{command}", server.outputs.get(f"exec:{command}"))
+        else:
+            output = server.outputs.get(service)
+        if output is None:
+            self.fail(f"unknown service {service}")
+            return
+        self.request.sendall(b"OKAY")
+        if output == "hang":
+            server.release.wait(5)
+            return
+        stdout, stderr, code = output if isinstance(output, tuple) else (output, "", 0)
+        if not v2:
+            self.request.sendall(stdout.encode("utf-8"))
+            return
+        data = stdout.encode("utf-8")
+        for start in range(0, len(data), 10000):
+            self.packet(1, data[start : start + 10000])
+        if stderr:
+            self.packet(2, stderr.encode("utf-8"))
+        self.packet(3, bytes([code]))
+
+
+@pytest.fixture
+def fake_adb():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), FakeAdbHandler)
+    server.daemon_threads = True
+    server.requests = []
+    server.devices = {"SERIAL", "OLD"}
+    server.shell_v2 = {"SERIAL"}
+    server.release = threading.Event()
+    server.outputs = {
+        "shell:getprop ro.product.model": "Pixel\n",
+        "shell:getprop ro.build.version.release": "14\n",
+        "shell:getprop ro.build.fingerprint": "google/pixel:14\n",
+        "exec:logcat -v threadtime -d": LOGCAT,
+        "shell:dmesg": "[    0.000000] Booting Linux\n",
+    }
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+def test_translate_command():
+    from mybugreport.pipeline.collect.adb_socket import translate_command
+
+    assert translate_command(["adb", "-s", "S", "shell", "getprop", "ro.x"]) == ("S", "shell:getprop ro.x")
+    assert translate_command(["adb", "-s", "S", "logcat", "-b", "main", "-T", "06-21 12:00:00.000"]) == (
+        "S",
+        "exec:logcat -b main -T '06-21 12:00:00.000'",
+    )
+    assert translate_command(["adb", "devices", "-l"]) == (None, "host:devices-l")
+    assert translate_command(["adb", "-s", "S", "bugreport"]) is None
+    assert translate_command(["ls"]) is None
+
+
+def test_collect_over_socket(tmp_path, fake_adb):
+    from mybugreport.pipeline.collect.adb import collect_adb
+    from mybugreport.pipeline.collect.adb_socket import AdbSocketClient
+
+    client = AdbSocketClient(port=fake_adb.server_address[1])
+    index = collect_adb("SERIAL", tmp_path, include_dmesg=True, runner=client.run, stream_runner=client.stream)
+
+    artifacts = json.loads(index.read_text())
+    assert artifacts[0]["device"]["model"] == "Pixel"
+    assert artifacts[0]["device"]["build_fingerprint"] == "google/pixel:14"
+    assert Path(artifacts[0]["path"]).read_text(encoding="utf-8") == LOGCAT
+    assert Path(artifacts[1]["path"]).read_text(encoding="utf-8").startswith("[    0.000000]")
+    assert fake_adb.requests.count("host:transport:SERIAL") == 5
+    assert "shell,v2,raw:logcat -v threadtime -d" in fake_adb.requests
+    assert fake_adb.requests.count("host-serial:SERIAL:features") == 1
+
+
+def test_socket_errors_and_fallback(fake_adb):
+    from mybugreport.pipeline.collect.adb_socket import AdbSocketClient
+
+    fallback_calls = []
+
+    def fallback(cmd, timeout=None):
+        fallback_calls.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, stdout="fallback", stderr="")
+
+    client = AdbSocketClient(port=fake_adb.server_address[1], fallback=fallback)
+    assert client.run(["adb", "devices", "-l"]).stdout.startswith("SERIAL device")
+
+    missing = client.run(["adb", "-s", "OTHER", "shell", "dmesg"])
+    assert missing.returncode == 1 and "device 'OTHER' not found" in missing.stderr
+
+    fake_adb.outputs["exec:logcat -d"] = "hang"
+    with pytest.raises(subprocess.TimeoutExpired):
+        client.run(["adb", "-s", "SERIAL", "logcat", "-d"], timeout=0.2)
+
+    assert client.run(["adb", "-s", "SERIAL", "pull", "/x"]).stdout == "fallback"
+    assert fallback_calls == [["adb", "-s", "SERIAL", "pull", "/x"]]
+
+
+def test_shell_exit_status(tmp_path, fake_adb):
+    from mybugreport.pipeline.collect.adb import run_and_save
+    from mybugreport.pipeline.collect.adb_socket import AdbSocketClient
+
+    fake_adb.outputs["shell:dmesg"] = ("partial\n", "dmesg: klogctl: Permission denied\n", 1)
+    client = AdbSocketClient(port=fake_adb.server_address[1])
+    proc = client.run(["adb", "-s", "SERIAL", "shell", "dmesg"])
+    assert (proc.returncode, proc.stdout) == (1, "partial\n")
+    assert "Permission denied" in proc.stderr
+    with (tmp_path / "collect.log").open("w") as log:
+        with pytest.raises(RuntimeError, match="Permission denied"):
+            cmd = ["adb", "-s", "SERIAL", "shell", "dmesg"]
+            run_and_save(cmd, tmp_path / "dmesg.txt", client.run, log, stream_runner=client.stream)
+    assert not (tmp_path / "dmesg.txt").exists()
+
+    # without shell_v2 the device gives no exit status: output only, reported as success
+    proc = client.run(["adb", "-s", "OLD", "shell", "dmesg"])
+    assert (proc.returncode, proc.stdout) == (0, "partial\n")
+    assert "shell:dmesg" in fake_adb.requests
@@ -0,0 +1,132 @@
+import gzip
+import lzma
+import sys
+import zipfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+BUGREPORT = (
+    "== dumpstate: 2024-06-21 12:00:00\n"
+    "------ MEMORY INFO (/proc/meminfo) ------\n"
+    "MemTotal: 1 kB\n"
+    "------ SYSTEM LOG (logcat -v threadtime -d *:v) ------\n"
+    "06-21 12:00:01.000  1000  1001 I Tag: 2024-01-01 key one\n"
+    "06-21 12:00:02.000  1000  1001 I Tag: START\n"
+    "06-21 12:00:03.000  1000  1001 I Tag: payload key\n"
+    "06-21 12:00:04.000  1000  1001 I Tag: END\n"
+    "------ DUMPSYS (/system/bin/dumpsys) ------\n"
+    "DUMP OF SERVICE activity:\n"
+    "mFocus=null\n"
+)
+BOARD = "board line\n"
+
+
+def write_captures(tmp_path):
+    plain = tmp_path / "bugreport.txt"
+    plain.write_text(BUGREPORT)
+    capture = tmp_path / "capture.zip"
+    with zipfile.ZipFile(capture, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("version.txt", "2.0")
+        archive.writestr("bugreport-device-build-2024-06-21.txt", BUGREPORT)
+        archive.writestr("dumpstate_board.txt", BOARD)
+        archive.writestr("proto/activity.proto", b"\x00\x01binary")
+    gz = tmp_path / "bugreport.txt.gz"
+    gz.write_bytes(gzip.compress(BUGREPORT.encode()))
+    xz = tmp_path / "bugreport.txt.xz"
+    xz.write_bytes(lzma.compress(BUGREPORT.encode()))
+    return plain, capture, gz, xz
+
+
+def test_open_and_index_archives(tmp_path):
+    from mybugreport.archive import input_stem, list_members, open_input
+    from mybugreport.pipeline.parse import index_sections
+    from mybugreport.pipeline.parse.sections import read_spans, select_sections
+
+    plain, capture, gz, xz = write_captures(tmp_path)
+    assert list_members(capture) == [
+        f"{capture}::bugreport-device-build-2024-06-21.txt",
+        f"{capture}::dumpstate_board.txt",
+        f"{capture}::version.txt",
+    ]
+    assert [input_stem(path) for path in (capture, gz, f"{capture}::dumpstate_board.txt")] == [
+        "capture",
+        "bugreport",
+        "dumpstate_board",
+    ]
+    with open_input(f"{capture}::dumpstate_board.txt") as handle:
+        assert handle.read() == BOARD.encode()
+
+    expected = index_sections(plain)
+    spans = select_sections(expected, ["system log", "activity"])
+    for path in (capture, gz, xz):
+        with open_input(path) as handle:
+            assert handle.read() == BUGREPORT.encode()
+        assert index_sections(path) == expected
+        assert list(read_spans(path, spans)) == list(read_spans(plain, spans))
+
+
+def test_parse_and_collect_archives(tmp_path):
+    from mybugreport.models import DeviceInfo
+    from mybugreport.pipeline.collect import collect_existing_artifact
+    from mybugreport.pipeline.parse import parse_artifacts_to_records
+
+    plain, capture, gz, xz = write_captures(tmp_path)
+    expected = parse_artifacts_to_records([plain], tmp_path / "plain", workers=2)[0].read_text()
+    outputs = parse_artifacts_to_records([capture, gz, xz], tmp_path / "out", workers=2)
+    assert [path.name for path in outputs] == [
+        "capture.records.jsonl",
+        "bugreport.records.jsonl",
+        "bugreport.records.jsonl",
+    ]
+    assert all(path.read_text() == expected for path in outputs[1:])
+    assert parse_artifacts_to_records([capture], tmp_path / "zip", sections=["system log"])[0].read_text().count(
+        "\n"
+    ) == 4
+
+    artifact = collect_existing_artifact(capture, DeviceInfo(serial="S"), tmp_path / "collect")
+    assert artifact.size_bytes == capture.stat().st_size
+    assert artifact.metadata["archive"] == "zip"
+    assert artifact.metadata["members"][0] == "bugreport-device-build-2024-06-21.txt"
+
+
+def test_legacy_cli_reads_archives(tmp_path, monkeypatch):
+    import importlib
+
+    rule = tmp_path / "rule.txt"
+    rule.write_text("key:值\n")
+    section_rule = tmp_path / "rule2.txt"
+    section_rule.write_text("START:END\n")
+    monkeypatch.setenv("MYBUGREPORT_RULE_FILE", str(rule))
+    monkeypatch.setenv("MYBUGREPORT_SECTION_RULE_FILE", str(section_rule))
+    from mybugreport import cli, config
+
+    importlib.reload(config)
+    importlib.reload(cli)
+
+    plain, capture, gz, _ = write_captures(tmp_path)
+    expected = tmp_path / "expected.txt"
+    cli.execute_commands(["2024-01-01"], str(plain), str(expected), "0")
+    assert "值" in expected.read_text()
+    for source in (capture, gz):
+        out = tmp_path / "out.txt"
+        cli.execute_commands(["2024-01-01"], str(source), str(out), "0", workers=2)
+        assert out.read_bytes() == expected.read_bytes()
+
+    cli.execute_commands([], str(plain), str(expected), "0", time_range=("12:00:02", "12:00:03"))
+    cli.execute_commands([], str(capture), str(out), "0", time_range=("12:00:02", "12:00:03"))
+    assert out.read_bytes() == expected.read_bytes()
+
+
+def test_pipeline_all_members(tmp_path, capsys):
+    from mybugreport.cli import pipeline_main
+
+    _, capture, _, _ = write_captures(tmp_path)
+    workdir = tmp_path / "work"
+    pipeline_main(["pipeline", str(capture), str(workdir), "SERIAL", "--all-members"])
+    out = capsys.readouterr().out
+    assert "parse:bugreport-device-build-2024-06-21: ran" in out and "parse:dumpstate_board: ran" in out
+    assert (workdir / "collect" / "capture.sections.json").exists()
+    assert (workdir / "parse" / "dumpstate_board.records.jsonl").read_text().count("board line") == 2
@@ -0,0 +1,104 @@
+import gzip
+import json
+import subprocess
+import sys
+import time
+from datetime import timezone
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+DATA = REPO_ROOT / "tests" / "data"
+
+
+@pytest.fixture
+def utc(monkeypatch):
+    monkeypatch.setenv("TZ", "UTC")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_v4_matches_threadtime_text():
+    from mybugreport.pipeline.parse import record_from_line
+    from mybugreport.pipeline.parse.binary_logcat import iter_binary_records
+
+    records = list(iter_binary_records(DATA / "logcat_v4.bin", tz=timezone.utc))
+    lines = (DATA / "logcat_v4.threadtime.txt").read_text(encoding="utf-8").splitlines()
+    assert [record.raw for record in records] == lines
+    assert records == [record_from_line(line, "logcat") for line in lines]
+
+
+def test_older_headers():
+    from mybugreport.pipeline.parse.binary_logcat import iter_binary_records
+
+    def decode(name, **kwargs):
+        records = iter_binary_records(DATA / name, tz=timezone.utc, **kwargs)
+        return [(record.ts, record.pid, record.level, record.tag, record.msg) for record in records]
+
+    assert decode("logcat_v1.bin") == [("06-21 12:00:01.007", 1000, "V", "Looper", "slow dispatch")]
+    # v2 carries the euid where v3 has the buffer id
+    assert decode("logcat_v2.bin", header_version=2) == [("06-21 12:00:01.000", 1000, "E", "Zygote", "died")]
+    assert decode("logcat_v3.bin") == [
+        ("06-21 12:00:01.000", 1000, "I", "am_proc_start", "[0,7]"),
+        ("06-21 12:00:01.000", 1, "I", "init", "boot"),
+    ]
+    assert decode("logcat_v3.bin", event_tags={})[0][3] == "30014"
+
+
+def test_v2_version_comes_from_capture_context(tmp_path):
+    import struct
+
+    from mybugreport.pipeline.parse.binary_logcat import capture_header_version, iter_binary_records
+
+    # a v2 entry logged by euid 2, which a v3 reading would take for the events buffer
+    payload = b"\x06Zygote\0died\0"
+    capture = tmp_path / "logcat.bin"
+    capture.write_bytes(struct.pack("<HHiiiiI", len(payload), 24, 1000, 1001, 1781007201, 0, 2) + payload)
+    assert capture_header_version(capture) == 3
+
+    (tmp_path / "device_info.json").write_text(json.dumps({"serial": "S", "android_version": "4.4.2"}))
+    assert capture_header_version(capture) == 2
+    (record,) = iter_binary_records(capture, tz=timezone.utc)
+    assert (record.level, record.tag, record.msg) == ("E", "Zygote", "died")
+
+    (tmp_path / "device_info.json").write_text(json.dumps({"serial": "S", "android_version": "14"}))
+    assert capture_header_version(capture) == 3
+
+
+def test_parse_stage_decodes_binary(tmp_path, utc):
+    from mybugreport.pipeline.parse import is_binary_logcat, parse_artifacts_to_records, parse_bugreport_stream
+
+    assert is_binary_logcat(DATA / "logcat_v4.bin")
+    assert not is_binary_logcat(DATA / "logcat_v4.threadtime.txt")
+    compressed = tmp_path / "logcat.bin.gz"
+    compressed.write_bytes(gzip.compress((DATA / "logcat_v4.bin").read_bytes()))
+    assert is_binary_logcat(compressed)
+
+    expected = tmp_path / "text.jsonl"
+    parse_bugreport_stream(DATA / "logcat_v4.threadtime.txt", expected, source="logcat")
+    (output,) = parse_artifacts_to_records([DATA / "logcat_v4.bin"], tmp_path / "parse", source="logcat", workers=2)
+    assert output.name == "logcat_v4.records.jsonl"
+    assert output.read_text(encoding="utf-8") == expected.read_text(encoding="utf-8")
+
+
+def test_collect_binary(tmp_path):
+    from mybugreport.pipeline.collect.adb import collect_adb
+
+    def runner(cmd, timeout=None):
+        stdout = (DATA / "logcat_v4.bin").read_bytes() if "logcat" in cmd else "30014 am_proc_start\n"
+        return subprocess.CompletedProcess(cmd, 0, stdout=stdout, stderr="")
+
+    index = collect_adb("SERIAL", tmp_path, runner=runner, binary=True)
+    artifacts = json.loads(index.read_text())
+    assert [item["artifact_type"] for item in artifacts] == ["logcat", "event_tags"]
+    assert "-B" in artifacts[0]["command"] and artifacts[0]["metadata"]["format"] == "binary"
+    assert Path(artifacts[0]["path"]).read_bytes() == (DATA / "logcat_v4.bin").read_bytes()
+    assert Path(artifacts[1]["path"]).name == "event-log-tags.txt"
+    with pytest.raises(ValueError):
+        collect_adb("SERIAL", tmp_path, runner=runner, binary=True, resume=True)
@@ -0,0 +1,58 @@
+import json
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+BUGREPORT = (
+    "------ SYSTEM LOG (logcat -v threadtime -d *:v) ------\n"
+    "06-21 12:34:56.789  1000  1234 I ActivityManager: Start proc 42   数据\n"
+    "06-21 12:34:56.790  1000  1234 W WindowManager: \n"
+    "D/PackageManager(  812): scan started\n"
+    "plain text\n"
+    "\n"
+)
+
+
+def test_columnar_roundtrip_matches_jsonl(tmp_path):
+    from mybugreport.pipeline.analyze import iter_log_records
+    from mybugreport.pipeline.parse import parse_bugreport_lines, parse_bugreport_stream
+    from mybugreport.utils import ColumnarRecords, is_columnar
+
+    source = tmp_path / "bugreport.txt"
+    source.write_text(BUGREPORT, encoding="utf-8")
+    records = parse_bugreport_lines(source, tmp_path / "records.jsonl")
+    cols = tmp_path / "records.cols"
+    assert parse_bugreport_stream(source, cols, fmt="columnar") == len(records)
+    assert is_columnar(cols) and not is_columnar(tmp_path / "records.jsonl")
+    assert list(iter_log_records(cols, fmt="columnar")) == records
+
+    with ColumnarRecords(cols) as store:
+        assert len(store) == len(records)
+        assert list(store.tag_values()) == [record.tag for record in records]
+        pids = store.column("pid")
+        assert list(pids) == [-1, 1000, 1000, 812, -1, -1]
+        pids.release()
+
+
+def test_empty_columnar(tmp_path):
+    from mybugreport.utils import ColumnarRecords, write_columnar
+
+    path = tmp_path / "empty.cols"
+    assert write_columnar([], path) == 0
+    with ColumnarRecords(path) as store:
+        assert len(store) == 0 and list(store) == []
+
+
+def test_cli_format_switch(tmp_path):
+    from mybugreport.cli import pipeline_main
+
+    source = tmp_path / "bugreport.txt"
+    source.write_text(BUGREPORT, encoding="utf-8")
+    cols = tmp_path / "records.cols"
+    findings = tmp_path / "findings.json"
+    pipeline_main(["parse", str(source), str(cols), "--format", "columnar"])
+    pipeline_main(["analyze", str(cols), str(findings), "--format", "columnar"])
+    assert json.loads(findings.read_text())[0]["evidence"]["records"] == 6
@@ -0,0 +1,64 @@
+import sys
+import tracemalloc
+from dataclasses import asdict
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+LINES = [
+    "06-21 12:34:56.789  1000  1234 I ActivityManager: Start proc 42\n",
+    "06-21 12:34:56.789  1000  1234 I ActivityManager: \n",
+    "D/PackageManager(  812): scan started\n",
+    "------ SYSTEM LOG (logcat -v threadtime -d *:v) ------\n",
+    "plain text\n",
+    "\n",
+]
+
+
+def test_compact_record_matches_dataclass():
+    from mybugreport.models import CompactLogRecord, LogRecord
+    from mybugreport.pipeline.parse import record_from_line
+    from mybugreport.utils import dump_jsonl_line
+
+    for line in LINES:
+        full = record_from_line(line, "bugreport")
+        compact = record_from_line(line, "bugreport", CompactLogRecord)
+        assert compact.to_dict() == asdict(full)
+        assert dump_jsonl_line(compact) == dump_jsonl_line(full)
+        assert compact == full and full == compact
+        assert CompactLogRecord.from_record(full).to_record() == full
+    assert not hasattr(compact, "__dict__")
+
+    first = record_from_line(LINES[0], "".join(["bug", "report"]), CompactLogRecord)
+    second = record_from_line(LINES[1], "".join(["bug", "report"]), CompactLogRecord)
+    assert first.tag is second.tag and first.source is second.source
+
+
+def test_compact_records_use_less_memory():
+    from mybugreport.models import CompactLogRecord, LogRecord
+    from mybugreport.pipeline.parse import record_from_line
+
+    lines = [
+        f"06-21 12:00:{idx % 60:02d}.000  1000  {idx % 300:5d} I ActivityManager: Start proc {idx} for svc\n"
+        for idx in range(20000)
+    ]
+    usage = {}
+    for record_type in (LogRecord, CompactLogRecord):
+        tracemalloc.start()
+        records = [record_from_line(line, "bugreport", record_type) for line in lines]
+        usage[record_type], _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del records
+    assert usage[CompactLogRecord] * 2 < usage[LogRecord]
+
+
+def test_stream_back_as_compact_records(tmp_path):
+    from mybugreport.pipeline.analyze import iter_log_records
+    from mybugreport.pipeline.parse import parse_bugreport_lines
+
+    source = tmp_path / "bugreport.txt"
+    source.write_text("".join(LINES))
+    records = parse_bugreport_lines(source, tmp_path / "records.jsonl")
+    assert list(iter_log_records(tmp_path / "records.jsonl")) == records
@@ -0,0 +1,56 @@
+import io
+import random
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+
+def sample_log(seed, count=400):
+    rng = random.Random(seed)
+    stamps = ["12:00:01", "12:00:02", "12:30:00", "2024-06-21"]
+    lines = []
+    for idx in range(count):
+        roll = rng.random()
+        if roll < 0.08:
+            lines.append(f"06-21 {rng.choice(stamps)}.123  1000  {idx} I Tag: event {idx}")
+        elif roll < 0.1:
+            lines.append("")
+        else:
+            lines.append(f"noise line {idx} a.b [x] (y) {{z}}")
+    return "\n".join(lines) + rng.choice(["\n", ""])
+
+
+@pytest.mark.skipif(shutil.which("grep") is None, reason="grep not available")
+@pytest.mark.parametrize("context", [0, 1, 3])
+@pytest.mark.parametrize("patterns", [[" 12:00:01"], ["12:00:0[12]", " 2024-06-21"], ["^noise line 1.*", "a\\.b", "(y)"]])
+def test_matches_grep_output(tmp_path, context, patterns):
+    from mybugreport.context_extractor import iter_context_lines
+
+    for seed in range(3):
+        data = sample_log(seed).encode()
+        path = tmp_path / "log.txt"
+        path.write_bytes(data)
+        args = ["grep", "-A", str(context), "-B", str(context)]
+        for pattern in patterns:
+            args += ["-e", pattern]
+        expected = subprocess.run(args + [str(path)], capture_output=True).stdout
+        for block_size in (64, 1000, 1 << 20):
+            produced = b"".join(iter_context_lines(io.BytesIO(data), patterns, context, context, block_size))
+            assert produced == expected
+
+
+def test_legacy_entrypoint_keeps_leading_space_quirk(tmp_path):
+    from mybugreport.processor import extract_context_sections
+
+    source = tmp_path / "in.txt"
+    source.write_text("2024-01-01 at start\nx\nlog 2024-01-01 inside\n")
+    output = tmp_path / "out.txt"
+    extract_context_sections(["2024-01-01"], str(source), str(output), "0")
+    assert output.read_text() == "log 2024-01-01 inside\n"
@@ -0,0 +1,112 @@
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+ADB_DEVICES = """List of devices attached
+R58M1 device usb:1-1.1 product:a model:Pixel_7 transport_id:1
+R58M2 device usb:1-1.2 product:a model:Pixel_7 transport_id:2
+R58M3 unauthorized usb:1-1.3 transport_id:3
+R58M4 device usb:2-3 product:b model:SM_G transport_id:4
+192.168.1.5:5555 device product:c model:Tab transport_id:5
+"""
+
+
+class Proc:
+    def __init__(self, returncode=0, stdout="fake-output", stderr=""):
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+
+
+def test_parse_devices():
+    from mybugreport.pipeline.collect.fleet import FleetDevice, parse_devices
+
+    assert parse_devices(ADB_DEVICES) == [
+        FleetDevice("R58M1", "1-1"),
+        FleetDevice("R58M2", "1-1"),
+        FleetDevice("R58M4", "2-3"),
+        FleetDevice("192.168.1.5:5555", None),
+    ]
+    assert parse_devices("# lab rack\nA1\nA2 hub:rack-1\n") == [FleetDevice("A1"), FleetDevice("A2", "rack-1")]
+
+
+def test_fleet_limits_and_retries(tmp_path):
+    from mybugreport.pipeline.collect.fleet import FleetDevice, collect_fleet
+
+    lock = threading.Lock()
+    active = {"all": 0, "hub-a": 0}
+    peak = {"all": 0, "hub-a": 0}
+    failures = {"B1": 1, "B2": 1}
+
+    def fake_runner(cmd, timeout=None):
+        serial = cmd[2]
+        if "logcat" not in cmd:
+            return Proc()
+        if serial == "BAD":
+            return Proc(1, "", "error: device unauthorized")
+        keys = ["all", "hub-a"] if serial.startswith("A") else ["all"]
+        with lock:
+            for key in keys:
+                active[key] += 1
+                peak[key] = max(peak[key], active[key])
+            flaky = failures.get(serial, 0)
+            failures[serial] = max(0, flaky - 1)
+        time.sleep(0.05)
+        with lock:
+            for key in keys:
+                active[key] -= 1
+        if flaky:
+            return Proc(1, "", "error: device offline" if serial == "B1" else f"error: device '{serial}' not found")
+        return Proc(stdout=f"log of {serial}\n")
+
+    devices = [FleetDevice(f"A{i}", "hub-a") for i in range(5)]
+    devices += [FleetDevice("B1", "hub-b"), FleetDevice("B2", "hub-b"), FleetDevice("BAD", "hub-b")]
+    delays = []
+    manifest_path = collect_fleet(
+        devices, tmp_path, max_parallel=3, per_hub=2, retries=2, runner=fake_runner, sleep=delays.append
+    )
+
+    assert peak["all"] <= 3 and peak["hub-a"] <= 2
+    manifest = json.loads(manifest_path.read_text())
+    entries = {entry["serial"]: entry for entry in manifest["devices"]}
+    assert [entry["serial"] for entry in manifest["devices"]] == [device.serial for device in devices]
+    assert entries["B1"]["status"] == "ok" and entries["B1"]["attempts"] == 2
+    assert entries["BAD"]["status"] == "failed" and entries["BAD"]["attempts"] == 1
+    assert "unauthorized" in entries["BAD"]["error"]
+    assert entries["B2"]["attempts"] == 2
+    assert delays == [2.0, 2.0]
+    for serial in ("A0", "B2"):
+        index = Path(entries[serial]["artifacts"])
+        assert index == tmp_path / serial / "collect" / "artifacts.json"
+        artifacts = json.loads(index.read_text())
+        assert artifacts[0]["device"]["serial"] == serial
+        assert Path(artifacts[0]["path"]).read_text() == f"log of {serial}\n"
+
+
+def test_is_transient_matches_adb_errors_only():
+    from mybugreport.pipeline.collect.fleet import is_transient
+
+    transient = [
+        "adb command timeout",
+        "Command failed (1): adb -s X logcat -d\nerror: device 'X' not found",
+        "error: device offline",
+        "error: no devices/emulators found",
+        "error: device still authorizing",
+        "error: closed",
+        "adb server closed the connection",
+        "adb: protocol fault (couldn't read status): Connection reset by peer",
+    ]
+    permanent = [
+        "adb not found",
+        "Command failed (127): adb -s X shell dmesg\n/system/bin/sh: dmesg: not found",
+        "Command failed (1): adb -s X shell cat f\ncat: f: file closed",
+        "error: device unauthorized",
+    ]
+    assert all(is_transient(RuntimeError(message)) for message in transient)
+    assert not any(is_transient(RuntimeError(message)) for message in permanent)
@@ -0,0 +1,42 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+
+def random_matrix(count, width):
+    rng = random.Random(7)
+    rows = [[rng.uniform(-0.5, 1.5) for _ in range(width)] for _ in range(count)]
+    rows[0] = [0.0, 1.0, float("nan"), -0.0][:width]
+    return rows
+
+
+def check_matches_scalar(module):
+    configs = [module.EvidenceConfig(f"c{i}", weight) for i, weight in enumerate((2.0, 1.0, 3.0, 3.0))]
+    rows = random_matrix(2000, len(configs))
+    expected = [module.compute_score(dict(zip((c.name for c in configs), row)), configs, bias=-4.0) for row in rows]
+    result = module.fuse_signals_batch(rows, configs, bias=-4.0, thresholds=module.Thresholds(0.8, 0.5))
+    assert list(result["scores"]) == expected  # exact, not approximate
+    assert result["labels"] == [module.evaluate_score(score) for score in expected]
+    assert len(module.compute_scores([], configs)) == 0
+    with pytest.raises(ValueError):
+        module.compute_scores([[0.5, 0.5]], configs)
+
+
+def test_batch_matches_compute_score_without_numpy(monkeypatch):
+    from mybugreport import forensic_analysis
+
+    monkeypatch.setattr(forensic_analysis, "numpy", None)
+    check_matches_scalar(forensic_analysis)
+
+
+def test_batch_matches_compute_score_with_numpy():
+    pytest.importorskip("numpy")
+    from mybugreport import forensic_analysis
+
+    check_matches_scalar(forensic_analysis)
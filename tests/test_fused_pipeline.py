@@ -0,0 +1,49 @@
+import random
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+
+def build_input(seed):
+    rng = random.Random(seed)
+    pieces = []
+    for idx in range(300):
+        roll = rng.random()
+        if roll < 0.05:
+            pieces.append("== MediaProvider.db START ==")
+        elif roll < 0.08:
+            pieces.append("END of dump START" if rng.random() < 0.3 else "END of dump")
+        elif roll < 0.15:
+            pieces.append(f"06-21 12:00:0{rng.randint(1, 3)}.5 fg-s took {rng.randint(0, 9)}ms\r")
+        else:
+            pieces.append(f"line {idx} version allow 5m {rng.choice(['', 'scan started', 'pid=7'])}")
+    return "\n".join(pieces) + rng.choice(["", "\n"])
+
+
+def test_fused_output_matches_step_by_step(tmp_path):
+    from mybugreport.processor import (
+        apply_translations_and_time,
+        extract_context_sections,
+        extract_section_with_rules,
+        run_fused_pipeline,
+    )
+    from mybugreport.rules import load_translation_pairs
+
+    pairs = load_translation_pairs(str(REPO_ROOT / "rule.txt"))
+    for seed in range(4):
+        source = tmp_path / f"in{seed}.txt"
+        source.write_bytes(build_input(seed).encode())
+        expected = tmp_path / f"expected{seed}.txt"
+        fused = tmp_path / f"fused{seed}.txt"
+
+        extract_context_sections(["12:00:02"], str(source), str(expected), "1")
+        extract_section_with_rules(str(source), str(expected), "MediaProvider.db", "END")
+        apply_translations_and_time(str(expected), pairs)
+
+        run_fused_pipeline(
+            ["12:00:02"], str(source), str(fused), "1", [("MediaProvider.db", "END")], pairs, block_size=128
+        )
+        assert fused.read_bytes() == expected.read_bytes()
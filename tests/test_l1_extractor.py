@@ -0,0 +1,88 @@
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+LINES = [
+    "06-21 12:00:00.000   512   512 I init    : processing action (sys.usb.config=mtp,adb && sys.usb.configfs=1)",
+    "06-21 12:00:01.000  1000  1200 I UsbDeviceManager: Setting USB config to mtp,adb",
+    "06-21 12:00:02.000   600   600 I adbd    : adbd_auth_confirm_key",
+    "06-21 12:00:02.500   600   600 W adbd    : authentication failed, rejected key",
+    "06-21 12:00:03.000   512   512 I init    : Command 'setprop service.adb.root 1' action=x",
+    "06-21 12:00:10.000   600   600 I adbd    : restarting in TCP mode port: 5555",
+    "06-21 12:00:20.000   512   512 I init    : processing action (service.adb.root=0)",
+    "06-21 12:01:30.000  1000  1200 I ActivityManager: Start proc 4321:com.example",
+    "06-21 12:01:31.000  1000  1200 I UsbDeviceManager: Setting USB config to mtp",
+]
+
+
+def test_extract_l1_events_and_windows():
+    from mybugreport.pipeline.analyze.l1_extractor import extract_l1
+    from mybugreport.pipeline.parse import record_from_line
+
+    samples = list(extract_l1((record_from_line(line, "logcat") for line in LINES), window=60))
+    assert [(s.event.ts[6:], s.event.feature, s.event.value) for s in samples] == [
+        ("12:00:00.000", "functions_has_adb", 1.0),
+        ("12:00:01.000", "functions_has_adb", 1.0),
+        ("12:00:02.000", "has_adbd_auth", 1.0),
+        ("12:00:03.000", "adbd_root_hint", 1.0),
+        ("12:00:10.000", "adb_over_tcp_hint", 1.0),
+        ("12:00:20.000", "adbd_root_hint", 0.0),
+        ("12:01:31.000", "functions_has_adb", 0.0),
+    ]
+    assert samples[4].strengths["L1_connection_auth"] == 1.0
+    # root went off at 12:00:20 but was on within the window; auth (12:00:02) still counts
+    assert samples[5].strengths["adbd_root_hint"] == 1.0 and samples[5].strengths["has_adbd_auth"] == 1.0
+    last = samples[-1].strengths
+    assert last["functions_has_adb"] == 1.0  # on until just now
+    assert last["has_adbd_auth"] == 0.0 and last["adbd_root_hint"] == 0.0  # older than 60s
+    assert last["adb_over_tcp_hint"] == 1.0  # a state, never turned off
+
+
+def test_extractor_memory_is_flat():
+    from mybugreport.pipeline.analyze.l1_extractor import L1Extractor
+
+    extractor = L1Extractor()
+
+    def feed(count):
+        for idx in range(count):
+            ts = f"06-21 12:{idx // 60000 % 60:02d}:{idx // 1000 % 60:02d}.{idx % 1000:03d}"
+            extractor.feed(ts, "adbd" if idx % 100 == 0 else "Tag", "adbd_auth_confirm_key" if idx % 100 == 0 else "x")
+
+    feed(10000)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    feed(100000)
+    grown = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    assert grown < 16 * 1024
+    assert extractor.strengths()["has_adbd_auth"] == 1.0
+
+
+def test_analyze_writes_l1_events(tmp_path):
+    from mybugreport.cli import pipeline_main
+
+    capture = tmp_path / "logcat.txt"
+    capture.write_text("\n".join(LINES) + "\n", encoding="utf-8")
+    records = tmp_path / "logcat.records.jsonl"
+    pipeline_main(["parse", str(capture), str(records), "--source", "logcat"])
+    events = tmp_path / "l1.jsonl"
+    pipeline_main(["analyze", str(records), str(tmp_path / "findings.json"), "--l1-events", str(events)])
+    rows = [json.loads(line) for line in events.read_text(encoding="utf-8").splitlines()]
+    assert len(rows) == 7 and rows[0]["file"] == "logcat.records.jsonl"
+    assert rows[4]["strengths"]["L1_connection_auth"] == 1.0
+
+
+def test_start_of_year_is_a_time():
+    from mybugreport.pipeline.analyze.l1_extractor import L1Extractor, ts_seconds
+
+    assert ts_seconds("01-01 00:00:00.000") == 0.0
+    extractor = L1Extractor()
+    extractor.feed("12-31 23:59:59.000", "Tag", "message")
+    assert extractor.now == ts_seconds("12-31 23:59:59.000")
+    extractor.feed("01-01 00:00:00.000", "Tag", "message")
+    assert extractor.now == 0.0
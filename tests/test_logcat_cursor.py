@@ -0,0 +1,59 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+
+def make_device(ring):
+    """Fake adb whose logcat honours -T like the real one (entries at or after the time)."""
+    calls = []
+
+    def runner(cmd, timeout=None):
+        calls.append(cmd)
+        if "logcat" not in cmd:
+            return subprocess.CompletedProcess(cmd, 0, stdout="", stderr="")
+        since = cmd[cmd.index("-T") + 1] if "-T" in cmd else ""
+        lines = ["--------- beginning of main"] + [line for line in ring if line[:18] >= since]
+        return subprocess.CompletedProcess(cmd, 0, stdout="\n".join(lines) + "\n", stderr="")
+
+    return runner, calls
+
+
+def entry(ts, msg):
+    return f"06-21 {ts}  1000  1001 I Tag: {msg}"
+
+
+def test_resume_collects_only_new_entries(tmp_path):
+    from mybugreport.pipeline.collect.adb import collect_adb
+
+    ring = [entry("12:00:00.000", "a"), entry("12:00:01.000", "b"), entry("12:00:01.000", "b")]
+    runner, calls = make_device(ring)
+    index = collect_adb("SERIAL", tmp_path, include_dmesg=True, runner=runner, resume=True)
+    first = json.loads(index.read_text())
+    assert "-T" not in calls[-2]
+    assert Path(first[0]["path"]).name == "logcat-0001.txt"
+
+    # same millisecond as the cursor: one more identical entry and a different one
+    ring += [entry("12:00:01.000", "b"), entry("12:00:01.000", "c"), entry("12:00:02.000", "d")]
+    index = collect_adb("SERIAL", tmp_path, include_dmesg=True, runner=runner, resume=True)
+    artifacts = json.loads(index.read_text())
+    assert "12:00:01.000" in calls[-2][calls[-2].index("-T") + 1]
+    assert [item["artifact_type"] for item in artifacts] == ["logcat", "logcat", "dmesg"]
+    delta = artifacts[1]
+    assert delta["metadata"]["delta"] is True and delta["metadata"]["dropped_duplicates"] == 2
+    assert delta["metadata"]["until"] == "06-21 12:00:02.000"
+    segment = Path(delta["path"]).read_text().splitlines()
+    assert segment[1:] == ring[3:]
+
+    # nothing new: no segment, index unchanged apart from dmesg
+    index = collect_adb("SERIAL", tmp_path, runner=runner, resume=True)
+    assert [Path(item["path"]).name for item in json.loads(index.read_text())] == [
+        "logcat-0001.txt",
+        "logcat-0002.txt",
+        "dmesg.txt",
+    ]
+    assert not (tmp_path / "logs" / "logcat-0003.txt").exists()
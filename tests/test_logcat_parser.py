@@ -0,0 +1,68 @@
+import json
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+
+def test_parse_log_line_formats():
+    from mybugreport.pipeline.parse import parse_log_line
+
+    assert parse_log_line("06-21 12:34:56.789  1000  1234 I ActivityManager: Start proc 42") == (
+        "06-21 12:34:56.789", 1000, 1234, "I", "ActivityManager", "Start proc 42"
+    )
+    assert parse_log_line("06-21 12:34:56.789   123   123 W Tag     : padded: tag") == (
+        "06-21 12:34:56.789", 123, 123, "W", "Tag", "padded: tag"
+    )
+    assert parse_log_line("2024-06-21 12:34:56.789  1000  1234 E Year: with year") == (
+        "2024-06-21 12:34:56.789", 1000, 1234, "E", "Year", "with year"
+    )
+    assert parse_log_line("D/PackageManager(  812): scan started") == (
+        None, 812, None, "D", "PackageManager", "scan started"
+    )
+    assert parse_log_line("------ SYSTEM LOG (logcat -v threadtime -d *:v) ------") == (
+        None, None, None, None, "section", "SYSTEM LOG (logcat -v threadtime -d *:v)"
+    )
+    # bugreport SYSTEM LOG sections: -v threadtime -v uid
+    for line, expected in (
+        (
+            "05-20 09:35:41.468  1000  1540  1551 I ActivityManager: Start proc 4321:com.android.settings/1000",
+            ("05-20 09:35:41.468", 1540, 1551, "I", "ActivityManager", "Start proc 4321:com.android.settings/1000"),
+        ),
+        (
+            "05-20 09:35:41.470  root   612   612 I init    : Service 'vendor.x' (pid 4300) exited with status 0",
+            ("05-20 09:35:41.470", 612, 612, "I", "init", "Service 'vendor.x' (pid 4300) exited with status 0"),
+        ),
+        (
+            "05-20 09:35:42.001 u0_a12  3021  3044 W ViewRootImpl[Main]: Dropping event due to no window focus",
+            ("05-20 09:35:42.001", 3021, 3044, "W", "ViewRootImpl[Main]", "Dropping event due to no window focus"),
+        ),
+        (
+            "05-20 09:35:42.100  logd   512   530 E logd    : uid=1000(system) too chatty",
+            ("05-20 09:35:42.100", 512, 530, "E", "logd", "uid=1000(system) too chatty"),
+        ),
+        (
+            "2024-05-20 09:35:41.468 system  1540  1551 D PackageManager: scan",
+            ("2024-05-20 09:35:41.468", 1540, 1551, "D", "PackageManager", "scan"),
+        ),
+    ):
+        assert parse_log_line(line) == expected
+    for line in ("", "MemTotal: 1 kB", "06-21 12:34:56.789  1000  1234  12 x not: a level", "--------- beginning of main", "06-21 not a log line", "I/nope"):
+        assert parse_log_line(line) is None
+
+
+def test_parse_stage_fills_fields(tmp_path):
+    from mybugreport.pipeline.parse import parse_bugreport_lines
+
+    source = tmp_path / "bugreport.txt"
+    source.write_text("06-21 12:34:56.789  1000  1234 I Tag: hello\nplain text\n")
+    out = tmp_path / "records.jsonl"
+    parse_bugreport_lines(source, out)
+    first, second = [json.loads(line) for line in out.read_text().splitlines()]
+    assert (first["ts"], first["pid"], first["tid"], first["level"], first["tag"], first["msg"]) == (
+        "06-21 12:34:56.789", 1000, 1234, "I", "Tag", "hello"
+    )
+    assert first["raw"] == "06-21 12:34:56.789  1000  1234 I Tag: hello"
+    assert second["ts"] is None and second["msg"] == second["raw"] == "plain text"
@@ -0,0 +1,80 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+
+def sample_input(seed, count=2000):
+    rng = random.Random(seed)
+    lines = []
+    for idx in range(count):
+        roll = rng.random()
+        if roll < 0.01:
+            lines.append("MediaProvider START")
+        elif roll < 0.02:
+            lines.append("END")
+        elif roll < 0.1:
+            lines.append(f"06-21 12:00:0{rng.randint(1, 4)}.1 I Tag: fg-s {idx}ms\r")
+        else:
+            lines.append(f"row {idx} version 5m 数据")
+    return "\n".join(lines)
+
+
+def test_parallel_pipeline_matches_serial(tmp_path):
+    from mybugreport.parallel import run_parallel_pipeline
+    from mybugreport.processor import run_fused_pipeline
+    from mybugreport.rules import load_translation_pairs
+
+    pairs = load_translation_pairs(str(REPO_ROOT / "rule.txt"))
+    rules = [("MediaProvider", "END")]
+    for seed, repeat in ((0, False), (1, True)):
+        source = tmp_path / f"in{seed}.txt"
+        source.write_bytes(sample_input(seed).encode())
+        serial = tmp_path / f"serial{seed}.txt"
+        parallel = tmp_path / f"parallel{seed}.txt"
+        run_fused_pipeline(["12:00:02"], str(source), str(serial), "2", rules, pairs, repeat_sections=repeat)
+        run_parallel_pipeline(
+            ["12:00:02"], str(source), str(parallel), "2", rules, pairs, workers=3,
+            repeat_sections=repeat, chunk_size=4096,
+        )
+        assert parallel.read_bytes() == serial.read_bytes()
+
+
+def test_parallel_parse_matches_serial(tmp_path):
+    from mybugreport.parallel import split_line_ranges
+    from mybugreport.pipeline.parse import parse_bugreport_lines, parse_bugreport_parallel
+
+    source = tmp_path / "bugreport.txt"
+    source.write_bytes(sample_input(2, count=30000).encode())
+    assert len(split_line_ranges(str(source), 4, min_chunk=1)) == 4
+    serial = tmp_path / "serial.jsonl"
+    parallel = tmp_path / "parallel.jsonl"
+    records = parse_bugreport_lines(source, serial)
+    assert parse_bugreport_parallel(source, parallel, workers=3, chunk_size=65536) == len(records)
+    assert parallel.read_bytes() == serial.read_bytes()
+
+
+def test_parse_subcommand_with_workers(tmp_path):
+    from mybugreport.cli import pipeline_main
+    from mybugreport.pipeline.parse import parse_bugreport_lines
+
+    source = tmp_path / "bugreport.txt"
+    source.write_bytes(sample_input(3, count=500).encode())
+    expected = tmp_path / "serial.jsonl"
+    parse_bugreport_lines(source, expected)
+    out = tmp_path / "records.jsonl"
+    pipeline_main(["parse", str(source), str(out), "--workers", "2"])
+    assert out.read_bytes() == expected.read_bytes()
+
+
+def test_legacy_option_without_value():
+    from mybugreport import cli
+
+    for option in ("--workers", "--from", "--to"):
+        with pytest.raises(RuntimeError, match=option):
+            cli.main(["my_bugreport.py", "in.txt", "out.txt", option])
@@ -0,0 +1,70 @@
+import json
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+BUGREPORT = (
+    "------ SYSTEM LOG (logcat -v threadtime -d *:v) ------\n"
+    "06-21 12:00:01.000  1000  1001 I ActivityManager: Start proc 42 for activity\n"
+    "06-21 12:00:02.500  1000  1002 W ActivityManager: Slow operation\n"
+    "06-21 12:01:00.000  2000  2001 I WindowManager: Start focus change\n"
+    "06-21 12:02:00.000  1000  1001 E ActivityManager: ANR in com.example\n"
+    "D/PackageManager(  812): scan started\n"
+)
+
+
+def test_sqlite_store_queries(tmp_path):
+    from mybugreport.pipeline.parse import parse_bugreport_lines, parse_bugreport_stream
+    from mybugreport.utils import RecordDatabase, write_sqlite
+
+    source = tmp_path / "bugreport.txt"
+    source.write_text(BUGREPORT)
+    records = parse_bugreport_lines(source, tmp_path / "records.jsonl")
+    database = tmp_path / "records.sqlite"
+    assert parse_bugreport_stream(source, database, fmt="sqlite") == len(records)
+
+    with RecordDatabase(database) as db:
+        assert len(db) == len(records)
+        assert list(db.query()) == records
+        assert [r.msg for r in db.query(tags=["ActivityManager"], pid=1000, start="12:00:02", end="12:02")] == [
+            "Slow operation",
+            "ANR in com.example",
+        ]
+        assert [r.tid for r in db.query(end="06-21 12:00:02")] == [1001, 1002]
+        assert [r.tag for r in db.query(match="start")] == ["ActivityManager", "WindowManager"]
+        assert [r.level for r in db.query(levels=["E", "W"], limit=1)] == ["W"]
+
+    write_sqlite(records, database, fts=False)
+    with RecordDatabase(database) as db:
+        assert not db.fts
+        assert [r.tag for r in db.query(match="Start")] == ["ActivityManager", "WindowManager"]
+
+
+def test_query_cli(tmp_path, capsys):
+    from mybugreport.cli import pipeline_main
+
+    source = tmp_path / "bugreport.txt"
+    source.write_text(BUGREPORT)
+    database = tmp_path / "records.sqlite"
+    pipeline_main(["parse", str(source), str(database), "--format", "sqlite"])
+    capsys.readouterr()
+    pipeline_main(["query", str(database), "--tag", "ActivityManager", "--match", "ANR"])
+    assert capsys.readouterr().out == "06-21 12:02:00.000  1000  1001 E ActivityManager: ANR in com.example\n"
+    pipeline_main(["query", str(database), "--pid", "812", "--json"])
+    assert json.loads(capsys.readouterr().out)["msg"] == "scan started"
+
+
+def test_database_path_with_uri_characters(tmp_path):
+    from mybugreport.pipeline.parse import parse_bugreport_stream
+    from mybugreport.utils import RecordDatabase
+
+    source = tmp_path / "bugreport.txt"
+    source.write_text(BUGREPORT)
+    for name in ("a#b.records.sqlite", "a?b%20c.records.sqlite"):
+        database = tmp_path / name
+        count = parse_bugreport_stream(source, database, fmt="sqlite")
+        with RecordDatabase(database) as db:
+            assert len(db) == count and [r.pid for r in db.query(pid=812)] == [812]
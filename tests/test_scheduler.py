@@ -0,0 +1,102 @@
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+
+def copy_nodes(tmp_path):
+    from mybugreport.pipeline.scheduler import Node
+
+    a, b, c, d = (tmp_path / name for name in "abcd")
+    return [
+        Node("d", shutil.copyfile, (str(b), str(d)), inputs=[b], outputs=[d]),
+        Node("b", shutil.copyfile, (str(a), str(b)), inputs=[a], outputs=[b]),
+        Node("c", shutil.copyfile, (str(a), str(c)), inputs=[a], outputs=[c]),
+    ]
+
+
+def test_make_style_rebuild(tmp_path):
+    from mybugreport.pipeline.scheduler import build_graph, run_dag
+
+    (tmp_path / "a").write_text("payload")
+    results = run_dag(copy_nodes(tmp_path), jobs=2)
+    assert [r.name for r in results] == ["b", "d", "c"]
+    assert all(r.status == "ran" and r.max_rss_kb for r in results)
+    assert (tmp_path / "d").read_text() == "payload"
+
+    for stamp, names in ((1000, "a"), (2000, "bc"), (3000, "d")):
+        for name in names:
+            os.utime(tmp_path / name, (stamp, stamp))
+    assert {r.status for r in run_dag(copy_nodes(tmp_path))} == {"skipped"}
+
+    os.utime(tmp_path / "b", (4000, 4000))  # d is now older than its input
+    assert [r.status for r in run_dag(copy_nodes(tmp_path))] == ["skipped", "ran", "skipped"]
+
+    with pytest.raises(ValueError, match="cycle"):
+        nodes = copy_nodes(tmp_path)
+        nodes[1].inputs = [tmp_path / "d"]
+        build_graph(nodes)
+
+
+def test_failure_blocks_dependents(tmp_path):
+    from mybugreport.pipeline.scheduler import run_dag
+
+    stats = tmp_path / "stats.json"
+    with pytest.raises(RuntimeError, match="missing inputs"):
+        run_dag(copy_nodes(tmp_path), stats_path=stats)
+    assert {item["name"]: item["status"] for item in json.loads(stats.read_text())} == {
+        "b": "failed",
+        "c": "failed",
+        "d": "blocked",
+    }
+
+
+def test_pipeline_parses_every_artifact(tmp_path, capsys):
+    from mybugreport.cli import pipeline_main
+
+    bugreport = tmp_path / "bugreport.txt"
+    bugreport.write_text("------ SYSTEM LOG (logcat -v threadtime -d *:v) ------\n06-21 12:00:01.000  1 2 I Tag: a\n")
+    logcat = tmp_path / "logcat.txt"
+    logcat.write_text("06-21 12:00:01.000  1000  1001 I Tag: x\n06-21 12:00:02.000  1000  1001 I Tag: y\n")
+    workdir = tmp_path / "work"
+    pipeline_main(["pipeline", str(bugreport), str(workdir), "SERIAL", "--artifact", str(logcat), "--jobs", "2"])
+    out = capsys.readouterr().out
+    assert "parse:bugreport: ran" in out and "parse:logcat: ran" in out
+
+    evidence = json.loads((workdir / "analyze" / "findings.json").read_text())[0]["evidence"]
+    assert evidence["records"] == 4
+    assert evidence["files"] == {"bugreport.records.jsonl": 2, "logcat.records.jsonl": 2}
+    artifacts = json.loads((workdir / "collect" / "artifacts.json").read_text())
+    assert [item["artifact_type"] for item in artifacts] == ["bugreport", "logcat"]
+    assert [item["name"] for item in json.loads((workdir / "stats.json").read_text())][-1] == "report"
+
+
+def allocate(size, path):
+    block = bytearray(size)
+    block[::4096] = b"x" * len(block[::4096])
+    Path(path).write_text(str(len(block)))
+
+
+def test_reused_workers_report_per_node_rss(tmp_path, monkeypatch):
+    from mybugreport.pipeline import scheduler
+    from mybugreport.pipeline.scheduler import Node, run_dag
+
+    # Python 3.10 has no max_tasks_per_child: workers are reused
+    monkeypatch.setattr(scheduler, "_POOL_OPTIONS", {})
+    big, small = tmp_path / "big", tmp_path / "small"
+    nodes = [
+        Node("big", allocate, (64 << 20, str(big)), outputs=[big]),
+        Node("small", allocate, (1 << 20, str(small)), outputs=[small], after=["big"]),
+    ]
+    results = {result.name: result for result in run_dag(nodes, jobs=2)}
+    assert results["big"].status == results["small"].status == "ran"
+    if not scheduler._reset_peak_rss():
+        pytest.skip("peak RSS cannot be reset on this platform")
+    assert results["big"].max_rss_kb - results["small"].max_rss_kb > 32 << 10
@@ -0,0 +1,105 @@
+import json
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+BUGREPORT = (
+    "== dumpstate: 2024-06-21 12:00:00\n"
+    "------ MEMORY INFO (/proc/meminfo) ------\n"
+    "MemTotal: 1 kB\n"
+    "------ 0.001s was the duration of 'MEMORY INFO' ------\n"
+    "------ SYSTEM LOG (logcat -v threadtime -d *:v) ------\n"
+    "06-21 12:00:01.000  1000  1001 I Tag: MediaProvider START in log\n"
+    "06-21 12:00:02.000  1000  1001 I Tag: inside\n"
+    "------ DUMPSYS (/system/bin/dumpsys) ------\n"
+    "DUMP OF SERVICE activity:\n"
+    "MediaProvider START in activity\n"
+    "END\n"
+    "DUMP OF SERVICE CRITICAL window:\n"
+    "mCurrentFocus=null\n"
+)
+
+
+def test_index_sections(tmp_path):
+    from mybugreport.pipeline.parse import index_sections
+
+    source = tmp_path / "bugreport.txt"
+    source.write_text(BUGREPORT)
+    sections = index_sections(source)
+    assert [(s.name, s.command, s.kind) for s in sections] == [
+        ("MEMORY INFO", "/proc/meminfo", "section"),
+        ("SYSTEM LOG", "logcat -v threadtime -d *:v", "section"),
+        ("DUMPSYS", "/system/bin/dumpsys", "section"),
+        ("activity", "dumpsys activity", "service"),
+        ("window", "dumpsys window", "service"),
+    ]
+    data = source.read_bytes()
+    memory, log, dumpsys, activity, window = sections
+    assert data[memory.start : memory.end] == b"------ MEMORY INFO (/proc/meminfo) ------\nMemTotal: 1 kB\n"
+    assert data[activity.start : activity.end].startswith(b"DUMP OF SERVICE activity:\n")
+    assert activity.end == window.start and window.end == dumpsys.end == len(data)
+    assert log.end == dumpsys.start
+
+
+def test_sidecar_and_section_parse(tmp_path):
+    from mybugreport.cli import pipeline_main
+
+    source = tmp_path / "bugreport.txt"
+    source.write_text(BUGREPORT)
+    collect_dir = tmp_path / "collect"
+    pipeline_main(["collect", str(source), str(collect_dir), "SERIAL"])
+    index_path = collect_dir / "bugreport.sections.json"
+    assert json.loads(index_path.read_text())["sections"][1]["name"] == "SYSTEM LOG"
+
+    records = tmp_path / "records.jsonl"
+    pipeline_main(["parse", str(source), str(records), "--section", "system log", "--sections-index", str(index_path)])
+    rows = [json.loads(line) for line in records.read_text().splitlines()]
+    assert [row["tag"] for row in rows] == ["section", "Tag", "Tag"]
+
+
+def test_legacy_extractor_scope(tmp_path):
+    from mybugreport.processor import extract_sections
+
+    source = tmp_path / "bugreport.txt"
+    source.write_text(BUGREPORT)
+    out = tmp_path / "out.txt"
+    extract_sections(str(source), str(out), [("MediaProvider", "END")], repeat=False, scope=[])
+    assert out.read_text().startswith("06-21 12:00:01.000")
+    out.unlink()
+    extract_sections(str(source), str(out), [("MediaProvider", "END")], repeat=False, scope=["activity"])
+    assert out.read_text() == "MediaProvider START in activity\n"
+    assert list((tmp_path / ".mybugreport-index").glob("*.sections.json"))
+
+
+def test_read_spans_in_bounded_chunks(tmp_path):
+    import gzip
+
+    from mybugreport.pipeline.parse import index_sections
+    from mybugreport.pipeline.parse.sections import iter_span_text_lines, read_spans
+    from mybugreport.processor import extract_sections
+
+    lines = [f"06-21 12:00:{idx % 60:02d}.000  1000  1001 I Tag: line {idx} 数据\n" for idx in range(3000)]
+    text = BUGREPORT.replace("------ DUMPSYS", "".join(lines) + "------ DUMPSYS")
+    source = tmp_path / "bugreport.txt"
+    source.write_bytes(text.encode("utf-8"))
+    archive = tmp_path / "bugreport.txt.gz"
+    archive.write_bytes(gzip.compress(text.encode("utf-8")))
+    data = text.encode("utf-8")
+    spans = [(s.start, s.end) for s in index_sections(source) if s.name in ("SYSTEM LOG", "activity")]
+
+    for path in (source, archive):
+        chunks = list(read_spans(path, spans, block_size=1000))
+        assert max(len(chunk) for chunk in chunks) <= 1000
+        assert b"".join(chunks) == b"".join(data[start:end] for start, end in spans)
+        expected = [line for start, end in spans for line in data[start:end].decode("utf-8").splitlines(True)]
+        assert list(iter_span_text_lines(path, spans)) == expected
+
+    # the legacy scoped extraction reads the span through the same bounded reader
+    scoped = tmp_path / "scoped.txt"
+    full = tmp_path / "full.txt"
+    extract_sections(str(source), str(scoped), [("line 10 ", "line 2999 ")], repeat=False, scope=["system log"])
+    extract_sections(str(source), str(full), [("line 10 ", "line 2999 ")], repeat=False)
+    assert scoped.read_bytes() == full.read_bytes() and scoped.stat().st_size > 100000
@@ -0,0 +1,66 @@
+import random
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+
+def provider_dump(seed):
+    rng = random.Random(seed)
+    lines = []
+    for idx in range(250):
+        roll = rng.random()
+        if roll < 0.04:
+            lines.append(f"  Provider{{{idx}}} com.android.providers.media/.MediaProvider")
+        elif roll < 0.07:
+            lines.append("  ContactsProvider2 provider info")
+        elif roll < 0.12:
+            lines.append("  ---- end of provider ----" + (" MediaProvider" if rng.random() < 0.2 else ""))
+        else:
+            lines.append(f"  row {idx} uri=content://media/external/{idx}")
+    return "\n".join(lines) + rng.choice(["", "\n"])
+
+
+@pytest.mark.skipif(shutil.which("awk") is None, reason="awk not available")
+@pytest.mark.parametrize("repeat", [False, True])
+def test_scanner_matches_awk(tmp_path, repeat):
+    from mybugreport.rules import escape_pattern
+    from mybugreport.sections import iter_sections
+
+    start, end = "providers.media/.MediaProvider", "end of provider"
+    action = "p=0; next" if repeat else "exit"
+    program = f"/{escape_pattern(start)}/ {{p=1; print; next}} /{end}/ && p {{{action}}} p"
+    for seed in range(4):
+        path = tmp_path / f"dump{seed}.txt"
+        path.write_text(provider_dump(seed))
+        expected = subprocess.run(["awk", program, str(path)], capture_output=True).stdout
+        for block_size in (100, 1 << 20):
+            produced = b"".join(iter_sections(str(path), [(start, end)], repeat=repeat, block_size=block_size))
+            assert produced == expected
+
+
+def test_multiple_rules_share_one_scan(tmp_path):
+    from mybugreport.processor import extract_sections
+    from mybugreport.rules import load_section_rules
+
+    rule_file = tmp_path / "rule2.txt"
+    rule_file.write_text("MediaProvider:END\nmalformed line\nContactsProvider:END\n\nCalendarProvider:STOP\n")
+    rules = load_section_rules(str(rule_file))
+    assert rules == [("MediaProvider", "END"), ("ContactsProvider", "END"), ("CalendarProvider", "STOP")]
+
+    source = tmp_path / "bugreport.txt"
+    source.write_text(
+        "noise\nMediaProvider a\nm1\nContactsProvider b\nc1\nEND\nx\n"
+        "CalendarProvider\nk1\nSTOP\nMediaProvider again\nm2\nEND\n"
+    )
+    output = tmp_path / "out.txt"
+    extract_sections(str(source), str(output), rules)
+    assert output.read_text() == (
+        "MediaProvider a\nm1\nContactsProvider b\nc1\nCalendarProvider\nk1\nMediaProvider again\nm2\n"
+    )
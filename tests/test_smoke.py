@@ -32,7 +32,9 @@ END
     os.environ["MYBUGREPORT_SECTION_RULE_FILE"] = str(section_rule)
 
     # Reload package to pick up env overrides
+    import mybugreport.config as config
     import mybugreport.cli as cli
+    importlib.reload(config)
     importlib.reload(cli)
 
     cli.execute_commands(["2024-01-01"], str(input_file), str(output_file), "0")
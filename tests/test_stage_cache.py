@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+BUGREPORT = (
+    "------ SYSTEM LOG (logcat -v threadtime -d *:v) ------\n"
+    "06-21 12:00:01.000  1000  1001 I ActivityManager: Start proc 42\n"
+)
+
+
+def test_pipeline_reuses_cached_stages(tmp_path, capsys):
+    from mybugreport.cli import pipeline_main
+
+    source = tmp_path / "bugreport.txt"
+    source.write_text(BUGREPORT)
+    cache_dir = tmp_path / "cache"
+    argv = ["pipeline", str(source), str(tmp_path / "work"), "SERIAL", "--cache-dir", str(cache_dir)]
+
+    pipeline_main(argv)
+    out = capsys.readouterr().out
+    assert "parse:bugreport: ran" in out and out.count("cache miss") == 2
+    records = tmp_path / "work" / "parse" / "bugreport.records.jsonl"
+    findings = tmp_path / "work" / "analyze" / "findings.json"
+    expected = records.read_bytes(), findings.read_bytes()
+
+    records.unlink()
+    findings.unlink()
+    pipeline_main(argv)
+    assert capsys.readouterr().out.count("cache hit") == 2
+    assert (records.read_bytes(), findings.read_bytes()) == expected
+
+    source.write_text(BUGREPORT + "06-21 12:00:02.000  1000  1001 I ActivityManager: again\n")
+    pipeline_main(argv)
+    assert capsys.readouterr().out.count("cache miss") == 2
+
+    pipeline_main(["cache", "stats", "--cache-dir", str(cache_dir)])
+    out = capsys.readouterr().out
+    assert "Entries: 4" in out and "parse: 2 entries" in out
+
+
+def test_lru_eviction(tmp_path):
+    from mybugreport.pipeline.cache import StageCache, cache_key, parse_size
+
+    assert parse_size("2K") == 2048 and parse_size("1.5M") == 3 << 19 and parse_size("10") == 10
+    cache = StageCache(tmp_path / "cache", max_bytes=250)
+    output = tmp_path / "out.bin"
+    keys = [cache_key("parse", idx=idx) for idx in range(3)]
+    for idx, key in enumerate(keys):
+        output.write_bytes(b"x" * 100)
+        cache.store(key, "parse", {"records": output})
+        if idx == 1:
+            assert cache.fetch(keys[0], {"records": output})  # touch the oldest entry
+
+    assert cache.fetch(keys[0], {"records": output})
+    assert not cache.fetch(keys[1], {"records": output})
+    assert cache.fetch(keys[2], {"records": output})
+    assert cache.prune(0) == 2 and cache.stats()["entries"] == 0
@@ -0,0 +1,80 @@
+import sys
+import tracemalloc
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+
+def write_log(path, count):
+    with path.open("w", encoding="utf-8") as handle:
+        for idx in range(count):
+            handle.write(f"06-21 12:00:{idx % 60:02d}.000  1000  {idx:5d} I Tag: message {idx} \u2028 数据\n")
+            if idx % 10 == 0:
+                handle.write(f"plain line {idx}\n")
+
+
+def test_stream_matches_list_output(tmp_path):
+    from mybugreport.pipeline.parse import iter_records, parse_bugreport_lines, parse_bugreport_stream
+    from mybugreport.utils import iter_jsonl, read_jsonl
+
+    source = tmp_path / "bugreport.txt"
+    write_log(source, 500)
+    listed = tmp_path / "list.jsonl"
+    streamed = tmp_path / "stream.jsonl"
+    records = parse_bugreport_lines(source, listed)
+    assert parse_bugreport_stream(source, streamed) == len(records)
+    assert streamed.read_bytes() == listed.read_bytes()
+    assert list(iter_records(source, max_lines=3)) == records[:3]
+
+    rows = list(iter_jsonl(streamed))
+    assert rows == read_jsonl(streamed)
+    assert len(rows) == len(records) and rows[2]["msg"] == "message 1 \u2028 数据"
+
+
+def test_stream_memory_is_bounded(tmp_path):
+    from mybugreport.pipeline.analyze import summarize_records
+    from mybugreport.pipeline.parse import parse_bugreport_stream
+
+    source = tmp_path / "bugreport.txt"
+    write_log(source, 20000)
+    records = tmp_path / "records.jsonl"
+
+    tracemalloc.start()
+    try:
+        parse_bugreport_stream(source, records)
+        _, parse_peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        findings = summarize_records(records, tmp_path / "findings.json")
+        _, analyze_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert findings[0].evidence["records"] == 22000
+    assert parse_peak < 1024 * 1024
+    assert analyze_peak < 1024 * 1024
+
+
+def test_section_parse_memory_is_bounded(tmp_path):
+    from mybugreport.context_extractor import DEFAULT_BLOCK_SIZE
+    from mybugreport.pipeline.parse import parse_bugreport_stream, section_spans_for
+
+    source = tmp_path / "bugreport.txt"
+    with source.open("w", encoding="utf-8") as handle:
+        handle.write("------ MEMORY INFO (/proc/meminfo) ------\nMemTotal: 1 kB\n")
+        handle.write("------ SYSTEM LOG (logcat -v threadtime -d *:v) ------\n")
+        for idx in range(80000):
+            handle.write(f"06-21 12:00:{idx % 60:02d}.000  1000  {idx % 30000:5d} I Tag: message {idx} 数据\n")
+        handle.write("------ DUMPSYS (/system/bin/dumpsys) ------\nDUMP OF SERVICE activity:\n")
+    spans = section_spans_for(source, ["system log"])
+    assert spans[0][1] - spans[0][0] > DEFAULT_BLOCK_SIZE
+
+    records = tmp_path / "records.jsonl"
+    tracemalloc.start()
+    try:
+        count = parse_bugreport_stream(source, records, spans=spans)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert count == 80001  # the section header and its lines
+    assert peak < 1024 * 1024
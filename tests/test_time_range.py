@@ -0,0 +1,93 @@
+import random
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+
+def logcat_lines(rng, count):
+    lines = ["--------- beginning of main"]
+    millis = 12 * 3600 * 1000
+    for idx in range(count):
+        millis += rng.choice([0, 250, 1000, 7000])
+        second = millis // 1000
+        stamp = f"06-21 {second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}.{millis % 1000:03d}"
+        lines.append(f"{stamp}  1000  1001 I Tag: entry {idx}")
+        if rng.random() < 0.1:
+            lines.append("    at com.example.Foo.bar(Foo.java:1)")
+    return lines
+
+
+def build_bugreport(seed):
+    rng = random.Random(seed)
+    lines = ["== dumpstate: 2024-06-21 12:00:00", "------ MEMORY INFO (/proc/meminfo) ------", "MemTotal: 1 kB"]
+    lines.append("------ SYSTEM LOG (logcat -v threadtime -v printable -d *:v) ------")
+    lines += logcat_lines(rng, 300)
+    lines.append("------ 0.5s was the duration of 'SYSTEM LOG' ------")
+    lines.append("------ EVENT LOG (logcat -b events -v threadtime -d *:v) ------")
+    lines += logcat_lines(rng, 200)
+    return "\n".join(lines) + "\n"
+
+
+def reference(text, start, end):
+    """Linear scan: lines of each logcat block from the first entry >= start up to end."""
+    blocks, block = [], None
+    for line in text.splitlines(keepends=True):
+        if line.startswith("------ "):
+            block = [] if "(logcat" in line else None
+            if block is not None:
+                blocks.append(block)
+        elif block is not None:
+            block.append(line)
+    groups = []
+    for block in blocks:
+        emitting, group = start is None, []
+        for line in block:
+            if line[:2].isdigit():
+                stamp = line[6:18]
+                if end is not None and stamp[: len(end)] > end:
+                    break
+                if not emitting and stamp[: len(start)] >= start:
+                    emitting = True
+            if emitting:
+                group.append(line)
+        if group:
+            groups.append("".join(group))
+    return "--\n".join(groups)
+
+
+def test_range_matches_linear_scan(tmp_path):
+    from mybugreport.time_range import extract_time_range
+
+    for seed in range(3):
+        text = build_bugreport(seed)
+        source = tmp_path / "bugreport.txt"
+        source.write_text(text)
+        for start, end in (("12:01:00", "12:02:30"), ("12:00:00", "12:00:05.5"), ("12:30:00", None), ("13:00", "14:00")):
+            out = tmp_path / "out.txt"
+            extract_time_range(str(source), str(out), start, end)
+            assert out.read_text() == reference(text, start, end), (seed, start, end)
+
+
+def test_cli_range_mode(tmp_path, monkeypatch):
+    import importlib
+
+    monkeypatch.setenv("MYBUGREPORT_RULE_FILE", str(REPO_ROOT / "rule.txt"))
+    monkeypatch.setenv("MYBUGREPORT_SECTION_RULE_FILE", str(REPO_ROOT / "rule2.txt"))
+    from mybugreport import cli, config
+
+    importlib.reload(config)
+    importlib.reload(cli)
+
+    source = tmp_path / "logcat.txt"
+    source.write_text(
+        "06-21 12:29:59.000  1 1 I A: before\n"
+        "06-21 12:30:00.000  1 1 I A: first\n"
+        "06-21 12:35:00.999  1 1 I A: last\n"
+        "06-21 12:35:01.000  1 1 I A: after\n"
+    )
+    out = tmp_path / "out.txt"
+    cli.main(["my_bugreport.py", "--from", "12:30:00", "--to=12:35:00", str(source), str(out)])
+    assert [line.split(": ")[1] for line in out.read_text().splitlines()] == ["first", "last"]
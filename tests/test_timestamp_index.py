@@ -0,0 +1,100 @@
+import random
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+
+def build_input(seed):
+    rng = random.Random(seed)
+    lines = []
+    for idx in range(400):
+        stamp = f"12:00:{rng.randint(0, 9):02d}"
+        day = rng.choice(["2024-06-21", "2024-06-22"])
+        lines.append(rng.choice([
+            f"{day} {stamp}.{idx:03d} I Tag: line {idx}",
+            f"06-21 {stamp}.5 fg-s took {idx}ms",
+            f"[{stamp}] no leading space",
+            f"plain line {idx}",
+        ]))
+    return "\n".join(lines) + rng.choice(["", "\n"])
+
+
+def test_required_token():
+    from mybugreport.timestamp_index import required_token
+
+    assert required_token(" 12:00:03") == "12:00:03"
+    assert required_token(" 2024-06-21 12:00") == "2024-06-21"
+    assert required_token(" 12:00:0*") is None
+    assert required_token(" 12:00:03*") is None
+    assert required_token(" 12:00:0[0-3]") is None
+    assert required_token(" boot") is None
+
+
+def test_indexed_lookup_matches_scan(tmp_path):
+    from mybugreport.processor import extract_context_sections
+
+    for seed in range(3):
+        source = tmp_path / f"in{seed}.txt"
+        source.write_bytes(build_input(seed).encode())
+        for dates, context in ((["12:00:03"], "1"), (["12:00:03", "2024-06-22"], "2"), (["12:00:07.1"], "0")):
+            expected = tmp_path / "expected.txt"
+            indexed = tmp_path / "indexed.txt"
+            extract_context_sections(dates, str(source), str(expected), context, use_index=False)
+            extract_context_sections(dates, str(source), str(indexed), context, use_index=True)
+            assert indexed.read_bytes() == expected.read_bytes()
+    assert len(list((tmp_path / ".mybugreport-index").glob("*.tsidx"))) == 3
+
+
+def test_index_is_reused_and_invalidated(tmp_path, monkeypatch):
+    from mybugreport import timestamp_index
+
+    source = tmp_path / "bugreport.txt"
+    source.write_text("a 12:00:01 x\nb 12:00:02 y\n")
+    list(timestamp_index.indexed_context_lines([" 12:00:01"], str(source), "0"))
+
+    def fail(_path):
+        raise AssertionError("input rehashed although it did not change")
+
+    monkeypatch.setattr(timestamp_index, "fingerprint_file", fail)
+    assert list(timestamp_index.indexed_context_lines([" 12:00:02"], str(source), "0")) == [b"b 12:00:02 y\n"]
+    monkeypatch.undo()
+
+    source.write_text("c 12:00:02 z\n")
+    assert list(timestamp_index.indexed_context_lines([" 12:00:02"], str(source), "0")) == [b"c 12:00:02 z\n"]
+    assert len(list((tmp_path / ".mybugreport-index").glob("*.tsidx"))) == 2
+
+
+def test_read_only_input_dir_falls_back(tmp_path, monkeypatch):
+    import os
+
+    from mybugreport import timestamp_index
+    from mybugreport.processor import extract_context_sections
+
+    source = tmp_path / "evidence" / "bugreport.txt"
+    source.parent.mkdir()
+    source.write_bytes(build_input(1).encode())
+    expected = tmp_path / "expected.txt"
+    extract_context_sections(["12:00:03"], str(source), str(expected), "1", use_index=False)
+
+    # read-only input directory: the index goes to the cache directory instead
+    cache = tmp_path / "cache"
+    monkeypatch.setattr(timestamp_index, "STAGE_CACHE_DIR", str(cache))
+    monkeypatch.setattr(os, "access", lambda path, mode: Path(path) != source.parent)
+    assert timestamp_index.default_index_dir(str(source)) == cache / "index"
+    indexed = tmp_path / "indexed.txt"
+    extract_context_sections(["12:00:03"], str(source), str(indexed), "1", use_index=True)
+    assert indexed.read_bytes() == expected.read_bytes()
+    assert not (source.parent / ".mybugreport-index").exists()
+    assert list((cache / "index").glob("*.tsidx"))
+
+    # nowhere writable: warn and scan
+    def read_only(*_args, **_kwargs):
+        raise OSError(30, "Read-only file system")
+
+    monkeypatch.setattr(timestamp_index, "_remember_digest", read_only)
+    monkeypatch.setattr(timestamp_index, "STAGE_CACHE_DIR", str(tmp_path / "other"))
+    extract_context_sections(["12:00:03"], str(source), str(indexed), "1", use_index=True)
+    assert indexed.read_bytes() == expected.read_bytes()
@@ -0,0 +1,58 @@
+import random
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from mybugreport.rules import load_translation_pairs  # noqa: E402
+from mybugreport.time_utils import replace_time_strings_in_line  # noqa: E402
+from mybugreport.translation import compile_translations  # noqa: E402
+
+
+def legacy_translate(line, replacements):
+    for key, value in replacements.items():
+        line = line.replace(key, value)
+        line = replace_time_strings_in_line(line)
+    return line
+
+
+def random_lines(alphabet_words, count, seed):
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(count):
+        parts = [rng.choice(alphabet_words) for _ in range(rng.randint(0, 8))]
+        glue = rng.choice(["", " ", "-", "0", "5"])
+        lines.append(glue.join(parts) + "\n")
+    return lines
+
+
+def test_engine_matches_legacy_on_repo_rules():
+    pairs = load_translation_pairs(str(REPO_ROOT / "rule.txt"))
+    words = list(pairs) + ["5m", "0m", "12h", "3d", "-7s", "15ms", "1分钟s", "device", "x", "fg", "Charge", "9"]
+    engine = compile_translations(pairs)
+    for line in random_lines(words, 3000, seed=1):
+        assert engine.translate_line(line) == legacy_translate(line, pairs)
+
+
+def test_engine_matches_legacy_on_overlapping_rules():
+    pairs = {
+        "ab": "X",
+        "abc": "Y",
+        "bc": "ab",
+        "X": "5m",
+        "m": "",
+        "s0": "d",
+        "": "",
+        "Yb": "0ms",
+    }
+    words = ["a", "b", "c", "X", "Y", "5", "0", "m", "s", "d", "1分钟"]
+    engine = compile_translations(pairs)
+    for line in random_lines(words, 3000, seed=2):
+        assert engine.translate_line(line) == legacy_translate(line, pairs)
+
+
+def test_engine_without_rules_leaves_lines_untouched():
+    engine = compile_translations({})
+    assert engine.translate_line("took 5m\n") == "took 5m\n"
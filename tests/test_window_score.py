@@ -0,0 +1,97 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+COMMANDS = ["pm list packages", "dumpsys package", "content query --uri content://sms", "tar -cf /sdcard/a.tar /data"]
+
+
+def session_lines():
+    lines = [
+        "06-21 09:00:00.000  1000  1000 I battery_status: [3,2,1,0,Li-ion]",
+        "06-21 09:00:05.000  1000  1200 I ActivityManager: Displayed com.example/.Main",
+        # hours later: plugged into USB, adb online, then systematic extraction
+        "06-21 12:00:00.000  1000  1000 I battery_status: [2,2,1,2,Li-ion]",
+        "06-21 12:00:00.500  1000  1000 I battery_level: [50,4000,300]",
+        "06-21 12:00:01.000   512   512 I init    : processing action (sys.usb.config=mtp,adb)",
+        "06-21 12:00:02.000   600   600 I adbd    : adbd_auth_confirm_key",
+    ]
+    for second in range(10, 50):
+        ts = f"06-21 12:00:{second:02d}.000"
+        command = COMMANDS[second % len(COMMANDS)]
+        lines.append(f"{ts}   600   700 I adbd    : starting service 'shell,v2,raw:{command}'")
+        if second % 2 == 0:
+            provider = ["contacts.ContactsProvider2", "telephony.SmsProvider", "media.MediaProvider"][second % 3]
+            lines.append(
+                f"{ts}  1000  1200 I ActivityManager: Start proc 42{second}:com.android.providers.x/u0a1"
+                f" for content provider {{com.android.providers.x/com.android.providers.{provider}}}"
+            )
+            lines.append(f"{ts}  1000  1200 I UriGrantsManagerService: grant content://sms/inbox to uid 2000")
+    lines.append("06-21 12:00:59.000  1000  1000 I battery_level: [50,4000,300]")
+    lines.append("06-21 12:03:00.000  1000  1000 I battery_status: [3,2,1,0,Li-ion]")
+    return lines
+
+
+def test_timeline_scores_the_session():
+    from mybugreport.pipeline.analyze.window_score import score_timeline
+    from mybugreport.pipeline.parse import record_from_line
+
+    windows = list(score_timeline((record_from_line(line, "logcat") for line in session_lines()), 60, 30))
+    # nothing between 09:00 and 12:00 has evidence, so no windows there
+    assert all(window.end >= windows[0].end for window in windows)
+    first = next(window for window in windows if window.groups["L4_shell_commands"])
+    assert first.end - first.start == 60
+    peak = max(windows, key=lambda window: window.score)
+    assert peak.label == "high_suspicion"
+    assert peak.groups["L1_connection_auth"] == 0.5  # auth and usb adb, no root/tcp
+    assert peak.features["plugged_usb_ratio"] == 1.0 and peak.features["battery_level_slope"] == 1.0
+    assert peak.features["grant_subject_class"] == 1.0 and peak.features["inter_event_cv"] == 1.0
+    assert peak.features["distinct_providers_count"] == pytest.approx(3 / 5)
+    assert peak.features["ngram_match_score"] == 1.0 and peak.features["priv_exec_hint"] == 0.0
+    # unplugged at 12:03; the last window holds only that
+    assert windows[-1].label == "normal" and windows[-1].features["plugged_usb_ratio"] > 0
+
+
+def test_aggregates_slide_incrementally():
+    from mybugreport.pipeline.analyze.window_score import WindowScorer
+
+    scorer = WindowScorer(length=60, step=10)
+    windows = []
+    # a command every 4s for two minutes (below the rate cap), the type cycling through 3 names
+    seconds = range(0, 120, 4)
+    for second in seconds:
+        ts = f"06-21 12:{second // 60:02d}:{second % 60:02d}.000"
+        command = ["ls", "id", "su -c id"][second // 4 % 3]
+        windows += scorer.feed(ts, "adbd", f"shell:{command}")
+    windows += scorer.flush()
+    ends = [window.end - 12 * 3600 - windows[0].end // 86400 * 86400 for window in windows]
+    assert ends == [float(end) for end in range(0, 130, 10)]
+    # every window's aggregates match a count from scratch over (end - 60, end]
+    counts = [round(window.features["cmd_burst_density"] * 20) for window in windows]
+    assert counts == [sum(1 for second in seconds if end - 60 < second <= end) for end in range(0, 130, 10)]
+    assert all(window.features["unique_cmd_types"] == 0.5 for window in windows[1:])
+    assert windows[0].features["priv_exec_hint"] == 0.0 and windows[1].features["priv_exec_hint"] == 1.0
+    # perfectly regular L4 events, but no L3 events: no L3 regularity
+    assert all(window.features["inter_event_cv"] == 0.0 for window in windows)
+
+
+def test_analyze_writes_timeline(tmp_path):
+    from mybugreport.cli import pipeline_main
+
+    capture = tmp_path / "logcat.txt"
+    capture.write_text("\n".join(session_lines()) + "\n", encoding="utf-8")
+    records = tmp_path / "logcat.records.jsonl"
+    pipeline_main(["parse", str(capture), str(records), "--source", "logcat"])
+    timeline = tmp_path / "timeline.jsonl"
+    pipeline_main(
+        ["analyze", str(records), str(tmp_path / "findings.json"), "--timeline", str(timeline), "--step", "30"]
+    )
+    rows = [json.loads(line) for line in timeline.read_text(encoding="utf-8").splitlines()]
+    assert rows[0]["start"] < rows[0]["end"] and rows[0]["end"].startswith("06-21 12:00:")
+    assert set(rows[0]["groups"]) == {"L1_connection_auth", "L2_power_broadcast", "L3_provider_uri", "L4_shell_commands"}
+    assert any(row["label"] == "high_suspicion" for row in rows)